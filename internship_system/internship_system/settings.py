@@ -46,11 +46,14 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "placement.User"
 
 MIDDLEWARE = [
+    'placement.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'placement.middleware.RoleProfileMiddleware',
+    'placement.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -134,3 +137,38 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'documents')
 
 USE_TZ = True
 TIME_ZONE = 'Asia/Kuala_Lumpur'
+
+# Queue notifications in the outbox table instead of delivering them inline. Only turn this on
+# where a `python manage.py drain_notifications` worker runs, or queued notifications never arrive
+NOTIFICATION_OUTBOX = False
+
+# Push live unread badges over server-sent events. The stream holds its connection open, so only
+# turn this on when serving through ASGI (e.g. uvicorn internship_system.asgi:application)
+NOTIFICATION_STREAM = False
+
+# Read notifications older than this are removed by `python manage.py compact_notifications`
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Repeats of the same kind of notification about the same subject within this many seconds are merged
+NOTIFICATION_COALESCE_WINDOW = 10 * 60
+
+# Per-request SQL accounting (Server-Timing header, slow / N+1 log on the placement.sql logger).
+# Meant for staging; off by default.
+SQL_INSTRUMENTATION = False
+SQL_SLOW_REQUEST_MS = 500
+SQL_N_PLUS_ONE_THRESHOLD = 5
+
+# Admins can profile any page with ?profile=1; results are kept here and listed on /manager/profiles/
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_KEEP = 100
+
+# The admin dashboard's counters are cached for this long; saves and deletes clear them sooner.
+# Use a shared cache (Redis / Memcached in CACHES) when running more than one worker process.
+ADMIN_DASHBOARD_CACHE_SECONDS = 5 * 60
+# Per-supervisor company dashboard figures; attendance, logbook and similar writes clear them sooner
+COMPANY_DASHBOARD_CACHE_SECONDS = 60
+
+# Attendance summaries: working days (Monday = 0), dates that are not, and the check-in time after which an intern is late
+ATTENDANCE_WORKING_WEEKDAYS = (0, 1, 2, 3, 4)
+ATTENDANCE_HOLIDAYS = ()
+ATTENDANCE_LATE_AFTER = '09:00'
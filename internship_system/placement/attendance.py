@@ -0,0 +1,429 @@
+"""
+Attendance check-in / check-out for company supervisors.
+
+mark_attendance handles any number of a supervisor's active placements in
+one go with the same per-row rules the attendance page always had:
+
+* check in: create today's record with the current time, unless there is
+  one already;
+* check out: close today's record; an intern without one is checked in and
+  out at the same time.
+
+There is one record per placement and day (a unique constraint), and new
+records are written with a single ``INSERT ... ON CONFLICT DO NOTHING``
+upsert, so concurrent clicks cannot create duplicates. Open records are
+closed with one UPDATE. Neither sends model signals, so the statistics,
+monthly rollups and dashboard caches those signals maintain are updated
+here instead.
+
+summarize_attendance reports present days, absent working days, late
+arrivals and hours worked for any set of placements and date range.
+Working days are the ATTENDANCE_WORKING_WEEKDAYS minus ATTENDANCE_HOLIDAYS;
+a weekend or holiday without a record is not an absence, and one with a
+record still counts as present. Only records within the placement's own
+dates count.
+
+Ranges made of whole months are answered from AttendanceMonthly, one row
+per placement and month, instead of the raw records. The receivers in
+placement.signals keep it current through record_attendance_changes; run
+``manage.py rebuild_attendance_monthly`` after bulk loads or after changing
+the calendar or ATTENDANCE_LATE_AFTER settings.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractHour, ExtractMinute, ExtractMonth, ExtractYear
+from django.utils.timezone import localdate, localtime, now
+
+from .dashboard import invalidate_admin_dashboard, invalidate_company_dashboards
+from .models import Attendance, AttendanceMonthly, InternshipPlacement
+from .stats import record_bulk_create
+
+ACTIONS = ('checkin', 'checkout')
+
+
+def _ids(values):
+    ids = []
+    for value in values:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def insert_attendance(placement_ids, day, check_in, check_out=None):
+    """
+    Create ``day``'s record for each placement that has none yet, in one
+    statement. Returns the placement ids that were actually inserted.
+
+    Django's bulk_create(ignore_conflicts=True) emits the same upsert but
+    cannot say which rows it skipped, and the counters need to know.
+    """
+    if not placement_ids:
+        return []
+
+    ops = connection.ops
+    table = ops.quote_name(Attendance._meta.db_table)
+    columns = ', '.join(ops.quote_name(column) for column in
+                        ('placement_id', 'date', 'check_in', 'check_out', 'created_at'))
+    created_at = ops.adapt_datetimefield_value(now())
+    row = (ops.adapt_datefield_value(day), ops.adapt_timefield_value(check_in),
+           ops.adapt_timefield_value(check_out), created_at)
+
+    sql = (
+        f"INSERT INTO {table} ({columns}) VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(placement_ids))} "
+        f"ON CONFLICT ({ops.quote_name('placement_id')}, {ops.quote_name('date')}) DO NOTHING "
+        f"RETURNING {ops.quote_name('placement_id')}"
+    )
+    params = [value for pk in placement_ids for value in (pk, *row)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [pk for pk, in cursor.fetchall()]
+
+
+def close_attendance(placement_ids, day, check_out):
+    """
+    Set the check-out time on ``day``'s open records for these placements,
+    in one statement. Returns ``{placement_id: check_in}`` for the records
+    that were actually closed; one closed by a concurrent request in the
+    meantime is not among them.
+    """
+    if not placement_ids:
+        return {}
+
+    ops = connection.ops
+    quote = ops.quote_name
+    sql = (
+        f"UPDATE {quote(Attendance._meta.db_table)} SET {quote('check_out')} = %s, {quote('updated_at')} = %s "
+        f"WHERE {quote('placement_id')} IN ({', '.join(['%s'] * len(placement_ids))}) "
+        f"AND {quote('date')} = %s AND {quote('check_out')} IS NULL "
+        f"RETURNING {quote('placement_id')}, {quote('check_in')}"
+    )
+    params = [ops.adapt_timefield_value(check_out), ops.adapt_datetimefield_value(now()),
+              *placement_ids, ops.adapt_datefield_value(day)]
+    to_time = Attendance._meta.get_field('check_in').to_python
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {pk: to_time(check_in) for pk, check_in in cursor.fetchall()}
+
+
+def mark_attendance(supervisor, placement_ids, action, active_only=True):
+    """
+    Check the given placements in or out for today. Returns the placement
+    ids grouped by outcome: ``checked_in``, ``checked_out``, ``unchanged``
+    and ``invalid`` (not one of the supervisor's placements, or with
+    ``active_only`` not one of their active ones).
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown attendance action {action!r}")
+
+    requested = list(dict.fromkeys(_ids(placement_ids)))
+    today = localdate()
+    current_time = localtime(now()).time()
+
+    with transaction.atomic():
+        placements = InternshipPlacement.objects.filter(pk__in=requested, company_supervisor=supervisor)
+        if active_only:
+            placements = placements.filter(status='Active')
+        periods = {
+            pk: (start, end) for pk, start, end in placements.values_list('pk', 'start_date', 'end_date')
+        }
+        valid = [pk for pk in requested if pk in periods]
+
+        closed = {}
+        missing = valid
+        if action == 'checkout' and valid:
+            # Close whatever is open; only the rows this UPDATE changed are counted
+            closed = close_attendance(valid, today, current_time)
+            existing = set(
+                Attendance.objects.filter(placement__in=valid, date=today).values_list('placement', flat=True)
+            )
+            missing = [pk for pk in valid if pk not in existing]
+
+        # Whoever has no record yet is checked in (and, for a checkout, out) now.
+        # A check-in doesn't look first: the upsert skips existing records itself.
+        check_out = current_time if action == 'checkout' else None
+        inserted = set(insert_attendance(missing, today, current_time, check_out=check_out))
+
+        if inserted:
+            record_bulk_create([Attendance(placement_id=pk, date=today) for pk in inserted])
+        record_attendance_changes([
+            (_values(pk, today, check_in, None), _values(pk, today, check_in, current_time))
+            for pk, check_in in closed.items()
+        ] + [
+            (None, _values(pk, today, current_time, check_out)) for pk in inserted
+        ], periods)
+        if inserted or closed:
+            invalidate_company_dashboards([supervisor.pk])
+            invalidate_admin_dashboard()
+
+    changed = inserted | set(closed)
+    return {
+        'date': today.isoformat(),
+        'action': action,
+        'checked_in': [pk for pk in valid if pk in inserted],
+        'checked_out': [pk for pk in valid if pk in changed] if action == 'checkout' else [],
+        'unchanged': [pk for pk in valid if pk not in changed],
+        'invalid': [pk for pk in requested if pk not in periods],
+    }
+
+
+def _working_weekdays():
+    return sorted(set(getattr(settings, 'ATTENDANCE_WORKING_WEEKDAYS', (0, 1, 2, 3, 4))))
+
+
+def _holidays():
+    return set(getattr(settings, 'ATTENDANCE_HOLIDAYS', ()))
+
+
+def _late_after():
+    return Attendance._meta.get_field('check_in').to_python(getattr(settings, 'ATTENDANCE_LATE_AFTER', '09:00'))
+
+
+def working_days(start, end):
+    """The number of working days from ``start`` to ``end``, inclusive."""
+    if start > end:
+        return 0
+    weekdays = _working_weekdays()
+    days = (end - start).days + 1
+    weeks, rest = divmod(days, 7)
+    count = weeks * len(weekdays) + sum(
+        1 for offset in range(rest) if (start.weekday() + offset) % 7 in weekdays
+    )
+    return count - sum(1 for day in _holidays() if start <= day <= end and day.weekday() in weekdays)
+
+
+def _minutes(expression):
+    # Whole minutes since midnight, so the SQL and Python sums agree exactly
+    return ExtractHour(expression) * 60 + ExtractMinute(expression)
+
+
+def _aggregates(prefix='', condition=None):
+    """
+    The AttendanceMonthly figures over the attendance records reached through
+    ``prefix``, limited to those matching ``condition``.
+    """
+    def where(q):
+        return q if condition is None else condition & q
+
+    field = lambda name: f'{prefix}{name}'
+    # Django numbers week days from Sunday = 1; Python from Monday = 0
+    working_day = Q(**{field('date__week_day__in'): [(day + 1) % 7 + 1 for day in _working_weekdays()]})
+    return {
+        'present_days': Count(field('id'), filter=condition),
+        'present_working_days': Count(
+            field('id'), filter=where(working_day & ~Q(**{field('date__in'): _holidays()}))
+        ),
+        'late_days': Count(field('id'), filter=where(Q(**{field('check_in__gt'): _late_after()}))),
+        'total_minutes': Coalesce(Sum(
+            _minutes(field('check_out')) - _minutes(field('check_in')),
+            filter=where(Q(**{field('check_out__gt'): F(field('check_in'))})),
+        ), Value(0)),
+    }
+
+
+def _values(placement_id, day, check_in, check_out):
+    return {'placement': placement_id, 'date': day, 'check_in': check_in, 'check_out': check_out}
+
+
+def attendance_values(instance, previous=False):
+    """An attendance row as record_attendance_changes expects it (None if not known)."""
+    if previous:
+        values = {name: instance.previous(name) for name in instance.tracked_fields}
+    else:
+        values = {name: getattr(instance, instance._meta.get_field(name).attname) for name in instance.tracked_fields}
+    if values['placement'] is None or values['date'] is None or values['check_in'] is None:
+        return None
+    # Fields assigned from a form still hold the submitted strings
+    return {name: instance._meta.get_field(name).to_python(value) for name, value in values.items()}
+
+
+def _contribution(values):
+    counts = Counter(present_days=1)
+    day, check_in, check_out = values['date'], values['check_in'], values['check_out']
+    if day.weekday() in _working_weekdays() and day not in _holidays():
+        counts['present_working_days'] += 1
+    if check_in > _late_after():
+        counts['late_days'] += 1
+    if check_out is not None and check_out > check_in:
+        counts['total_minutes'] += (check_out.hour * 60 + check_out.minute) - (check_in.hour * 60 + check_in.minute)
+    return counts
+
+
+def _apply_monthly(placement_id, year, month, deltas):
+    updates = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    if not updates:
+        return
+    rows = AttendanceMonthly.objects.filter(placement=placement_id, year=year, month=month)
+    if rows.update(**updates):
+        return
+    # Nothing to take away from a month without a row (e.g. its placement is being deleted)
+    if not any(delta > 0 for delta in deltas.values()):
+        return
+    try:
+        with transaction.atomic():
+            AttendanceMonthly.objects.create(placement_id=placement_id, year=year, month=month, **deltas)
+    except IntegrityError:
+        # Another request created the month first
+        rows.update(**updates)
+
+
+def record_attendance_changes(changes, periods=None):
+    """
+    Apply attendance writes to AttendanceMonthly. ``changes`` holds
+    ``(before, after)`` pairs of attendance_values (None for an insert or a
+    delete); ``periods`` maps placement ids to their (start, end) dates
+    when the caller already has them.
+    """
+    changes = [change for change in changes if change != (None, None)]
+    if not changes:
+        return
+    placement_ids = {values['placement'] for change in changes for values in change if values}
+    if periods is None or not placement_ids <= set(periods):
+        periods = {
+            pk: (start, end) for pk, start, end in
+            InternshipPlacement.objects.filter(pk__in=placement_ids).values_list('pk', 'start_date', 'end_date')
+        }
+
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        for values, sign in ((before, -1), (after, 1)):
+            period = values and periods.get(values['placement'])
+            if not period or not period[0] <= values['date'] <= period[1]:
+                continue
+            key = (values['placement'], values['date'].year, values['date'].month)
+            for name, count in _contribution(values).items():
+                deltas[key][name] += sign * count
+
+    for (placement_id, year, month), counts in deltas.items():
+        _apply_monthly(placement_id, year, month, counts)
+
+
+def count_attendance_monthly(records):
+    """Fresh AttendanceMonthly figures for ``records`` (an Attendance queryset), one dict per placement and month."""
+    return (
+        records
+        .filter(date__gte=F('placement__start_date'), date__lte=F('placement__end_date'))
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('placement', 'year', 'month')
+        .annotate(**_aggregates())
+        .order_by()
+    )
+
+
+def rebuild_attendance_monthly(placements=None, apps=django_apps):
+    """Recount AttendanceMonthly, for the given placement ids or for everyone."""
+    AttendanceModel = apps.get_model('placement', 'Attendance')
+    MonthlyModel = apps.get_model('placement', 'AttendanceMonthly')
+    records = AttendanceModel.objects.all()
+    months = MonthlyModel.objects.all()
+    if placements is not None:
+        records = records.filter(placement__in=placements)
+        months = months.filter(placement__in=placements)
+
+    with transaction.atomic():
+        months.delete()
+        MonthlyModel.objects.bulk_create([
+            MonthlyModel(placement_id=row.pop('placement'), **row) for row in count_attendance_monthly(records)
+        ], batch_size=1000)
+
+
+def attendance_monthly_drift():
+    """Differences between AttendanceMonthly and a fresh count, as readable lines."""
+    names = ['present_days', 'present_working_days', 'late_days', 'total_minutes']
+    zero = dict.fromkeys(names, 0)
+    counted = {
+        (row.pop('placement'), row.pop('year'), row.pop('month')): row
+        for row in count_attendance_monthly(Attendance.objects.all())
+    }
+    stored = {
+        (row.pop('placement'), row.pop('year'), row.pop('month')): row
+        for row in AttendanceMonthly.objects.values('placement', 'year', 'month', *names)
+    }
+
+    drift = []
+    for key in sorted(set(counted) | set(stored)):
+        placement_id, year, month = key
+        drift += [
+            f"placement {placement_id} {year}-{month:02d} {name}: "
+            f"stored {stored.get(key, zero)[name]}, counted {counted.get(key, zero)[name]}"
+            for name in names if stored.get(key, zero)[name] != counted.get(key, zero)[name]
+        ]
+    return drift
+
+
+def _whole_months(start, end):
+    return (start is None or start.day == 1) and (end is None or (end + timedelta(days=1)).day == 1)
+
+
+def _from_rollup(placements, start, end):
+    in_range = None
+    if start:
+        in_range = Q(attendance_months__year__gt=start.year) | Q(
+            attendance_months__year=start.year, attendance_months__month__gte=start.month
+        )
+    if end:
+        before_end = Q(attendance_months__year__lt=end.year) | Q(
+            attendance_months__year=end.year, attendance_months__month__lte=end.month
+        )
+        in_range = before_end if in_range is None else in_range & before_end
+    return placements.annotate(**{
+        name: Coalesce(Sum(f'attendance_months__{name}', filter=in_range), Value(0))
+        for name in ('present_days', 'present_working_days', 'late_days', 'total_minutes')
+    })
+
+
+def _from_records(placements, start, end):
+    in_range = Q(attendance__date__gte=F('start_date'), attendance__date__lte=F('end_date'))
+    if start:
+        in_range &= Q(attendance__date__gte=start)
+    if end:
+        in_range &= Q(attendance__date__lte=end)
+    return placements.annotate(**_aggregates('attendance__', in_range))
+
+
+def summarize_attendance(placements, start=None, end=None):
+    """
+    Attendance figures for each of ``placements`` (a queryset) from
+    ``start`` to ``end``, clipped to the placement's own dates; absences
+    only run up to today. Either bound may be None for "the whole
+    placement". One query, against AttendanceMonthly when the range is
+    made of whole months.
+
+    Returns ``{placement_id: summary}`` where each summary holds
+    working_days, present_days, absent_days, late_days and total_minutes
+    (completed check-in / check-out pairs only), plus total_hours.
+    """
+    source = _from_rollup if _whole_months(start, end) else _from_records
+    rows = source(placements.order_by(), start, end).values(
+        'pk', 'start_date', 'end_date', 'present_days', 'present_working_days', 'late_days', 'total_minutes'
+    )
+
+    last = min(end, localdate()) if end else localdate()
+    summaries = {}
+    for row in rows:
+        days = working_days(max(row['start_date'], start or row['start_date']), min(row['end_date'], last))
+        summaries[row['pk']] = {
+            'working_days': days,
+            'present_days': row['present_days'],
+            'absent_days': max(days - row['present_working_days'], 0),
+            'late_days': row['late_days'],
+            'total_minutes': row['total_minutes'],
+            'total_hours': round(row['total_minutes'] / 60, 1),
+        }
+    return summaries
+
+
+def combine_summaries(summaries):
+    """Add up several placements' summaries (e.g. a student with more than one)."""
+    total = {'working_days': 0, 'present_days': 0, 'absent_days': 0, 'late_days': 0, 'total_minutes': 0}
+    for summary in summaries:
+        for name in total:
+            total[name] += summary[name]
+    total['total_hours'] = round(total['total_minutes'] / 60, 1)
+    return total
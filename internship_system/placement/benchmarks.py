@@ -0,0 +1,258 @@
+"""
+Per-view benchmarks for ``manage.py benchmark_views``.
+
+Every named route in placement/urls.py is requested with the Django test
+client, logged in as the role that uses it, against a generated cohort
+(see placement.cohort). For each route we record the number of SQL
+queries, the wall time and the size of the rendered response, and compare
+them with the budgets in benchmark_budgets.json. Query counts are
+deterministic for a given dataset, so they make good regression budgets:
+an N+1 shows up as a count that grows with the data. Time budgets are
+recorded with generous headroom and only catch gross slowdowns.
+"""
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .cohort import CohortGenerator
+from .models import (
+    User,
+    CompanySupervisor,
+    Document,
+    InternshipApplication,
+    InternshipPlacement,
+    Logbook,
+)
+
+BUDGETS_PATH = Path(__file__).with_name('benchmark_budgets.json')
+
+# Route name -> (role, kwargs). Kwarg values name an object from BenchmarkFixtures.
+ROUTES = {
+    'login': (None, {}),
+    'dashboard': ('student', {}),
+    'notifications': ('student', {}),
+    'notifications_feed': ('student', {}),
+
+    'student_dashboard': ('student', {}),
+    'student_profile': ('student', {}),
+    'update_email': ('student', {}),
+    'upload_document': ('student', {}),
+    'edit_document': ('student', {'doc_id': 'document'}),
+    'internship_list': ('student', {}),
+    'apply_internship': ('student', {'id': 'internship'}),
+    'student_offers': ('student', {}),
+    'logbook_list': ('student', {}),
+    'submit_logbook': ('student', {'week_no': 'next_week'}),
+    'edit_logbook': ('student', {'id': 'logbook'}),
+    'student_attendance_summary': ('student', {}),
+
+    'company_dashboard': ('company', {}),
+    'company_student_profile': ('company', {'student_id': 'student'}),
+    'interns_attendance': ('company', {}),
+    'attendance_summary': ('company', {}),
+    'evaluation_list': ('company', {}),
+    'interns_evaluation': ('company', {'placement_id': 'placement'}),
+    'supervisor_applications': ('company', {}),
+    'company_logbook_review': ('company', {}),
+
+    'academic_dashboard': ('academic', {}),
+    'academic_logbook_review': ('academic', {}),
+    'submit_academic_evaluation': ('academic', {'student_id': 'student'}),
+    'academic_student_list': ('academic', {}),
+    'academic_performance_evaluation': ('academic', {'student_id': 'student'}),
+    'academic_student_attendance': ('academic', {'student_id': 'student'}),
+    'academic_records': ('academic', {'student_id': 'student'}),
+
+    'admin': ('admin', {}),
+    'admin_user_list': ('admin', {}),
+    'admin_add_user': ('admin', {}),
+    'admin_user_edit': ('admin', {'user_id': 'student_user'}),
+    'admin_company_list': ('admin', {}),
+    'admin_add_company': ('admin', {}),
+    'admin_edit_company': ('admin', {'company_id': 'company'}),
+    'admin_internships_list': ('admin', {}),
+    'admin_add_internship': ('admin', {}),
+    'admin_edit_internship': ('admin', {'internship_id': 'internship'}),
+    'departments_by_company': ('admin', {'company_id': 'company'}),
+    'admin_applications_list': ('admin', {}),
+    'admin_application_detail': ('admin', {'application_id': 'application'}),
+    'admin_replace_supervisor': ('admin', {'application_id': 'application'}),
+    'admin_internship_placements_list': ('admin', {}),
+    'admin_manage_placement': ('admin', {'placement_id': 'placement'}),
+    'admin_attendance_list': ('admin', {}),
+    'admin_attendance_manage': ('admin', {'internship_id': 'internship'}),
+    'admin_logbooks_manage': ('admin', {}),
+    'admin_evaluations_manage': ('admin', {}),
+    'admin_profiles': ('admin', {}),
+}
+
+# Routes that change data on GET, end the session, never finish rendering or are broken
+SKIPPED = {
+    'logout': "ends the session",
+    'mark_notification_read': "writes",
+    'mark_notifications_read': "POST only",
+    'notification_stream': "long-lived event stream",
+    'delete_document': "writes",
+    'accept_offer': "writes",
+    'reject_offer': "writes",
+    'offer_application': "writes",
+    'review_logbook': "POST only",
+    'interns_attendance_bulk': "POST only",
+    'admin_user_delete': "writes",
+    'admin_delete_company': "writes",
+    'admin_delete_internship': "writes",
+    'admin_delete_application': "writes",
+    'academic_student_detail': "template academic/academic_student_detail.html is missing",
+    'admin_logbooks_list': "template admin/admin_logbooks_list.html is missing",
+    'admin_profile_detail': "needs a recorded profile",
+}
+
+# A recorded latency budget is the measured median times LATENCY_HEADROOM plus LATENCY_SLACK_MS
+LATENCY_HEADROOM = 3
+LATENCY_SLACK_MS = 50
+
+# Transaction bookkeeping differs between a test case and autocommit; don't count it
+IGNORED_SQL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+class BenchmarkFixtures:
+    """The cohort plus one representative object of each kind the routes need."""
+
+    def __init__(self, students, companies, weeks, seed=0):
+        self.dataset = {'students': students, 'companies': companies, 'weeks': weeks, 'seed': seed}
+        CohortGenerator(
+            students=students, companies=companies, weeks=weeks, seed=seed, prefix='bench'
+        ).generate()
+
+        # The busiest supervisor, so per-intern work is as visible as possible
+        supervisor = (
+            CompanySupervisor.objects
+            .annotate(placements=Count('internshipplacement'))
+            .order_by('-placements', 'pk')
+            .select_related('user', 'company')
+            .first()
+        )
+        self.placement = (
+            InternshipPlacement.objects
+            .filter(company_supervisor=supervisor)
+            .select_related('student__user', 'student__academic_supervisor__user', 'internship')
+            .order_by('pk')
+            .first()
+        )
+        self.student = self.placement.student
+        self.application = InternshipApplication.objects.filter(
+            student=self.student, status='Accepted'
+        ).order_by('pk').first()
+        self.logbook = Logbook.objects.filter(student=self.student).order_by('week_no').first()
+        self.internship = self.placement.internship
+        self.company = supervisor.company
+        self.student_user = self.student.user
+        self.document = Document.objects.create(
+            student=self.student, file='documents/benchmark.pdf', doc_type='Resume'
+        )
+        self.next_week = weeks + 1
+
+        self.users = {
+            'student': self.student.user,
+            'company': supervisor.user,
+            'academic': self.student.academic_supervisor.user,
+            'admin': User.objects.create(username='bench-admin', role='admin'),
+        }
+
+    def url(self, name):
+        _, kwargs = ROUTES[name]
+        values = {key: getattr(self, fixture) for key, fixture in kwargs.items()}
+        return reverse(name, kwargs={key: getattr(value, 'pk', value) for key, value in values.items()})
+
+
+def measure(client, url, repeat=1):
+    queries, timings = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = client.get(url)
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(sum(1 for q in ctx.captured_queries if not q['sql'].startswith(IGNORED_SQL)))
+
+    return {
+        'url': url,
+        'status': response.status_code,
+        # Worst case for queries (the first, cold request), typical case for time
+        'queries': max(queries),
+        'ms': round(statistics.median(timings), 2),
+        'bytes': len(content),
+    }
+
+
+def run_benchmarks(fixtures, routes=None, repeat=1):
+    # Record server errors as a 500 result instead of aborting the run
+    clients = {None: Client(raise_request_exception=False)}
+    for role, user in fixtures.users.items():
+        clients[role] = Client(raise_request_exception=False)
+        clients[role].force_login(user)
+
+    results = {}
+    for name in routes or ROUTES:
+        role, _ = ROUTES[name]
+        results[name] = measure(clients[role], fixtures.url(name), repeat=repeat)
+    return results
+
+
+def check_budgets(results, budgets):
+    """Return a list of human-readable budget violations."""
+    violations = []
+    routes = budgets.get('routes', {})
+    for name, result in results.items():
+        if result['status'] >= 500:
+            violations.append(f"{name}: server error {result['status']}")
+        budget = routes.get(name)
+        if budget is None:
+            violations.append(f"{name}: no budget recorded")
+            continue
+        if result['queries'] > budget['max_queries']:
+            violations.append(f"{name}: {result['queries']} queries (budget {budget['max_queries']})")
+        if 'max_ms' in budget and result['ms'] > budget['max_ms']:
+            violations.append(f"{name}: {result['ms']} ms (budget {budget['max_ms']} ms)")
+    return violations
+
+
+def latency_budget(ms):
+    # Wall time is noisy and machine-dependent, so leave plenty of room above the measurement
+    return math.ceil(ms * LATENCY_HEADROOM + LATENCY_SLACK_MS)
+
+
+def budgets_from(results, dataset):
+    return {
+        'dataset': dataset,
+        'routes': {
+            name: {'max_queries': result['queries'], 'max_ms': latency_budget(result['ms'])}
+            for name, result in sorted(results.items())
+        },
+    }
+
+
+def build_report(results, budgets, dataset, violations):
+    routes = budgets.get('routes', {})
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'dataset': dataset,
+        'routes': {
+            name: dict(result, budget=routes.get(name)) for name, result in sorted(results.items())
+        },
+        'violations': violations,
+    }
@@ -0,0 +1,297 @@
+"""
+Synthetic cohorts for load and scaling tests (``manage.py generate_cohort``).
+
+Everything is written with batched bulk_create, so model signals (and the
+admin notification fan-out they trigger) are skipped. Students are
+generated chunk by chunk, each chunk in its own transaction, so memory use
+stays flat however large the cohort is. The same seed always produces the
+same cohort.
+"""
+import random
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .attendance import rebuild_attendance_monthly
+from .models import (
+    User,
+    Student,
+    AcademicSupervisor,
+    CompanySupervisor,
+    Company,
+    Department,
+    Internship,
+    InternshipApplication,
+    InternshipPlacement,
+    Attendance,
+    Logbook,
+    PerformanceEvaluation,
+    NotificationMessage,
+    NotificationReceipt,
+)
+from .stats import rebuild_stats
+
+PROGRAMS = ['Software Engineering', 'Computer Science', 'Data Science', 'Information Systems', 'Cybersecurity']
+DEPARTMENTS = ['Engineering', 'Data', 'Operations', 'Finance', 'Marketing']
+CITIES = ['Kuala Lumpur', 'Penang', 'Johor Bahru', 'Cyberjaya', 'Kuching']
+
+PLACEMENT_RATE = 0.9
+ATTENDANCE_RATE = 0.95
+STUDENTS_PER_ACADEMIC = 40
+
+
+class CohortGenerator:
+
+    def __init__(self, students, companies, weeks, seed=0, start=None,
+                 batch_size=2000, prefix='gen', password=None):
+        self.students = students
+        self.companies = companies
+        self.weeks = weeks
+        self.start = start or timezone.localdate()
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        # Hash once (or store an unusable password) instead of per user
+        self.password = make_password(password)
+        self.counts = Counter()
+
+    def insert(self, model, objs):
+        """bulk_create ``objs`` in batches and return them with primary keys set."""
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[model._meta.object_name] += len(created)
+        return created
+
+    def stream(self, model, objs):
+        """bulk_create an iterable of rows in batches without keeping them around."""
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                self.insert(model, batch)
+                batch = []
+        if batch:
+            self.insert(model, batch)
+
+    def aware(self, day, at):
+        return timezone.make_aware(datetime.combine(day, at))
+
+    def generate(self, on_chunk=None):
+        """Create the whole cohort; ``on_chunk(done, total)`` is called after each student chunk."""
+        with transaction.atomic():
+            self.create_organisations()
+            self.create_academics()
+            self.create_reminders()
+
+        for first in range(0, self.students, self.batch_size):
+            count = min(self.batch_size, self.students - first)
+            with transaction.atomic():
+                self.create_students(first, count)
+            if on_chunk:
+                on_chunk(first + count, self.students)
+
+        # Signals were skipped, so recount SystemStats and the attendance rollups once at the end
+        rebuild_stats()
+        rebuild_attendance_monthly()
+        return self.counts
+
+    def create_organisations(self):
+        companies = self.insert(Company, [
+            Company(company_name=f"{self.prefix} Company {n}", address=self.rng.choice(CITIES))
+            for n in range(1, self.companies + 1)
+        ])
+        self.departments = self.insert(Department, [
+            Department(company=company, name=name)
+            for company in companies
+            for name in self.rng.sample(DEPARTMENTS, self.rng.randint(1, 3))
+        ])
+
+        users = self.insert(User, [
+            User(username=f"{self.prefix}-c{n}", email=f"{self.prefix}-c{n}@example.com",
+                 role='company', password=self.password)
+            for n in range(1, len(self.departments) + 1)
+        ])
+        supervisors = self.insert(CompanySupervisor, [
+            CompanySupervisor(user=user, company=department.company, department=department)
+            for user, department in zip(users, self.departments)
+        ])
+        self.supervisor_for = {
+            supervisor.department_id: supervisor for supervisor in supervisors
+        }
+
+        end = self.start + timedelta(weeks=self.weeks, days=-3)
+        self.internships = self.insert(Internship, [
+            Internship(
+                company=department.company,
+                department=department,
+                title=f"{department.name} Intern",
+                description=f"{department.name} internship at {department.company.company_name}.",
+                location=department.company.address,
+                start_date=self.start,
+                end_date=end,
+                total_slots=self.rng.randint(5, 100),
+                status='Open',
+            )
+            for department in self.departments
+        ])
+
+    def create_academics(self):
+        total = max(1, self.students // STUDENTS_PER_ACADEMIC)
+        users = self.insert(User, [
+            User(username=f"{self.prefix}-a{n}", email=f"{self.prefix}-a{n}@example.com",
+                 role='academic', password=self.password)
+            for n in range(1, total + 1)
+        ])
+        self.academics = self.insert(AcademicSupervisor, [
+            AcademicSupervisor(user=user, faculty='Computing') for user in users
+        ])
+
+    def create_reminders(self):
+        # One shared weekly message; every placed student gets a receipt for it
+        self.reminders = self.insert(NotificationMessage, [
+            NotificationMessage(
+                body=f"Reminder: submit your logbook for Week {week}.",
+                kind='logbook_reminder',
+                subject=f"week:{week}",
+                created_at=self.aware(self.week_start(week) + timedelta(days=4), time(17)),
+            )
+            for week in range(1, self.weeks + 1)
+        ])
+
+    def week_start(self, week):
+        return self.start + timedelta(weeks=week - 1)
+
+    def create_students(self, first, count):
+        rng = self.rng
+        placed = [rng.random() < PLACEMENT_RATE for _ in range(count)]
+
+        users = self.insert(User, [
+            User(
+                username=f"{self.prefix}-s{n}",
+                email=f"{self.prefix}-s{n}@example.com",
+                role='student',
+                password=self.password,
+                # Only the latest weekly reminder is left unread
+                unread_notifications=1 if is_placed and self.weeks else 0,
+            )
+            for n, is_placed in zip(range(first + 1, first + count + 1), placed)
+        ])
+        students = self.insert(Student, [
+            Student(
+                user=user,
+                program=rng.choice(PROGRAMS),
+                semester=str(rng.randint(5, 8)),
+                academic_supervisor=rng.choice(self.academics),
+            )
+            for user in users
+        ])
+
+        applications = []
+        accepted = []
+        for student, is_placed in zip(students, placed):
+            choices = rng.sample(self.internships, min(rng.randint(1, 3), len(self.internships)))
+            for i, internship in enumerate(choices):
+                if is_placed and i == 0:
+                    application = InternshipApplication(
+                        student=student,
+                        internship=internship,
+                        status='Accepted',
+                        handled_by=self.supervisor_for[internship.department_id],
+                        student_decision='Accepted',
+                    )
+                    accepted.append(application)
+                else:
+                    application = InternshipApplication(
+                        student=student,
+                        internship=internship,
+                        status='Rejected' if is_placed else 'Pending',
+                    )
+                applications.append(application)
+        self.insert(InternshipApplication, applications)
+
+        placements = self.insert(InternshipPlacement, [
+            InternshipPlacement(
+                internship=application.internship,
+                student=application.student,
+                company_supervisor=application.handled_by,
+                start_date=application.internship.start_date,
+                end_date=application.internship.end_date,
+                status='Active',
+            )
+            for application in accepted
+        ])
+
+        self.stream(Attendance, self.attendance(placements))
+        self.stream(Logbook, self.logbooks(accepted))
+        self.insert(PerformanceEvaluation, [self.evaluation(application) for application in accepted])
+
+        messages = self.insert(NotificationMessage, [
+            NotificationMessage(
+                body=(
+                    f"You have been assigned to {application.handled_by.user.username} "
+                    f"from {application.internship.company.company_name}."
+                ),
+                created_at=self.aware(self.start, time(9)),
+            )
+            for application in accepted
+        ])
+        self.stream(NotificationReceipt, self.receipts(accepted, messages))
+
+    def attendance(self, placements):
+        rng = self.rng
+        for placement in placements:
+            for week in range(1, self.weeks + 1):
+                for offset in range(5):
+                    if rng.random() >= ATTENDANCE_RATE:
+                        continue
+                    yield Attendance(
+                        placement=placement,
+                        date=self.week_start(week) + timedelta(days=offset),
+                        check_in=time(8, rng.randint(0, 59)),
+                        check_out=time(17, rng.randint(0, 59)),
+                    )
+
+    def logbooks(self, applications):
+        rng = self.rng
+        for application in applications:
+            for week in range(1, self.weeks + 1):
+                status = rng.choices(['Approved', 'Pending', 'Rejected'], weights=[7, 2, 1])[0]
+                yield Logbook(
+                    student=application.student,
+                    application=application,
+                    week_no=week,
+                    content=f"Week {week}: worked on {application.internship.title.lower()} tasks.",
+                    status=status,
+                    company_approval={'Approved': True, 'Rejected': False}.get(status),
+                    submitted_date=self.week_start(week) + timedelta(days=4),
+                )
+
+    def evaluation(self, application):
+        rng = self.rng
+        submitted = self.aware(application.internship.end_date, time(16))
+        score = rng.randint(50, 100)
+        return PerformanceEvaluation(
+            student=application.student,
+            company_supervisor=application.handled_by,
+            academic_supervisor=application.student.academic_supervisor,
+            application=application,
+            company_question_answers={
+                'overall': {'score': score, 'comment': 'Generated'},
+            },
+            company_supervisor_score=score,
+            academic_supervisor_score=rng.randint(50, 100),
+            company_supervisor_submitted_at=submitted,
+            academic_supervisor_submitted_at=submitted,
+        )
+
+    def receipts(self, applications, messages):
+        for application, message in zip(applications, messages):
+            user_id = application.student.user_id
+            yield NotificationReceipt(user_id=user_id, message=message,
+                                      is_read=True, created_at=message.created_at)
+            for reminder in self.reminders:
+                yield NotificationReceipt(user_id=user_id, message=reminder,
+                                          is_read=reminder is not self.reminders[-1],
+                                          created_at=reminder.created_at)
@@ -1,38 +1,49 @@
-from .models import (
-    CompanySupervisor,
-    InternshipPlacement,
-    Notification
-)
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .models import InternshipPlacement
+
+
+def _per_request(request, name, compute):
+    # Evaluate at most once per request, however many templates read the value
+    cache = request.__dict__.setdefault('_context_cache', {})
+    if name not in cache:
+        cache[name] = compute()
+    return cache[name]
+
 
 def company_interns(request):
-    if not request.user.is_authenticated:
-        return {}
+    def interns():
+        user = request.user
+        if not user.is_authenticated or user.role != 'company':
+            return []
 
-    try:
-        company_supervisor = request.user.companysupervisor
-    except CompanySupervisor.DoesNotExist:
-        return {}
+        # Shares the profile the view already loaded (RoleProfileMiddleware)
+        company_supervisor = request.profile
+        if not company_supervisor:
+            return []
 
-    interns = InternshipPlacement.objects.filter(
-        company_supervisor=company_supervisor,
-        status="Active"
-    ).select_related("student__user").distinct()
+        placements = InternshipPlacement.objects.filter(
+            company_supervisor=company_supervisor,
+            status="Active"
+        ).select_related("student__user").distinct()
 
-    interns = [p.student for p in interns]
+        return [p.student for p in placements]
 
+    # Nothing is queried unless a template actually reads {{ interns }}
     return {
-        "interns": interns
+        "interns": SimpleLazyObject(lambda: _per_request(request, 'interns', interns))
     }
 
-def company_notifications(request):
-    if not request.user.is_authenticated:
-        return {}
 
-    unread_count = Notification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).count()
+def company_notifications(request):
+    def unread_count():
+        if not request.user.is_authenticated:
+            return 0
+        # Maintained incrementally by placement.notifications, no COUNT needed
+        return request.user.unread_notifications
 
     return {
-        "unread_count": unread_count,
-    } 
\ No newline at end of file
+        "unread_count": SimpleLazyObject(lambda: _per_request(request, 'unread_count', unread_count)),
+        "notification_stream": settings.NOTIFICATION_STREAM,
+    }
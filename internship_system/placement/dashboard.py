@@ -0,0 +1,156 @@
+"""
+Dashboard figures.
+
+Admin: counters come from one conditional-aggregation query per table or from
+the SystemStats row (placement.stats), and are cached as a single
+snapshot. Saves and deletes of the underlying models drop the snapshot
+(see placement.signals); bulk writes that skip signals are picked up when
+it expires after ADMIN_DASHBOARD_CACHE_SECONDS.
+
+Company supervisors: their five counters come from one query with a
+subquery per figure and are cached per supervisor for
+COMPANY_DASHBOARD_CACHE_SECONDS; writes that change them drop the
+affected supervisors' entries.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, F, Func, IntegerField, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import (
+    User,
+    Company,
+    CompanySupervisor,
+    Department,
+    Internship,
+    InternshipApplication,
+    InternshipPlacement,
+    Logbook,
+    Attendance,
+    PerformanceEvaluation,
+)
+from .stats import system_stats
+
+CACHE_KEY = 'placement:admin-dashboard'
+COMPANY_CACHE_KEY = 'placement:company-dashboard'
+
+
+def _cache_key():
+    # "today" figures roll over at local midnight, like the attendance dates
+    return f"{CACHE_KEY}:{timezone.localdate().isoformat()}"
+
+
+def compute_admin_dashboard():
+    today = timezone.localdate()
+    snapshot = {}
+
+    snapshot.update(User.objects.aggregate(
+        total_users=Count('id'),
+        students_count=Count('id', filter=Q(role='student')),
+        companies_count=Count('id', filter=Q(role='company')),
+        academics_count=Count('id', filter=Q(role='academic')),
+        admins_count=Count('id', filter=Q(role='admin')),
+    ))
+    snapshot.update(Internship.objects.aggregate(
+        total_internships=Count('id'),
+        open_internships=Count('id', filter=Q(status='Open')),
+        closed_internships=Count('id', filter=Q(status='Closed')),
+    ))
+    snapshot.update(Company.objects.aggregate(total_companies=Count('id')))
+    snapshot.update(Department.objects.aggregate(total_departments=Count('id')))
+    snapshot.update(Attendance.objects.aggregate(
+        total_attendance=Count('id'),
+        today_attendance=Count('id', filter=Q(date=today)),
+    ))
+
+    # Application / placement / logbook / evaluation totals are kept in SystemStats
+    stats = system_stats()
+    snapshot.update(
+        total_applications=stats.applications_total,
+        pending_applications=stats.applications_pending,
+        accepted_applications=stats.applications_accepted,
+        rejected_applications=stats.applications_rejected,
+        offered_applications=stats.applications_offered,
+        active_placements=stats.placements_active,
+        completed_placements=stats.placements_completed,
+        total_logbooks=stats.logbooks_total,
+        pending_logbooks=stats.logbooks_pending,
+        approved_logbooks=stats.logbooks_approved,
+        rejected_logbooks=stats.logbooks_rejected,
+        pending_evaluations=stats.evaluations_pending,
+    )
+    return snapshot
+
+
+def admin_dashboard_snapshot():
+    """The cached dashboard figures, recomputed on a miss."""
+    key = _cache_key()
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = compute_admin_dashboard()
+        cache.set(key, snapshot, getattr(settings, 'ADMIN_DASHBOARD_CACHE_SECONDS', 300))
+    return snapshot
+
+
+def invalidate_admin_dashboard():
+    key = _cache_key()
+    cache.delete(key)
+    # Again after commit, in case a request re-cached the old figures in between
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _count(queryset):
+    # COUNT(*) of ``queryset`` as a scalar subquery (Func, so no GROUP BY is added)
+    return Subquery(
+        queryset.order_by().annotate(total=Func(F('pk'), function='COUNT')).values('total'),
+        output_field=IntegerField(),
+    )
+
+
+def _company_cache_key(supervisor_id):
+    return f"{COMPANY_CACHE_KEY}:{timezone.localdate().isoformat()}:{supervisor_id}"
+
+
+def compute_company_dashboard(supervisor):
+    today = timezone.localdate()
+    active = InternshipPlacement.objects.filter(company_supervisor=supervisor.pk, status='Active')
+
+    return CompanySupervisor.objects.filter(pk=supervisor.pk).annotate(
+        total_interns=_count(active),
+        pending_applications=_count(InternshipApplication.objects.filter(
+            internship__department=supervisor.department_id,
+            status='Pending'
+        )),
+        pending_logbooks=_count(Logbook.objects.filter(
+            application__internship__company=supervisor.company_id,
+            company_approval__isnull=True
+        )),
+        attendance_not_marked=_count(active.filter(
+            ~Exists(Attendance.objects.filter(placement=OuterRef('pk'), date=today))
+        )),
+        pending_evaluation=_count(PerformanceEvaluation.objects.filter(
+            company_supervisor=supervisor.pk,
+            company_supervisor_submitted_at__isnull=True
+        )),
+    ).values(
+        'total_interns', 'pending_applications', 'pending_logbooks', 'attendance_not_marked', 'pending_evaluation'
+    ).get()
+
+
+def company_dashboard_snapshot(supervisor):
+    """The cached dashboard figures for one company supervisor."""
+    key = _company_cache_key(supervisor.pk)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = compute_company_dashboard(supervisor)
+        cache.set(key, snapshot, getattr(settings, 'COMPANY_DASHBOARD_CACHE_SECONDS', 60))
+    return snapshot
+
+
+def invalidate_company_dashboards(supervisor_ids):
+    keys = [_company_cache_key(pk) for pk in supervisor_ids if pk is not None]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
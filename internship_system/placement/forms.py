@@ -31,6 +31,12 @@ class StudentForm(forms.ModelForm):
         model = Student
         fields = ['program', 'semester', 'academic_supervisor']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Each option is labelled with the supervisor's username
+        self.fields['academic_supervisor'].queryset = AcademicSupervisor.objects.select_related('user')
+
 class AcademicSupervisorForm(forms.ModelForm):
     class Meta:
         model = AcademicSupervisor
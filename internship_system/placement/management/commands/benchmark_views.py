@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from placement.benchmarks import (
+    BUDGETS_PATH,
+    ROUTES,
+    BenchmarkFixtures,
+    budgets_from,
+    build_report,
+    check_budgets,
+    load_budgets,
+    run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every named route as its role against a generated cohort in a throwaway "
+        "test database, record query count, time and response size, and fail if a view "
+        "goes over its budget in placement/benchmark_budgets.json."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, help="Dataset size (default: the size the budgets were recorded at).")
+        parser.add_argument('--companies', type=int)
+        parser.add_argument('--weeks', type=int)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Requests per route; time is the median.")
+        parser.add_argument('--route', action='append', dest='routes', choices=sorted(ROUTES),
+                            help="Only benchmark this route (repeatable).")
+        parser.add_argument('--budgets', default=str(BUDGETS_PATH))
+        parser.add_argument('--report', help="Write a JSON report to this path.")
+        parser.add_argument('--update-budgets', action='store_true',
+                            help="Record the measured query counts and times (with headroom) as the new budgets.")
+
+    def handle(self, *args, **options):
+        budgets = load_budgets(options['budgets'])
+        dataset = dict(budgets['dataset'])
+        for key in ('students', 'companies', 'weeks', 'seed'):
+            if options[key] is not None:
+                dataset[key] = options[key]
+
+        # Never touch the real database: build the cohort in a test database
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write(f"Generating cohort {dataset} ...")
+            fixtures = BenchmarkFixtures(**dataset)
+            results = run_benchmarks(fixtures, routes=options['routes'], repeat=options['repeat'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options['update_budgets']:
+            with open(options['budgets'], 'w') as f:
+                json.dump(budgets_from(results, dataset), f, indent=2)
+                f.write("\n")
+            self.stdout.write(f"Budgets written to {options['budgets']}.")
+            budgets = load_budgets(options['budgets'])
+
+        violations = check_budgets(results, budgets)
+
+        self.stdout.write(
+            f"{'route':<36} {'status':>6} {'queries':>8} {'budget':>7} {'ms':>9} {'budget':>7} {'bytes':>9}"
+        )
+        for name, result in sorted(results.items()):
+            budget = budgets['routes'].get(name, {})
+            self.stdout.write(
+                f"{name:<36} {result['status']:>6} {result['queries']:>8} {budget.get('max_queries', '-'):>7} "
+                f"{result['ms']:>9.1f} {budget.get('max_ms', '-'):>7} {result['bytes']:>9}"
+            )
+
+        if options['report']:
+            with open(options['report'], 'w') as f:
+                json.dump(build_report(results, budgets, dataset, violations), f, indent=2)
+            self.stdout.write(f"Report written to {options['report']}.")
+
+        if violations:
+            raise CommandError("Over budget:\n  " + "\n  ".join(violations))
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} routes within budget."))
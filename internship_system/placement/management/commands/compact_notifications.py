@@ -0,0 +1,207 @@
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from placement.models import User, NotificationMessage, NotificationReceipt
+
+# Rough on-disk cost of a row, used to estimate the space reclaimed
+RECEIPT_ROW_BYTES = 48
+MESSAGE_ROW_BYTES = 24
+
+# Messages are written just before their receipts; leave young ones alone
+ORPHAN_GRACE_SECONDS = 60 * 60
+
+# Which unread receipts count as repeats of each other (besides having the same user)
+COALESCE_GROUPS = [
+    # Tagged notices: the same kind about the same subject, whatever the wording
+    (~Q(message__kind=''), ('message__kind', 'message__subject')),
+    # Untagged ones, such as the signal-driven admin notices: the same text
+    (Q(message__kind=''), ('message__body',)),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete (and optionally archive) read notifications older than --days, "
+        "coalesce repeated unread notifications and drop orphaned messages. "
+        "Works in small chunks so it can run while the site is live."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90),
+                            help="Keep read notifications newer than this many days.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--archive-dir',
+                            help="Write removed read notifications to a gzipped JSONL file in this directory.")
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between chunks to leave room for live traffic.")
+        parser.add_argument('--orphan-grace', type=int, default=ORPHAN_GRACE_SECONDS,
+                            help="Only drop messages without receipts that are older than this many seconds.")
+
+    def handle(self, *args, **options):
+        self.chunk_size = options['chunk_size']
+        self.pause = options['pause']
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        archive = None
+        archive_path = None
+        if options['archive_dir']:
+            os.makedirs(options['archive_dir'], exist_ok=True)
+            archive_path = os.path.join(
+                options['archive_dir'],
+                f"notifications-{timezone.now():%Y%m%d-%H%M%S}.jsonl.gz"
+            )
+            archive = gzip.open(archive_path, 'wt', encoding='utf-8')
+
+        try:
+            expired, expired_bytes = self.remove_expired(cutoff, archive)
+        finally:
+            if archive:
+                archive.close()
+
+        coalesced, coalesced_bytes = self.coalesce_unread()
+        orphans, orphan_bytes = self.remove_orphan_messages(
+            timezone.now() - timedelta(seconds=options['orphan_grace'])
+        )
+
+        self.stdout.write(f"Removed {expired} read notification(s) older than {options['days']} day(s).")
+        self.stdout.write(f"Coalesced {coalesced} duplicate unread notification(s).")
+        self.stdout.write(f"Removed {orphans} unused message(s).")
+        self.stdout.write(
+            f"Reclaimed about {expired_bytes + coalesced_bytes + orphan_bytes} bytes of notification data."
+        )
+        if archive_path:
+            self.stdout.write(f"Archive written to {archive_path} ({os.path.getsize(archive_path)} bytes).")
+
+    def sleep(self):
+        if self.pause:
+            time.sleep(self.pause)
+
+    def remove_expired(self, cutoff, archive):
+        removed = reclaimed = 0
+        last_id = 0
+
+        while True:
+            chunk = list(
+                NotificationReceipt.objects
+                .filter(is_read=True, created_at__lt=cutoff, id__gt=last_id)
+                .select_related('message')
+                .order_by('id')[:self.chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1].pk
+
+            lines = [
+                json.dumps({
+                    'id': receipt.pk,
+                    'user_id': receipt.user_id,
+                    'message': receipt.message.body,
+                    'is_read': receipt.is_read,
+                    'created_at': receipt.created_at.isoformat(),
+                }) + "\n"
+                for receipt in chunk
+            ]
+
+            # Archive first: a crash between the two steps only duplicates archive lines
+            if archive:
+                archive.writelines(lines)
+                archive.flush()
+
+            with transaction.atomic():
+                deleted, _ = NotificationReceipt.objects.filter(
+                    pk__in=[receipt.pk for receipt in chunk],
+                    is_read=True
+                ).delete()
+
+            removed += deleted
+            reclaimed += deleted * RECEIPT_ROW_BYTES
+            self.sleep()
+
+        return removed, reclaimed
+
+    def coalesce_unread(self):
+        removed = reclaimed = 0
+        for condition, fields in COALESCE_GROUPS:
+            group_removed, group_reclaimed = self.coalesce_groups(condition, fields)
+            removed += group_removed
+            reclaimed += group_reclaimed
+        return removed, reclaimed
+
+    def coalesce_groups(self, condition, fields):
+        # Same user and ``fields``, still unread: keep only the newest receipt,
+        # carrying over how many events the removed ones stood for
+        duplicates = (
+            NotificationReceipt.objects
+            .filter(condition, is_read=False)
+            .values('user_id', *fields)
+            .annotate(total=Count('id'), keep=Max('id'), repeats=Sum('repeat_count'))
+            .filter(total__gt=1)
+            .order_by()
+        )
+
+        removed = reclaimed = 0
+        while True:
+            groups = list(duplicates[:self.chunk_size])
+            removed_in_round = 0
+
+            for group in groups:
+                with transaction.atomic():
+                    deleted, _ = NotificationReceipt.objects.filter(
+                        condition,
+                        user_id=group['user_id'],
+                        is_read=False,
+                        id__lt=group['keep'],
+                        **{field: group[field] for field in fields}
+                    ).delete()
+                    if deleted:
+                        NotificationReceipt.objects.filter(pk=group['keep']).update(
+                            repeat_count=group['repeats']
+                        )
+                        User.objects.filter(pk=group['user_id']).update(
+                            unread_notifications=Greatest(F('unread_notifications') - deleted, Value(0))
+                        )
+
+                removed_in_round += deleted
+                reclaimed += deleted * RECEIPT_ROW_BYTES
+
+            removed += removed_in_round
+            if len(groups) < self.chunk_size or not removed_in_round:
+                break
+            self.sleep()
+
+        return removed, reclaimed
+
+    def remove_orphan_messages(self, cutoff):
+        removed = reclaimed = 0
+
+        while True:
+            orphans = list(
+                NotificationMessage.objects
+                .filter(receipts__isnull=True, created_at__lt=cutoff)
+                .values_list('id', 'body')[:self.chunk_size]
+            )
+            if not orphans:
+                break
+
+            with transaction.atomic():
+                deleted, _ = NotificationMessage.objects.filter(
+                    pk__in=[pk for pk, _ in orphans],
+                    receipts__isnull=True
+                ).delete()
+
+            removed += deleted
+            reclaimed += sum(MESSAGE_ROW_BYTES + len(body.encode()) for _, body in orphans)
+            self.sleep()
+
+        return removed, reclaimed
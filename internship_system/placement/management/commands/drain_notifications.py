@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from placement.notifications import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications from the outbox table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Drain everything that is currently due, then exit (for cron).")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        total_delivered = total_failed = 0
+
+        while True:
+            delivered, failed = drain_outbox(batch_size=options['batch_size'])
+            total_delivered += delivered
+            total_failed += failed
+
+            if delivered + failed >= options['batch_size']:
+                continue  # more may be waiting
+
+            if options['once']:
+                break
+
+            time.sleep(options['interval'])
+
+        self.stdout.write(f"Delivered {total_delivered} notification(s), {total_failed} failed.")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from placement.attendance import attendance_monthly_drift, rebuild_attendance_monthly
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the AttendanceMonthly rollups from the attendance records, "
+        "report how far the stored values had drifted and verify the result."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Only report drift (exit with an error if there is any); change nothing.")
+
+    def handle(self, *args, **options):
+        drift = attendance_monthly_drift()
+        for line in drift:
+            self.stdout.write(f"  {line}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} monthly figure(s) out of date.")
+            self.stdout.write(self.style.SUCCESS("All monthly figures match."))
+            return
+
+        rebuild_attendance_monthly()
+        remaining = attendance_monthly_drift()
+        if remaining:
+            raise CommandError("Monthly figures still differ after the rebuild:\n  " + "\n  ".join(remaining))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt attendance rollups; fixed {len(drift)} figure(s)."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from placement.stats import rebuild_stats, stats_drift
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the SystemStats counters from the underlying tables, "
+        "report how far the stored values had drifted and verify the result."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Only report drift (exit with an error if there is any); change nothing.")
+
+    def handle(self, *args, **options):
+        drift = stats_drift()
+        for line in drift:
+            self.stdout.write(f"  {line}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} counter(s) out of date.")
+            self.stdout.write(self.style.SUCCESS("All counters match."))
+            return
+
+        rebuild_stats()
+        remaining = stats_drift()
+        if remaining:
+            raise CommandError("Counters still differ after the rebuild:\n  " + "\n  ".join(remaining))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics; fixed {len(drift)} counter(s)."))
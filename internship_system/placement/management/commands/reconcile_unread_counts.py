@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from placement.notifications import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Repair drift in the per-user unread notification counters."
+
+    def handle(self, *args, **options):
+        repaired = reconcile_unread_counts()
+        self.stdout.write(f"Repaired unread counters for {repaired} user(s).")
@@ -0,0 +1,134 @@
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from placement.models import (
+    User,
+    Student,
+    AcademicSupervisor,
+    CompanySupervisor,
+    Company,
+    Department,
+    Internship,
+    InternshipApplication,
+    InternshipPlacement,
+)
+from placement.stats import rebuild_stats
+
+DEMO_PASSWORD = '1234'
+
+# company name -> (address, departments)
+COMPANIES = {
+    'Unassigned Company': ('-', []),
+    'Acme Software': ('Kuala Lumpur', ['Engineering', 'Data']),
+    'Globex Consulting': ('Penang', ['Advisory']),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the demo accounts from the README (std1 / cpy1 / acd, password 1234) "
+        "with companies, departments, internships and a placement. Rows are written "
+        "with bulk_create in a single transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=3,
+                            help="Number of demo students (std1, std2, ...).")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        students = max(options['students'], 1)
+        usernames = ['admin', 'acd', 'cpy1'] + [f'std{i}' for i in range(1, students + 1)]
+
+        existing = list(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        if existing:
+            raise CommandError(f"Demo data already present ({', '.join(sorted(existing))}).")
+
+        # Hash once: every demo account shares the same password
+        password = make_password(DEMO_PASSWORD)
+
+        companies = Company.objects.bulk_create([
+            Company(company_name=name, address=address)
+            for name, (address, _) in COMPANIES.items()
+        ])
+        departments = Department.objects.bulk_create([
+            Department(company=company, name=name)
+            for company in companies
+            for name in COMPANIES[company.company_name][1]
+        ])
+
+        # bulk_create skips post_save, so profiles are created explicitly below
+        # and admins are not notified about each demo account
+        users = {
+            user.username: user
+            for user in User.objects.bulk_create([
+                User(username='admin', email='admin@example.com', role='admin',
+                     password=password, is_staff=True, is_superuser=True),
+                User(username='acd', email='acd@example.com', role='academic', password=password),
+                User(username='cpy1', email='cpy1@example.com', role='company', password=password),
+            ] + [
+                User(username=f'std{i}', email=f'std{i}@example.com', role='student', password=password)
+                for i in range(1, students + 1)
+            ])
+        }
+
+        [academic] = AcademicSupervisor.objects.bulk_create([
+            AcademicSupervisor(user=users['acd'], faculty='Computing'),
+        ])
+        [supervisor] = CompanySupervisor.objects.bulk_create([
+            CompanySupervisor(user=users['cpy1'], company=departments[0].company, department=departments[0]),
+        ])
+        student_profiles = Student.objects.bulk_create([
+            Student(user=users[f'std{i}'], program='Software Engineering', semester='6',
+                    academic_supervisor=academic)
+            for i in range(1, students + 1)
+        ])
+
+        internships = Internship.objects.bulk_create([
+            Internship(
+                company=department.company,
+                department=department,
+                title=f'{department.name} Intern',
+                description=f'Join the {department.name.lower()} team at {department.company.company_name}.',
+                location=department.company.address,
+                start_date=date(2026, 1, 5),
+                end_date=date(2026, 4, 3),
+                total_slots=3,
+                status='Open',
+            )
+            for department in departments
+        ])
+
+        # std1 is already placed with cpy1; the others have a pending application
+        InternshipApplication.objects.bulk_create([
+            InternshipApplication(
+                student=student_profiles[0],
+                internship=internships[0],
+                status='Accepted',
+                handled_by=supervisor,
+                student_decision='Accepted',
+            )
+        ] + [
+            InternshipApplication(student=student, internship=internships[0])
+            for student in student_profiles[1:]
+        ])
+        InternshipPlacement.objects.bulk_create([
+            InternshipPlacement(
+                internship=internships[0],
+                student=student_profiles[0],
+                company_supervisor=supervisor,
+                start_date=internships[0].start_date,
+                end_date=internships[0].end_date,
+                status='Active',
+            )
+        ])
+        # bulk_create skips the signals that keep the counters current
+        rebuild_stats()
+
+        self.stdout.write(
+            f"Created {len(users)} users, {len(companies)} companies, {len(departments)} departments, "
+            f"{len(internships)} internships and 1 placement (password: {DEMO_PASSWORD})."
+        )
@@ -0,0 +1,148 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+
+from .models import Student, CompanySupervisor, AcademicSupervisor
+from .profiling import profile_request, wants_profile
+
+logger = logging.getLogger('placement.sql')
+
+# Role -> (profile model, relations views commonly read off the profile)
+ROLE_PROFILES = {
+    'student': (Student, ('academic_supervisor__user',)),
+    'company': (CompanySupervisor, ('company', 'department')),
+    'academic': (AcademicSupervisor, ()),
+}
+
+
+def load_profile(user, **annotations):
+    """
+    Return the role profile for ``user`` (or None), loaded in one query.
+    ``annotations`` are added to that query, so a view that needs figures
+    about the profile can get them in the same round-trip.
+    """
+    if not user.is_authenticated or user.role not in ROLE_PROFILES:
+        return None
+
+    model, related = ROLE_PROFILES[user.role]
+    profile = model.objects.select_related(*related).annotate(**annotations).filter(user=user).first()
+    if profile is not None:
+        # Reuse the request's user; this also caches user.<role profile>
+        profile.user = user
+    return profile
+
+
+class RoleProfileMiddleware:
+    """
+    Expose the logged-in user's Student / CompanySupervisor /
+    AcademicSupervisor as ``request.profile``. It is loaded on first use
+    and then shared by the view, decorators and context processors.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: load_profile(request.user))
+        return self.get_response(request)
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times queries, grouped by shape."""
+
+    # IN (%s, %s, ...) lists vary in length with the data; treat them as one shape
+    IN_LIST = re.compile(r'\((?:%s,\s*)+%s\)')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[self.shape(sql)] += 1
+
+    def shape(self, sql):
+        return ' '.join(self.IN_LIST.sub('(%s, ...)', sql).split())
+
+    def repeated(self, threshold):
+        return [
+            {'count': count, 'sql': shape}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold and shape.startswith('SELECT')
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in (SQL_INSTRUMENTATION = True) per-request SQL accounting for
+    staging. Adds a Server-Timing header with database and total time,
+    and logs a JSON record to the ``placement.sql`` logger for requests
+    slower than SQL_SLOW_REQUEST_MS or that repeat the same SELECT at least
+    SQL_N_PLUS_ONE_THRESHOLD times (a likely N+1 in a view or template).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SQL_SLOW_REQUEST_MS', 500)
+        self.threshold = getattr(settings, 'SQL_N_PLUS_ONE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", total;dur={total_ms:.1f}'
+        )
+
+        repeated = recorder.repeated(self.threshold)
+        if repeated or total_ms >= self.slow_ms:
+            logger.warning(json.dumps({
+                'event': 'n_plus_one' if repeated else 'slow_request',
+                'slow': total_ms >= self.slow_ms,
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'duration_ms': round(total_ms, 1),
+                'db_ms': round(db_ms, 1),
+                'queries': recorder.count,
+                'repeated_queries': repeated,
+            }))
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Profile a single request when an admin asks for it with ?profile=1 or
+    an X-Profile header (see placement.profiling). Other requests go
+    straight through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if wants_profile(request) and request.user.is_authenticated and request.user.role == 'admin':
+            return profile_request(request, self.get_response)
+        return self.get_response(request)
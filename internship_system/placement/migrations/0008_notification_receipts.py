@@ -0,0 +1,92 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def split_notifications(apps, schema_editor):
+    Notification = apps.get_model('placement', 'Notification')
+    NotificationMessage = apps.get_model('placement', 'NotificationMessage')
+    NotificationReceipt = apps.get_model('placement', 'NotificationReceipt')
+
+    # Identical texts (e.g. the same admin broadcast) share one message row
+    message_ids = {}
+    receipts = []
+
+    for note in Notification.objects.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        if note.message not in message_ids:
+            message_ids[note.message] = NotificationMessage.objects.create(
+                body=note.message,
+                created_at=note.created_at
+            ).id
+
+        receipts.append(NotificationReceipt(
+            user_id=note.user_id,
+            message_id=message_ids[note.message],
+            is_read=note.is_read,
+            created_at=note.created_at
+        ))
+        if len(receipts) >= BATCH_SIZE:
+            NotificationReceipt.objects.bulk_create(receipts)
+            receipts = []
+
+    NotificationReceipt.objects.bulk_create(receipts)
+
+
+def join_notifications(apps, schema_editor):
+    Notification = apps.get_model('placement', 'Notification')
+    NotificationReceipt = apps.get_model('placement', 'NotificationReceipt')
+
+    # Historical model only: keep the original timestamps instead of "now"
+    Notification._meta.get_field('created_at').auto_now_add = False
+
+    notes = []
+    receipts = NotificationReceipt.objects.select_related('message').order_by('id')
+    for receipt in receipts.iterator(chunk_size=BATCH_SIZE):
+        notes.append(Notification(
+            user_id=receipt.user_id,
+            message=receipt.message.body,
+            is_read=receipt.is_read,
+            created_at=receipt.created_at
+        ))
+        if len(notes) >= BATCH_SIZE:
+            Notification.objects.bulk_create(notes)
+            notes = []
+
+    Notification.objects.bulk_create(notes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0007_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotificationReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='placement.notificationmessage')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(split_notifications, join_notifications),
+        migrations.DeleteModel(
+            name='Notification',
+        ),
+    ]
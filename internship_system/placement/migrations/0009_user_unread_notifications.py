@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_unread(apps, schema_editor):
+    User = apps.get_model('placement', 'User')
+    NotificationReceipt = apps.get_model('placement', 'NotificationReceipt')
+
+    User.objects.update(unread_notifications=Coalesce(Subquery(
+        NotificationReceipt.objects
+        .filter(user=OuterRef('pk'), is_read=False)
+        .values('user')
+        .annotate(total=Count('id'))
+        .values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0008_notification_receipts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0009_user_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificationreceipt',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='receipt_user_read_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationreceipt',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='receipt_user_created'),
+        ),
+    ]
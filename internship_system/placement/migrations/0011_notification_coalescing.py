@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0010_notificationreceipt_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationmessage',
+            name='kind',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='notificationmessage',
+            name='subject',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='kind',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='subject',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notificationreceipt',
+            name='repeat_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+# The counters as of this migration: model -> (path to its company, {counter: condition})
+COUNTED = {
+    'InternshipApplication': ('internship__company', {
+        'applications_total': Q(),
+        'applications_pending': Q(status='Pending'),
+        'applications_accepted': Q(status='Accepted'),
+        'applications_rejected': Q(status='Rejected'),
+        'applications_offered': Q(status='Offered'),
+    }),
+    'InternshipPlacement': ('internship__company', {
+        'placements_total': Q(),
+        'placements_active': Q(status='Active'),
+        'placements_completed': Q(status='Completed'),
+    }),
+    'Logbook': ('application__internship__company', {
+        'logbooks_total': Q(),
+        'logbooks_pending': Q(status='Pending'),
+        'logbooks_approved': Q(status='Approved'),
+        'logbooks_rejected': Q(status='Rejected'),
+    }),
+    'Attendance': ('placement__internship__company', {
+        'attendance_total': Q(),
+    }),
+    'PerformanceEvaluation': ('application__internship__company', {
+        'evaluations_total': Q(),
+        'evaluations_pending': Q(company_supervisor_submitted_at__isnull=True)
+        | Q(academic_supervisor_submitted_at__isnull=True),
+    }),
+}
+
+
+def count_stats(apps, schema_editor):
+    # Frozen here rather than calling placement.stats, which follows the current models
+    fields = [name for _, counters in COUNTED.values() for name in counters]
+    companies = {
+        pk: dict.fromkeys(fields, 0)
+        for pk in apps.get_model('placement', 'Company').objects.values_list('pk', flat=True)
+    }
+    system = dict.fromkeys(fields, 0)
+
+    for model_name, (path, counters) in COUNTED.items():
+        model = apps.get_model('placement', model_name)
+        aggregates = {
+            name: Count('id', filter=condition) if condition else Count('id')
+            for name, condition in counters.items()
+        }
+        for row in model.objects.values(path).annotate(**aggregates).order_by():
+            company_id = row.pop(path)
+            for name, value in row.items():
+                system[name] += value
+                if company_id in companies:
+                    companies[company_id][name] += value
+
+    now = timezone.now()
+    apps.get_model('placement', 'SystemStats').objects.update_or_create(pk=1, defaults=dict(system, rebuilt_at=now))
+    CompanyStats = apps.get_model('placement', 'CompanyStats')
+    CompanyStats.objects.bulk_create([
+        CompanyStats(company_id=pk, rebuilt_at=now, **counts) for pk, counts in companies.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0011_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyStats',
+            fields=[
+                ('applications_total', models.IntegerField(default=0)),
+                ('applications_pending', models.IntegerField(default=0)),
+                ('applications_accepted', models.IntegerField(default=0)),
+                ('applications_rejected', models.IntegerField(default=0)),
+                ('applications_offered', models.IntegerField(default=0)),
+                ('placements_total', models.IntegerField(default=0)),
+                ('placements_active', models.IntegerField(default=0)),
+                ('placements_completed', models.IntegerField(default=0)),
+                ('logbooks_total', models.IntegerField(default=0)),
+                ('logbooks_pending', models.IntegerField(default=0)),
+                ('logbooks_approved', models.IntegerField(default=0)),
+                ('logbooks_rejected', models.IntegerField(default=0)),
+                ('attendance_total', models.IntegerField(default=0)),
+                ('evaluations_total', models.IntegerField(default=0)),
+                ('evaluations_pending', models.IntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='placement.company')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SystemStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('applications_total', models.IntegerField(default=0)),
+                ('applications_pending', models.IntegerField(default=0)),
+                ('applications_accepted', models.IntegerField(default=0)),
+                ('applications_rejected', models.IntegerField(default=0)),
+                ('applications_offered', models.IntegerField(default=0)),
+                ('placements_total', models.IntegerField(default=0)),
+                ('placements_active', models.IntegerField(default=0)),
+                ('placements_completed', models.IntegerField(default=0)),
+                ('logbooks_total', models.IntegerField(default=0)),
+                ('logbooks_pending', models.IntegerField(default=0)),
+                ('logbooks_approved', models.IntegerField(default=0)),
+                ('logbooks_rejected', models.IntegerField(default=0)),
+                ('attendance_total', models.IntegerField(default=0)),
+                ('evaluations_total', models.IntegerField(default=0)),
+                ('evaluations_pending', models.IntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(count_stats, migrations.RunPython.noop),
+    ]
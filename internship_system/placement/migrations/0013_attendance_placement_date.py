@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:06
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    # Keep the oldest row of each (placement, date), spanning the earliest
+    # check-in and latest check-out of its duplicates
+    Attendance = apps.get_model('placement', 'Attendance')
+    duplicates = list(
+        Attendance.objects
+        .values('placement', 'date', 'placement__internship__company')
+        .annotate(rows=Count('id'), keep=Min('id'), first_in=Min('check_in'), last_out=Max('check_out'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+
+    removed = Counter()
+    for group in duplicates:
+        Attendance.objects.filter(pk=group['keep']).update(
+            check_in=group['first_in'], check_out=group['last_out']
+        )
+        removed[group['placement__internship__company']] += Attendance.objects.filter(
+            placement=group['placement'], date=group['date']
+        ).exclude(pk=group['keep']).delete()[0]
+
+    if not removed:
+        return
+    # The deleted rows were counted in attendance_total (placement.stats)
+    apps.get_model('placement', 'SystemStats').objects.update(
+        attendance_total=F('attendance_total') - sum(removed.values())
+    )
+    CompanyStats = apps.get_model('placement', 'CompanyStats')
+    for company_id, count in removed.items():
+        CompanyStats.objects.filter(company=company_id).update(attendance_total=F('attendance_total') - count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0012_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('placement', 'date'), name='attendance_placement_date'),
+        ),
+    ]
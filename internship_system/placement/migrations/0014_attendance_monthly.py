@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractHour, ExtractMinute, ExtractMonth, ExtractYear
+
+
+def minutes(field):
+    return ExtractHour(field) * 60 + ExtractMinute(field)
+
+
+def count_months(apps, schema_editor):
+    # A frozen copy of placement.attendance.count_attendance_monthly as of this migration
+    Attendance = apps.get_model('placement', 'Attendance')
+    AttendanceMonthly = apps.get_model('placement', 'AttendanceMonthly')
+
+    weekdays = set(getattr(settings, 'ATTENDANCE_WORKING_WEEKDAYS', (0, 1, 2, 3, 4)))
+    holidays = set(getattr(settings, 'ATTENDANCE_HOLIDAYS', ()))
+    late_after = Attendance._meta.get_field('check_in').to_python(getattr(settings, 'ATTENDANCE_LATE_AFTER', '09:00'))
+
+    rows = (
+        Attendance.objects
+        .filter(date__gte=F('placement__start_date'), date__lte=F('placement__end_date'))
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('placement', 'year', 'month')
+        .annotate(
+            present_days=Count('id'),
+            # Django numbers week days from Sunday = 1; Python from Monday = 0
+            present_working_days=Count('id', filter=Q(
+                date__week_day__in=[(day + 1) % 7 + 1 for day in weekdays]
+            ) & ~Q(date__in=holidays)),
+            late_days=Count('id', filter=Q(check_in__gt=late_after)),
+            total_minutes=Coalesce(Sum(
+                minutes('check_out') - minutes('check_in'), filter=Q(check_out__gt=F('check_in'))
+            ), Value(0)),
+        )
+        .order_by()
+    )
+    AttendanceMonthly.objects.bulk_create([
+        AttendanceMonthly(placement_id=row.pop('placement'), **row) for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0013_attendance_placement_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('present_days', models.IntegerField(default=0)),
+                ('present_working_days', models.IntegerField(default=0)),
+                ('late_days', models.IntegerField(default=0)),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('placement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_months', to='placement.internshipplacement')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('placement', 'year', 'month'), name='attendance_monthly_placement_month')],
+            },
+        ),
+        migrations.RunPython(count_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placement', '0014_attendance_monthly'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='CompanyStats',
+        ),
+    ]
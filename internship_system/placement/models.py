@@ -1,6 +1,62 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+class TrackedFieldsMixin:
+    """
+    Remember the database values of ``tracked_fields`` when an instance is
+    loaded, so signals can tell what changed without re-fetching the row.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # Loading a deferred field refreshes just that field; keep the others' snapshots
+        self._snapshot_tracked_fields(fields)
+
+    def _snapshot_tracked_fields(self, fields=None):
+        if fields is None or not hasattr(self, '_original_values'):
+            self._original_values = {}
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            if fields is not None and name not in fields and attname not in fields:
+                continue
+            # Deferred fields are not loaded, so there is nothing to compare against
+            if attname in self.__dict__:
+                self._original_values[name] = self.__dict__[attname]
+
+    def previous(self, field):
+        """Value of ``field`` when the instance was loaded or last saved."""
+        if field not in self.tracked_fields:
+            raise ValueError(f"{field} is not tracked on {type(self).__name__}")
+        return getattr(self, '_original_values', {}).get(field)
+
+    def has_changed(self, field):
+        """
+        Whether ``field`` differs from its loaded value. Without a snapshot (an
+        instance built in memory, or a field that was never loaded) the answer
+        is unknown, and is reported as unchanged.
+        """
+        if field not in self.tracked_fields:
+            raise ValueError(f"{field} is not tracked on {type(self).__name__}")
+        original_values = getattr(self, '_original_values', {})
+        if field not in original_values:
+            return False
+        attname = self._meta.get_field(field).attname
+        return original_values[field] != getattr(self, attname)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the old values by now
+        self._snapshot_tracked_fields()
+
 
 # Custom User Model
 class User(AbstractUser):
@@ -12,6 +68,21 @@ class User(AbstractUser):
     ]
 
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, blank=True, null=True)
+    # Denormalized count of unread NotificationReceipts, see placement.notifications
+    unread_notifications = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        # The unread counter only changes through F() updates; writing back the
+        # loaded value would undo notifications delivered since. Name it in
+        # update_fields to save it anyway.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'unread_notifications' and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.username
     
@@ -125,7 +196,9 @@ class Internship(models.Model):
         return self.title
     
 # Internship Application
-class InternshipApplication(models.Model):
+class InternshipApplication(TrackedFieldsMixin, models.Model):
+    tracked_fields = ('status', 'handled_by')
+
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
         ('Accepted', 'Accepted'),
@@ -155,14 +228,57 @@ class InternshipApplication(models.Model):
     def __str__(self):
         return f"{self.student} - {self.internship}"
     
-class Notification(models.Model):
+# Notification text, stored once no matter how many users receive it
+class NotificationMessage(models.Model):
+    body = models.TextField()
+    # Optional coalescing key, see placement.notifications.notify
+    kind = models.CharField(max_length=50, blank=True, default='')
+    subject = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.body
+
+
+# One row per recipient of a NotificationMessage
+class NotificationReceipt(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    message = models.TextField()
+    message = models.ForeignKey(NotificationMessage, on_delete=models.CASCADE, related_name='receipts')
     is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Number of coalesced events this row stands for
+    repeat_count = models.PositiveIntegerField(default=1)
+
+    @property
+    def display_message(self):
+        if self.repeat_count > 1:
+            return f"{self.message.body} (x{self.repeat_count})"
+        return self.message.body
+
+    class Meta:
+        indexes = [
+            # Unread filtering / mark-as-read
+            models.Index(fields=['user', 'is_read', 'created_at'], name='receipt_user_read_created'),
+            # Keyset-paginated inbox, newest first
+            models.Index(fields=['user', '-created_at', '-id'], name='receipt_user_created'),
+        ]
+
+
+# Notifications waiting to be written by the drain_notifications worker
+class NotificationOutbox(models.Model):
+    recipients = models.JSONField()
+    message = models.TextField()
+    kind = models.CharField(max_length=50, blank=True, default='')
+    subject = models.CharField(max_length=100, blank=True, default='')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
 # Internship Placement
-class InternshipPlacement(models.Model):
+class InternshipPlacement(TrackedFieldsMixin, models.Model):
+    tracked_fields = ('status', 'company_supervisor', 'start_date', 'end_date')
+
     STATUS_CHOICES = [
         ('Active', 'Active'),
         ('Completed', 'Completed'),
@@ -178,7 +294,9 @@ class InternshipPlacement(models.Model):
     updated_at = models.DateTimeField(null=True, blank=True)
 
 # Attendance
-class Attendance(models.Model):
+class Attendance(TrackedFieldsMixin, models.Model):
+    tracked_fields = ('placement', 'date', 'check_in', 'check_out')
+
     placement = models.ForeignKey(InternshipPlacement, on_delete=models.CASCADE)
     date = models.DateField()
     check_in = models.TimeField()
@@ -186,8 +304,15 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            # One record per intern per day; check-ins upsert against it (placement.attendance)
+            models.UniqueConstraint(fields=['placement', 'date'], name='attendance_placement_date'),
+        ]
+
 # Logbook
-class Logbook(models.Model):
+class Logbook(TrackedFieldsMixin, models.Model):
+    tracked_fields = ('status',)
 
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
@@ -209,7 +334,9 @@ class Logbook(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
 
 # Performance Evaluation
-class PerformanceEvaluation(models.Model):
+class PerformanceEvaluation(TrackedFieldsMixin, models.Model):
+    tracked_fields = ('company_supervisor_submitted_at', 'academic_supervisor_submitted_at')
+
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     company_supervisor = models.ForeignKey(CompanySupervisor, on_delete=models.CASCADE)
     academic_supervisor = models.ForeignKey(AcademicSupervisor, on_delete=models.CASCADE)
@@ -229,4 +356,50 @@ class Document(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     file = models.FileField(upload_to='documents/')
     doc_type = models.CharField(max_length=50)
-    upload_date = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    upload_date = models.DateTimeField(auto_now_add=True)
+
+
+# Counters kept current by placement.stats; rebuild with `python manage.py rebuild_stats`
+class StatsCounters(models.Model):
+    applications_total = models.IntegerField(default=0)
+    applications_pending = models.IntegerField(default=0)
+    applications_accepted = models.IntegerField(default=0)
+    applications_rejected = models.IntegerField(default=0)
+    applications_offered = models.IntegerField(default=0)
+    placements_total = models.IntegerField(default=0)
+    placements_active = models.IntegerField(default=0)
+    placements_completed = models.IntegerField(default=0)
+    logbooks_total = models.IntegerField(default=0)
+    logbooks_pending = models.IntegerField(default=0)
+    logbooks_approved = models.IntegerField(default=0)
+    logbooks_rejected = models.IntegerField(default=0)
+    attendance_total = models.IntegerField(default=0)
+    evaluations_total = models.IntegerField(default=0)
+    evaluations_pending = models.IntegerField(default=0)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+# Site-wide totals, a single row
+class SystemStats(StatsCounters):
+    ROW_ID = 1
+
+
+# One placement's attendance in one month, kept current by placement.attendance;
+# rebuild with `python manage.py rebuild_attendance_monthly`
+class AttendanceMonthly(models.Model):
+    placement = models.ForeignKey(InternshipPlacement, on_delete=models.CASCADE, related_name='attendance_months')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    present_days = models.IntegerField(default=0)
+    # Of present_days, those on working days (absences are working days minus these)
+    present_working_days = models.IntegerField(default=0)
+    late_days = models.IntegerField(default=0)
+    total_minutes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['placement', 'year', 'month'], name='attendance_monthly_placement_month'),
+        ]
@@ -0,0 +1,240 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import User, NotificationMessage, NotificationReceipt, NotificationOutbox
+
+INBOX_PAGE_SIZE = 20
+INBOX_MAX_PAGE_SIZE = 100
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Retry delay doubles per failed attempt, capped at RETRY_MAX_SECONDS
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+
+def admin_recipients():
+    return User.objects.filter(role='admin')
+
+
+def _recipient_ids(recipients):
+    # Accept a single user, a queryset of users or any iterable of users / ids
+    if recipients is None:
+        return []
+    if isinstance(recipients, QuerySet):
+        return list(recipients.values_list('pk', flat=True))
+    if isinstance(recipients, (User, int)):
+        recipients = [recipients]
+
+    ids = []
+    seen = set()
+    for recipient in recipients:
+        if recipient is None:
+            continue
+        user_id = recipient if isinstance(recipient, int) else recipient.pk
+        if user_id not in seen:
+            seen.add(user_id)
+            ids.append(user_id)
+    return ids
+
+
+def notify(recipients, message, kind='', subject=''):
+    """
+    Send the same message to every recipient.
+
+    With NOTIFICATION_OUTBOX enabled the message is queued once the current
+    transaction commits and written later by ``manage.py drain_notifications``;
+    otherwise it is written straight away with a single bulk INSERT.
+
+    Messages with a ``kind`` are coalesced: a repeat of the same kind and
+    ``subject`` for a recipient who still has an unread one from within
+    NOTIFICATION_COALESCE_WINDOW seconds bumps that row's counter instead
+    of adding a new row.
+    """
+    user_ids = _recipient_ids(recipients)
+    if not user_ids:
+        return
+
+    if getattr(settings, 'NOTIFICATION_OUTBOX', False):
+        transaction.on_commit(
+            lambda: NotificationOutbox.objects.create(
+                recipients=user_ids,
+                message=message,
+                kind=kind,
+                subject=subject
+            )
+        )
+    else:
+        deliver(user_ids, message, kind, subject)
+
+
+def notify_admins(message):
+    notify(admin_recipients(), message)
+
+
+def deliver(user_ids, message, kind='', subject=''):
+    # The text is stored once; each recipient only gets a slim receipt row
+    if not user_ids:
+        return []
+
+    # One transaction, so compact_notifications never sees the message without its receipts
+    with transaction.atomic():
+        return _deliver(user_ids, message, kind, subject)
+
+
+def _deliver(user_ids, message, kind, subject):
+    notification_message = NotificationMessage.objects.create(body=message, kind=kind, subject=subject)
+
+    window = getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', 0)
+    if kind and window:
+        repeats = dict(
+            NotificationReceipt.objects.filter(
+                user_id__in=user_ids,
+                is_read=False,
+                created_at__gte=notification_message.created_at - timedelta(seconds=window),
+                message__kind=kind,
+                message__subject=subject
+            ).values_list('user_id', 'pk')
+        )
+        if repeats:
+            # Keep one row per recipient, showing the latest text and how many events it covers;
+            # moving created_at up re-sorts it in the inbox and re-sends it on the stream
+            NotificationReceipt.objects.filter(pk__in=repeats.values()).update(
+                message=notification_message,
+                repeat_count=F('repeat_count') + 1,
+                created_at=notification_message.created_at
+            )
+            user_ids = [user_id for user_id in user_ids if user_id not in repeats]
+
+    receipts = NotificationReceipt.objects.bulk_create([
+        NotificationReceipt(
+            user_id=user_id,
+            message=notification_message,
+            created_at=notification_message.created_at
+        )
+        for user_id in user_ids
+    ])
+    if user_ids:
+        User.objects.filter(pk__in=user_ids).update(
+            unread_notifications=F('unread_notifications') + 1
+        )
+    return receipts
+
+
+def mark_read(user, receipts):
+    """Mark the user's unread receipts in ``receipts`` as read and update their counter."""
+    marked = receipts.filter(user=user, is_read=False).update(is_read=True)
+    if marked:
+        User.objects.filter(pk=user.pk).update(
+            unread_notifications=Greatest(F('unread_notifications') - marked, Value(0))
+        )
+        user.unread_notifications = max(user.unread_notifications - marked, 0)
+    return marked
+
+
+def encode_cursor(receipt):
+    micros = (receipt.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{receipt.pk}"
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = cursor.split('.')
+        return _EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def inbox_page(user, cursor=None, limit=INBOX_PAGE_SIZE, status=None):
+    """
+    One page of the user's inbox, newest first, using keyset pagination on
+    (created_at, id) so the cost does not depend on how old the account is.
+    Returns (receipts, next_cursor); next_cursor is None on the last page.
+    """
+    limit = max(1, min(limit, INBOX_MAX_PAGE_SIZE))
+    receipts = NotificationReceipt.objects.filter(user=user).select_related('message')
+
+    if status == 'unread':
+        receipts = receipts.filter(is_read=False)
+    elif status == 'read':
+        receipts = receipts.filter(is_read=True)
+
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        receipts = receipts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    page = list(receipts.order_by('-created_at', '-id')[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def unread_count_subquery():
+    return Coalesce(Subquery(
+        NotificationReceipt.objects
+        .filter(user=OuterRef('pk'), is_read=False)
+        .values('user')
+        .annotate(total=Count('id'))
+        .values('total')
+    ), 0)
+
+
+def reconcile_unread_counts():
+    """Recompute drifted unread counters from the receipts table; returns the users fixed."""
+    drifted = list(
+        User.objects
+        .annotate(actual=unread_count_subquery())
+        .exclude(unread_notifications=F('actual'))
+        .values_list('pk', flat=True)
+    )
+    if drifted:
+        User.objects.filter(pk__in=drifted).update(unread_notifications=unread_count_subquery())
+    return len(drifted)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def drain_outbox(batch_size=100):
+    """
+    Deliver one batch of due outbox entries.
+
+    Entries are only removed in the same transaction that writes their
+    notifications, so a crash at any point leaves them to be picked up
+    again (at-least-once). Failed entries are rescheduled with backoff.
+    Returns a (delivered, failed) tuple.
+    """
+    delivered = failed = 0
+
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(available_at__lte=timezone.now())
+            .order_by('id')[:batch_size]
+        )
+
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    # Users may have been deleted since the message was queued
+                    user_ids = User.objects.filter(
+                        pk__in=entry.recipients
+                    ).values_list('pk', flat=True)
+                    deliver(list(user_ids), entry.message, entry.kind, entry.subject)
+                    entry.delete()
+                delivered += 1
+            except Exception as exc:
+                entry.attempts += 1
+                entry.available_at = timezone.now() + retry_delay(entry.attempts)
+                entry.last_error = repr(exc)
+                entry.save(update_fields=['attempts', 'available_at', 'last_error'])
+                failed += 1
+
+    return delivered, failed
@@ -0,0 +1,175 @@
+"""
+On-demand request profiling for admins.
+
+Add ``?profile=1`` to any URL (or send an ``X-Profile: 1`` header) while
+logged in as an admin and the request runs under cProfile. The result is
+written to PROFILE_DIR as a .prof file (loadable with pstats / snakeviz)
+plus a JSON summary that splits the wall time into SQL, template
+rendering and the remaining Python, and is listed on manager/profiles/.
+Requests without the switch only pay for the check itself.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+from django.utils import timezone
+
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+# ?profile=0 and friends leave profiling off
+OFF_VALUES = {'', '0', 'false', 'no', 'off'}
+TOP_FUNCTIONS = 40
+
+PROFILE_NAME = re.compile(r'^[\w-]+$')
+
+_TEMPLATE_RENDER = Template.render.__code__
+
+
+def profile_dir():
+    return getattr(settings, 'PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def _switched_on(value):
+    return value is not None and value.strip().lower() not in OFF_VALUES
+
+
+def wants_profile(request):
+    return _switched_on(request.GET.get(PROFILE_PARAM)) or _switched_on(request.META.get(PROFILE_HEADER))
+
+
+def _in_template():
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code is _TEMPLATE_RENDER:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class SQLTimer:
+    """execute_wrapper that also notes how much SQL ran while a template was rendering."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.in_templates = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if _in_template():
+                self.in_templates += elapsed
+
+
+def template_seconds(stats):
+    # cProfile's cumulative time already folds in nested renders ({% include %}, {% extends %})
+    key = (_TEMPLATE_RENDER.co_filename, _TEMPLATE_RENDER.co_firstlineno, _TEMPLATE_RENDER.co_name)
+    if key in stats.stats:
+        return stats.stats[key][3]
+    return 0.0
+
+
+def profile_request(request, get_response):
+    """Run the request under cProfile and save the profile; returns the response."""
+    profiler = cProfile.Profile()
+    timer = SQLTimer()
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        started = time.perf_counter()
+        response = profiler.runcall(get_response, request)
+        total = time.perf_counter() - started
+
+    stats = pstats.Stats(profiler)
+    template = max(template_seconds(stats) - timer.in_templates, 0.0)
+    python = max(total - timer.duration - template, 0.0)
+
+    name = save_profile(profiler, stats, {
+        'path': request.get_full_path(),
+        'method': request.method,
+        'user': request.user.username,
+        'status': response.status_code,
+        'created_at': timezone.now().isoformat(),
+        'total_ms': round(total * 1000, 1),
+        'sql_ms': round(timer.duration * 1000, 1),
+        'sql_queries': timer.count,
+        'template_ms': round(template * 1000, 1),
+        'python_ms': round(python * 1000, 1),
+    })
+    response['X-Profile-Id'] = name
+    return response
+
+
+def save_profile(profiler, stats, summary):
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    slug = re.sub(r'[^a-z0-9]+', '-', summary['path'].split('?')[0].lower()).strip('-')[:60] or 'root'
+    name = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{slug}"
+
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    summary['top_functions'] = out.getvalue()
+
+    profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+    with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+        json.dump(dict(summary, name=name), f)
+
+    prune_profiles(directory)
+    return name
+
+
+def prune_profiles(directory):
+    keep = getattr(settings, 'PROFILE_KEEP', 100)
+    names = sorted(f[:-5] for f in os.listdir(directory) if f.endswith('.json'))
+    for name in names[:-keep] if keep else []:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for filename in sorted(os.listdir(directory), reverse=True):
+        if filename.endswith('.json'):
+            with open(os.path.join(directory, filename)) as f:
+                summary = json.load(f)
+            summary.pop('top_functions', None)
+            summaries.append(summary)
+    return summaries
+
+
+def read_profile(name):
+    """The JSON summary for ``name``, or None if there is no such profile."""
+    if not PROFILE_NAME.match(name):
+        return None
+    try:
+        with open(os.path.join(profile_dir(), f"{name}.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def profile_path(name):
+    return os.path.join(profile_dir(), f"{name}.prof")
@@ -1,6 +1,10 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import User, Student, AcademicSupervisor, CompanySupervisor, Company, Internship, InternshipApplication, InternshipPlacement, Logbook, PerformanceEvaluation, Notification, Document
+from .models import User, Student, AcademicSupervisor, CompanySupervisor, Company, Department, Internship, InternshipApplication, InternshipPlacement, Logbook, Attendance, PerformanceEvaluation, Document
+from .attendance import attendance_values, rebuild_attendance_monthly, record_attendance_changes
+from .dashboard import invalidate_admin_dashboard, invalidate_company_dashboards
+from .notifications import notify_admins
+from .stats import record_save, record_delete
 
 
 @receiver(post_save, sender=User)
@@ -28,12 +32,7 @@ def create_role_profile(sender, instance, created, **kwargs):
         )
 
     # Notify admins of new user registration
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"New {instance.role} user registered: {instance.username} ({instance.email})"
-        )
+    notify_admins(f"New {instance.role} user registered: {instance.username} ({instance.email})")
 
 
 @receiver(post_save, sender=Company)
@@ -41,12 +40,7 @@ def notify_new_company(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"New company registered: {instance.company_name} at {instance.address}"
-        )
+    notify_admins(f"New company registered: {instance.company_name} at {instance.address}")
 
 
 @receiver(post_save, sender=Internship)
@@ -54,12 +48,7 @@ def notify_new_internship(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"New internship posted: '{instance.title}' by {instance.company.company_name}"
-        )
+    notify_admins(f"New internship posted: '{instance.title}' by {instance.company.company_name}")
 
 
 @receiver(post_save, sender=InternshipApplication)
@@ -67,12 +56,7 @@ def notify_new_application(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"New internship application: {instance.student.user.username} applied for '{instance.internship.title}'"
-        )
+    notify_admins(f"New internship application: {instance.student.user.username} applied for '{instance.internship.title}'")
 
 
 @receiver(post_save, sender=InternshipApplication)
@@ -82,30 +66,18 @@ def notify_application_status_change(sender, instance, created, **kwargs):
         return
 
     # Check if status changed
-    if hasattr(instance, '_original_status'):
-        if instance._original_status != instance.status:
-            admins = User.objects.filter(role='admin')
-            status_messages = {
-                'Accepted': f"Application accepted: {instance.student.user.username}'s application for '{instance.internship.title}' was accepted",
-                'Rejected': f"Application rejected: {instance.student.user.username}'s application for '{instance.internship.title}' was rejected",
-                'Offered': f"Offer made: {instance.student.user.username} received an offer for '{instance.internship.title}'"
-            }
-            if instance.status in status_messages:
-                for admin in admins:
-                    Notification.objects.create(
-                        user=admin,
-                        message=status_messages[instance.status]
-                    )
+    if instance.has_changed('status'):
+        status_messages = {
+            'Accepted': f"Application accepted: {instance.student.user.username}'s application for '{instance.internship.title}' was accepted",
+            'Rejected': f"Application rejected: {instance.student.user.username}'s application for '{instance.internship.title}' was rejected",
+            'Offered': f"Offer made: {instance.student.user.username} received an offer for '{instance.internship.title}'"
+        }
+        if instance.status in status_messages:
+            notify_admins(status_messages[instance.status])
 
     # Check if handled_by changed (supervisor assigned)
-    if hasattr(instance, '_original_handled_by'):
-        if instance._original_handled_by != instance.handled_by and instance.handled_by:
-            admins = User.objects.filter(role='admin')
-            for admin in admins:
-                Notification.objects.create(
-                    user=admin,
-                    message=f"Supervisor assigned: {instance.handled_by.user.username} assigned to review {instance.student.user.username}'s application for '{instance.internship.title}'"
-                )
+    if instance.has_changed('handled_by') and instance.handled_by:
+        notify_admins(f"Supervisor assigned: {instance.handled_by.user.username} assigned to review {instance.student.user.username}'s application for '{instance.internship.title}'")
 
 
 @receiver(post_save, sender=Logbook)
@@ -115,19 +87,13 @@ def notify_logbook_status_change(sender, instance, created, **kwargs):
         return
 
     # Check if status changed
-    if hasattr(instance, '_original_status'):
-        if instance._original_status != instance.status:
-            admins = User.objects.filter(role='admin')
-            status_messages = {
-                'Approved': f"Logbook approved: Week {instance.week_no} logbook by {instance.student.user.username} was approved",
-                'Rejected': f"Logbook rejected: Week {instance.week_no} logbook by {instance.student.user.username} was rejected"
-            }
-            if instance.status in status_messages:
-                for admin in admins:
-                    Notification.objects.create(
-                        user=admin,
-                        message=status_messages[instance.status]
-                    )
+    if instance.has_changed('status'):
+        status_messages = {
+            'Approved': f"Logbook approved: Week {instance.week_no} logbook by {instance.student.user.username} was approved",
+            'Rejected': f"Logbook rejected: Week {instance.week_no} logbook by {instance.student.user.username} was rejected"
+        }
+        if instance.status in status_messages:
+            notify_admins(status_messages[instance.status])
 
 
 @receiver(post_save, sender=InternshipPlacement)
@@ -135,12 +101,7 @@ def notify_new_placement(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"New internship placement: {instance.student.user.username} placed at {instance.company_supervisor.company.company_name}"
-        )
+    notify_admins(f"New internship placement: {instance.student.user.username} placed at {instance.company_supervisor.company.company_name}")
 
 
 @receiver(post_save, sender=Logbook)
@@ -148,12 +109,7 @@ def notify_new_logbook(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"New logbook submitted: Week {instance.week_no} by {instance.student.user.username}"
-        )
+    notify_admins(f"New logbook submitted: Week {instance.week_no} by {instance.student.user.username}")
 
 
 @receiver(post_save, sender=PerformanceEvaluation)
@@ -161,12 +117,7 @@ def notify_evaluation_submitted(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"Performance evaluation submitted for {instance.student.user.username} by {instance.company_supervisor.user.username}"
-        )
+    notify_admins(f"Performance evaluation submitted for {instance.student.user.username} by {instance.company_supervisor.user.username}")
 
 
 @receiver(post_save, sender=Document)
@@ -174,35 +125,97 @@ def notify_document_upload(sender, instance, created, **kwargs):
     if not created:
         return
 
-    admins = User.objects.filter(role='admin')
-    for admin in admins:
-        Notification.objects.create(
-            user=admin,
-            message=f"Document uploaded: {instance.student.user.username} uploaded a {instance.doc_type} document"
-        )
-def store_original_application_status(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            original = InternshipApplication.objects.get(pk=instance.pk)
-            instance._original_status = original.status
-            instance._original_handled_by = original.handled_by
-        except InternshipApplication.DoesNotExist:
-            instance._original_status = None
-            instance._original_handled_by = None
-    else:
-        instance._original_status = None
-        instance._original_handled_by = None
-
-
-@receiver(pre_save, sender=Logbook)
-def store_original_logbook_status(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            original = Logbook.objects.get(pk=instance.pk)
-            instance._original_status = original.status
-        except Logbook.DoesNotExist:
-            instance._original_status = None
-    else:
-        instance._original_status = None
+    notify_admins(f"Document uploaded: {instance.student.user.username} uploaded a {instance.doc_type} document")
+
+
+# Models counted on the admin dashboard; any change drops the cached snapshot
+DASHBOARD_MODELS = (User, Company, Department, Internship, InternshipApplication, InternshipPlacement, Logbook, Attendance, PerformanceEvaluation)
+
+
+def refresh_admin_dashboard(sender, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which the dashboard doesn't count
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_admin_dashboard()
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(refresh_admin_dashboard, sender=model, dispatch_uid=f'admin_dashboard_save_{model.__name__}')
+    post_delete.connect(refresh_admin_dashboard, sender=model, dispatch_uid=f'admin_dashboard_delete_{model.__name__}')
+
+
+# Models counted in SystemStats, see placement.stats
+STATS_MODELS = (InternshipApplication, InternshipPlacement, Logbook, Attendance, PerformanceEvaluation)
+
+
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_save(instance, created)
+
+
+def update_stats_on_delete(sender, instance, **kwargs):
+    record_delete(instance)
 
 
+for model in STATS_MODELS:
+    post_save.connect(update_stats_on_save, sender=model, dispatch_uid=f'stats_save_{model.__name__}')
+    post_delete.connect(update_stats_on_delete, sender=model, dispatch_uid=f'stats_delete_{model.__name__}')
+
+
+# Company dashboards: drop the cached figures of the supervisors a write affects
+
+@receiver([post_save, post_delete], sender=Attendance)
+def refresh_dashboards_for_attendance(sender, instance, **kwargs):
+    invalidate_company_dashboards(
+        CompanySupervisor.objects.filter(internshipplacement=instance.placement_id).values_list('pk', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Logbook)
+def refresh_dashboards_for_logbook(sender, instance, **kwargs):
+    # Pending logbooks are counted per company
+    invalidate_company_dashboards(
+        CompanySupervisor.objects.filter(
+            company__internship__internshipapplication=instance.application_id
+        ).values_list('pk', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=InternshipApplication)
+def refresh_dashboards_for_application(sender, instance, **kwargs):
+    # Pending applications are counted per department
+    invalidate_company_dashboards(
+        CompanySupervisor.objects.filter(department__internship=instance.internship_id).values_list('pk', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=InternshipPlacement)
+def refresh_dashboards_for_placement(sender, instance, **kwargs):
+    invalidate_company_dashboards({instance.company_supervisor_id, instance.previous('company_supervisor')})
+
+
+@receiver([post_save, post_delete], sender=PerformanceEvaluation)
+def refresh_dashboards_for_evaluation(sender, instance, **kwargs):
+    invalidate_company_dashboards([instance.company_supervisor_id])
+
+
+# Monthly attendance rollups, see placement.attendance
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_monthly_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = None if created else attendance_values(instance, previous=True)
+    record_attendance_changes([(before, attendance_values(instance))])
+
+
+@receiver(post_delete, sender=Attendance)
+def update_attendance_monthly_on_delete(sender, instance, **kwargs):
+    record_attendance_changes([(attendance_values(instance, previous=True), None)])
+
+
+@receiver(post_save, sender=InternshipPlacement)
+def rebuild_attendance_monthly_for_placement(sender, instance, created, raw=False, **kwargs):
+    # Only records within the placement's dates are counted
+    if not created and not raw and (instance.has_changed('start_date') or instance.has_changed('end_date')):
+        rebuild_attendance_monthly(placements=[instance.pk])
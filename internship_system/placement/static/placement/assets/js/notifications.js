@@ -0,0 +1,30 @@
+/*
+	Live unread-notification badge.
+	Listens to the notification stream and keeps every [data-unread-count]
+	element up to date; [data-unread-badge] wrappers are hidden at zero.
+*/
+(function() {
+
+	var script = document.currentScript;
+	if (!script || !window.EventSource)
+		return;
+
+	var source = new EventSource(script.dataset.streamUrl);
+
+	function setUnread(count) {
+		document.querySelectorAll('[data-unread-count]').forEach(function(el) {
+			el.textContent = count;
+		});
+		document.querySelectorAll('[data-unread-badge]').forEach(function(el) {
+			el.hidden = !count;
+		});
+	}
+
+	function onEvent(e) {
+		setUnread(JSON.parse(e.data).unread_count);
+	}
+
+	source.addEventListener('unread', onEvent);
+	source.addEventListener('notification', onEvent);
+
+})();
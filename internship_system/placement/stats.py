@@ -0,0 +1,163 @@
+"""
+Running totals for applications, placements, logbooks, attendance and
+evaluations, kept in the single SystemStats row so pages that show totals
+read a row instead of counting large tables.
+
+The receivers in placement.signals call record_save / record_delete, which
+apply each change as an atomic F() increment. Writes that skip signals must
+account for themselves: QuerySet.update(status=...) through
+record_bulk_status_change, bulk_create through record_bulk_create (or a
+full rebuild_stats for large imports). Run ``manage.py rebuild_stats`` to
+recount everything and report any drift.
+
+Every counted write updates that one row inside its transaction, so
+concurrent writers queue on its lock until they commit. That is cheap at
+this site's write rate; if it ever shows up, move to several rows summed
+on read.
+"""
+from collections import Counter
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, F, IntegerField, Q
+from django.utils import timezone
+
+from .models import SystemStats
+
+# Counted model -> prefix of its counters: <prefix>_total and <prefix>_<status>
+PREFIXES = {
+    'InternshipApplication': 'applications',
+    'InternshipPlacement': 'placements',
+    'Logbook': 'logbooks',
+    'Attendance': 'attendance',
+    'PerformanceEvaluation': 'evaluations',
+}
+
+COUNTER_FIELDS = [
+    field.name for field in SystemStats._meta.concrete_fields
+    if isinstance(field, IntegerField) and not field.primary_key
+]
+
+PENDING_EVALUATION = (
+    Q(company_supervisor_submitted_at__isnull=True) | Q(academic_supervisor_submitted_at__isnull=True)
+)
+
+
+def _statuses(model):
+    try:
+        return [value for value, _ in model._meta.get_field('status').choices]
+    except FieldDoesNotExist:
+        return []
+
+
+def _aggregates(model):
+    prefix = PREFIXES[model.__name__]
+    aggregates = {f'{prefix}_total': Count('id')}
+    for status in _statuses(model):
+        aggregates[f'{prefix}_{status.lower()}'] = Count('id', filter=Q(status=status))
+    if model.__name__ == 'PerformanceEvaluation':
+        aggregates['evaluations_pending'] = Count('id', filter=PENDING_EVALUATION)
+    return aggregates
+
+
+def _counters(model, values):
+    """The counters a row with these tracked field ``values`` is included in."""
+    prefix = PREFIXES[model.__name__]
+    counters = [f'{prefix}_total']
+    if values.get('status'):
+        counters.append(f"{prefix}_{values['status'].lower()}")
+    if model.__name__ == 'PerformanceEvaluation' and (
+        values['company_supervisor_submitted_at'] is None or values['academic_supervisor_submitted_at'] is None
+    ):
+        counters.append('evaluations_pending')
+    return [name for name in counters if name in COUNTER_FIELDS]
+
+
+def _current(instance):
+    return {
+        name: getattr(instance, instance._meta.get_field(name).attname)
+        for name in getattr(instance, 'tracked_fields', ())
+    }
+
+
+def _previous(instance):
+    return {name: instance.previous(name) for name in getattr(instance, 'tracked_fields', ())}
+
+
+def _apply(deltas):
+    updates = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    if not updates:
+        return
+    if not SystemStats.objects.filter(pk=SystemStats.ROW_ID).update(**updates):
+        rebuild_stats()
+
+
+def record_save(instance, created):
+    model = type(instance)
+    deltas = Counter(_counters(model, _current(instance)))
+    if not created:
+        deltas.subtract(_counters(model, _previous(instance)))
+    _apply(deltas)
+
+
+def record_delete(instance):
+    deltas = Counter()
+    deltas.subtract(_counters(type(instance), _previous(instance)))
+    _apply(deltas)
+
+
+def record_bulk_create(objs):
+    """Account for rows written with bulk_create, which skips post_save."""
+    if not objs:
+        return
+    model = type(objs[0])
+    deltas = Counter()
+    for obj in objs:
+        deltas.update(_counters(model, _current(obj)))
+    _apply(deltas)
+
+
+def record_bulk_status_change(queryset, status):
+    """Account for ``queryset.update(status=status)``; call it just before the update."""
+    model = queryset.model
+    prefix = PREFIXES[model.__name__]
+    moved = queryset.exclude(status=status).values('status').annotate(rows=Count('id')).order_by()
+    deltas = Counter()
+    for row in moved:
+        deltas[f"{prefix}_{status.lower()}"] += row['rows']
+        deltas[f"{prefix}_{row['status'].lower()}"] -= row['rows']
+    _apply({name: delta for name, delta in deltas.items() if name in COUNTER_FIELDS})
+
+
+def count_stats():
+    """Fresh site-wide counts from the tables."""
+    counts = dict.fromkeys(COUNTER_FIELDS, 0)
+    for name in PREFIXES:
+        model = apps.get_model('placement', name)
+        counts.update(model.objects.aggregate(**_aggregates(model)))
+    return counts
+
+
+def rebuild_stats():
+    """Recount the SystemStats row from scratch."""
+    stats, _ = SystemStats.objects.update_or_create(
+        pk=SystemStats.ROW_ID, defaults=dict(count_stats(), rebuilt_at=timezone.now())
+    )
+    return stats
+
+
+def stats_drift():
+    """Differences between the stored counters and a fresh count, as readable lines."""
+    counted = count_stats()
+    stored = SystemStats.objects.filter(pk=SystemStats.ROW_ID).values(*COUNTER_FIELDS).first()
+    if stored is None:
+        return ["site: no SystemStats row"]
+    return [
+        f"site {name}: stored {stored[name]}, counted {counted[name]}"
+        for name in COUNTER_FIELDS if stored[name] != counted[name]
+    ]
+
+
+def system_stats():
+    """The SystemStats row, counted on the spot if it is missing."""
+    return SystemStats.objects.filter(pk=SystemStats.ROW_ID).first() or rebuild_stats()
@@ -0,0 +1,201 @@
+"""
+Server-sent events for notifications.
+
+Each worker process runs a single NotificationBroadcaster. While at least
+one client is connected it polls the receipts of the connected users on a
+short interval and fans new ones out to their in-memory queues, so idle
+connections cost a queue and a suspended coroutine each and no database
+work of their own. It only needs the database, so it works the same on
+SQLite and Postgres.
+
+Every connection remembers the last receipt id it was sent, starting from
+the newest one when it connected (or the client's Last-Event-ID on
+reconnect). A receipt whose transaction commits behind one already sent
+is not pushed, but the periodic counter sync still brings the badge up
+to date.
+
+The stream holds its connection open, so it is only served under ASGI
+(views.notification_stream).
+"""
+import asyncio
+import json
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db.models import Max
+
+from .models import User, NotificationReceipt
+
+POLL_INTERVAL = 2.0
+HEARTBEAT_INTERVAL = 15.0
+# Re-read unread counters every N polls to pick up reads made elsewhere
+COUNT_SYNC_EVERY = 5
+COUNT_SYNC_CHUNK = 500
+QUEUE_SIZE = 100
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def receipt_event(receipt, unread_count):
+    return format_event('notification', {
+        'id': receipt.pk,
+        'message': receipt.display_message,
+        'created_at': receipt.created_at.isoformat(),
+        'unread_count': unread_count,
+    }, event_id=receipt.pk)
+
+
+class NotificationBroadcaster:
+
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        # user id -> {queue: id of the last receipt that connection was sent}
+        self.subscribers = defaultdict(dict)
+        self.unread_counts = {}
+        self.polls = 0
+        self.loop = None
+        self.task = None
+
+    def subscribe(self, user_id, unread_count, last_id):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # First use in this event loop (or the old one has gone away)
+            self.subscribers.clear()
+            self.unread_counts.clear()
+            self.loop, self.task = loop, None
+
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers[user_id][queue] = last_id
+        self.unread_counts[user_id] = unread_count
+
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.pop(queue, None)
+        if not queues:
+            del self.subscribers[user_id]
+            self.unread_counts.pop(user_id, None)
+
+    async def run(self):
+        while self.subscribers:
+            await asyncio.sleep(self.poll_interval)
+            await self.poll()
+
+    async def poll(self):
+        # Read the connections here, on the event loop; collect() runs in a worker thread
+        last_ids = {user_id: min(queues.values()) for user_id, queues in self.subscribers.items()}
+        events, newest = await sync_to_async(self.collect)(last_ids)
+
+        for user_id, receipt_id, event in events:
+            for queue, last_id in self.subscribers.get(user_id, {}).items():
+                if receipt_id is not None and receipt_id <= last_id:
+                    continue
+                if not queue.full():  # slow client: drop rather than grow without bound
+                    queue.put_nowait(event)
+
+        if newest:
+            # Every connection has now been sent whatever was visible up to the newest id
+            for queues in self.subscribers.values():
+                for queue, last_id in queues.items():
+                    queues[queue] = max(last_id, newest)
+
+    def collect(self, last_ids):
+        """Events as ``(user_id, receipt_id or None, event)``, and the newest receipt id read."""
+        events = []
+        if not last_ids:
+            return events, None
+        user_ids = sorted(last_ids)
+        floor = min(last_ids.values())
+
+        receipts = []
+        for start in range(0, len(user_ids), COUNT_SYNC_CHUNK):
+            receipts += (
+                NotificationReceipt.objects
+                .filter(user_id__in=user_ids[start:start + COUNT_SYNC_CHUNK], id__gt=floor)
+                .select_related('message')
+                .order_by('id')
+            )
+        receipts.sort(key=lambda receipt: receipt.pk)
+        newest = receipts[-1].pk if receipts else None
+        new_receipts = [receipt for receipt in receipts if receipt.pk > last_ids[receipt.user_id]]
+
+        if new_receipts:
+            counts = dict(
+                User.objects
+                .filter(pk__in={receipt.user_id for receipt in new_receipts})
+                .values_list('pk', 'unread_notifications')
+            )
+            for receipt in new_receipts:
+                self.unread_counts[receipt.user_id] = counts.get(receipt.user_id, 0)
+                events.append((
+                    receipt.user_id, receipt.pk, receipt_event(receipt, counts.get(receipt.user_id, 0))
+                ))
+
+        self.polls += 1
+        if self.polls % COUNT_SYNC_EVERY == 0:
+            events.extend(
+                (user_id, None, event) for user_id, event in self.collect_count_changes(user_ids)
+            )
+
+        return events, newest
+
+    def collect_count_changes(self, user_ids):
+        events = []
+        for start in range(0, len(user_ids), COUNT_SYNC_CHUNK):
+            chunk = user_ids[start:start + COUNT_SYNC_CHUNK]
+            counts = User.objects.filter(pk__in=chunk).values_list('pk', 'unread_notifications')
+            for user_id, unread_count in counts:
+                if self.unread_counts.get(user_id) != unread_count:
+                    self.unread_counts[user_id] = unread_count
+                    events.append((user_id, format_event('unread', {'unread_count': unread_count})))
+        return events
+
+
+broadcaster = NotificationBroadcaster()
+
+
+def latest_receipt_id(user):
+    return NotificationReceipt.objects.filter(user=user).aggregate(latest=Max('id'))['latest'] or 0
+
+
+def missed_receipts(user, last_event_id, latest_id):
+    # Replay what a reconnecting client missed, bounded to one page
+    return list(
+        NotificationReceipt.objects
+        .filter(user=user, id__gt=last_event_id, id__lte=latest_id)
+        .select_related('message')
+        .order_by('id')[:QUEUE_SIZE]
+    )
+
+
+async def notification_events(user, last_event_id=None):
+    # Anything newer than this is picked up by the broadcaster
+    latest_id = await sync_to_async(latest_receipt_id)(user)
+    queue = broadcaster.subscribe(user.pk, user.unread_notifications, latest_id)
+    try:
+        yield "retry: 5000\n\n"
+        yield format_event('unread', {'unread_count': user.unread_notifications})
+
+        if last_event_id and last_event_id.isdigit():
+            for receipt in await sync_to_async(missed_receipts)(user, int(last_event_id), latest_id):
+                yield receipt_event(receipt, user.unread_notifications)
+
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(user.pk, queue)
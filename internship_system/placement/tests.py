@@ -1,3 +1,1589 @@
-from django.test import TestCase
+import gzip
+import importlib
+import json
+import os
+import sys
+from contextlib import ExitStack
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .models import (
+    User,
+    Student,
+    Company,
+    CompanySupervisor,
+    Department,
+    Internship,
+    InternshipApplication,
+    InternshipPlacement,
+    Attendance,
+    AttendanceMonthly,
+    Logbook,
+    PerformanceEvaluation,
+    NotificationMessage,
+    NotificationOutbox,
+    NotificationReceipt,
+    SystemStats,
+)
+from . import benchmarks, views
+from .attendance import (
+    attendance_monthly_drift,
+    close_attendance,
+    combine_summaries,
+    mark_attendance,
+    summarize_attendance,
+    working_days,
+)
+from .views import ACADEMIC_QUEUE_PAGE_SIZE
+from .cohort import CohortGenerator
+from .dashboard import company_dashboard_snapshot
+from .context_processor import company_interns, company_notifications
+from .middleware import QueryInstrumentationMiddleware, load_profile
+from .notifications import notify, drain_outbox, reconcile_unread_counts
+from .stats import record_bulk_status_change, stats_drift
+from .streams import NotificationBroadcaster, latest_receipt_id
+
+
+def make_user(username, role, **extra):
+    return User.objects.create_user(username=username, role=role, **extra)
+
+
+def make_internship(company, **extra):
+    fields = {
+        'title': 'Backend Intern',
+        'description': 'Build things',
+        'location': 'KL',
+        'start_date': date(2026, 1, 1),
+        'end_date': date(2026, 3, 31),
+        'total_slots': 2,
+        'status': 'Open',
+    }
+    fields.update(extra)
+    return Internship.objects.create(company=company, **fields)
+
+
+class NotificationFanOutTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(company_name='Acme', address='Somewhere')
+        self.internship = make_internship(self.company)
+
+    def count_application_inserts(self, username):
+        student = make_user(username, 'student').student
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            InternshipApplication.objects.create(student=student, internship=self.internship)
+        return sum(1 for q in ctx.captured_queries if q['sql'].startswith('INSERT'))
+
+    @override_settings(NOTIFICATION_OUTBOX=True)
+    def test_application_inserts_do_not_grow_with_admins(self):
+        make_user('admin0', 'admin')
+        one_admin = self.count_application_inserts('std1')
+
+        for i in range(1, 40):
+            make_user(f'admin{i}', 'admin')
+        many_admins = self.count_application_inserts('std2')
+
+        self.assertEqual(one_admin, many_admins)
+        drain_outbox()
+        self.assertEqual(
+            NotificationReceipt.objects.filter(message__body__contains='std2 applied').count(),
+            40
+        )
+        # The text itself is stored once for all 40 admins
+        self.assertEqual(
+            NotificationMessage.objects.filter(body__contains='std2 applied').count(),
+            1
+        )
+
+    def test_notify_deduplicates_recipients(self):
+        user = make_user('acd', 'academic')
+        notify([user, user.pk, None], 'Hello')
+        self.assertEqual(NotificationReceipt.objects.filter(user=user, message__body='Hello').count(), 1)
+
+    def test_inbox_and_mark_read(self):
+        user = make_user('acd', 'academic')
+        notify(user, 'Please review week 2')
+        receipt = NotificationReceipt.objects.get(user=user)
+
+        self.client.force_login(user)
+        response = self.client.get(reverse('mark_notification_read', args=[receipt.pk]))
+        self.assertRedirects(response, reverse('notifications'), fetch_redirect_response=False)
+        receipt.refresh_from_db()
+        self.assertTrue(receipt.is_read)
+
+        response = self.client.get(reverse('notifications'))
+        self.assertContains(response, 'Please review week 2')
+
+    def test_saving_a_user_keeps_concurrent_unread_increments(self):
+        user = make_user('acd', 'academic')
+        stale = User.objects.get(pk=user.pk)
+        notify(user, 'Delivered while the profile form was open')
+
+        stale.email = 'acd@example.com'
+        stale.save()
+
+        user.refresh_from_db()
+        self.assertEqual((user.email, user.unread_notifications), ('acd@example.com', 1))
+
+    def test_notify_with_no_recipients_is_a_no_op(self):
+        with self.assertNumQueries(0):
+            notify([], 'Nobody home')
+
+
+@override_settings(NOTIFICATION_OUTBOX=True)
+class NotificationOutboxTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('acd', 'academic')
+
+    def test_notify_queues_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notify(self.user, 'Queued')
+            self.assertFalse(NotificationOutbox.objects.exists())
+
+        for callback in callbacks:
+            callback()
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.recipients, [self.user.pk])
+        self.assertFalse(NotificationReceipt.objects.filter(message__body='Queued').exists())
+
+    def test_drain_delivers_and_removes_entries(self):
+        NotificationOutbox.objects.create(recipients=[self.user.pk, 999999], message='Hi')
+
+        self.assertEqual(drain_outbox(), (1, 0))
+        self.assertEqual(NotificationReceipt.objects.filter(user=self.user, message__body='Hi').count(), 1)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        entry = NotificationOutbox.objects.create(recipients=[self.user.pk], message='Hi')
+
+        with mock.patch('placement.notifications.deliver', side_effect=RuntimeError('boom')):
+            self.assertEqual(drain_outbox(), (0, 1))
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn('boom', entry.last_error)
+        self.assertGreater(entry.available_at, timezone.now() + timedelta(seconds=20))
+
+        # Not due yet, so nothing happens
+        self.assertEqual(drain_outbox(), (0, 0))
+
+        NotificationOutbox.objects.update(available_at=timezone.now())
+        self.assertEqual(drain_outbox(), (1, 0))
+        self.assertTrue(NotificationReceipt.objects.filter(user=self.user, message__body='Hi').exists())
+
+    def test_drain_command_once(self):
+        for i in range(5):
+            NotificationOutbox.objects.create(recipients=[self.user.pk], message=f'Msg {i}')
+
+        out = StringIO()
+        call_command('drain_notifications', '--once', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Delivered 5', out.getvalue())
+        self.assertEqual(NotificationReceipt.objects.filter(user=self.user).count(), 5)
+
+
+class TrackedFieldsTests(TestCase):
+
+    def setUp(self):
+        make_user('admin', 'admin')
+        student = make_user('std1', 'student').student
+        internship = make_internship(Company.objects.create(company_name='Acme', address='KL'))
+        application = InternshipApplication.objects.create(student=student, internship=internship)
+        Logbook.objects.create(
+            student=student,
+            application=application,
+            week_no=1,
+            content='Week one',
+            submitted_date=date(2026, 1, 7),
+        )
+        NotificationReceipt.objects.all().delete()
+
+    def test_previous_and_has_changed(self):
+        application = InternshipApplication.objects.get()
+        self.assertEqual(application.previous('status'), 'Pending')
+        self.assertFalse(application.has_changed('status'))
+
+        application.status = 'Offered'
+        self.assertTrue(application.has_changed('status'))
+        self.assertFalse(application.has_changed('handled_by'))
+
+        application.save()
+        self.assertEqual(application.previous('status'), 'Offered')
+        self.assertFalse(application.has_changed('status'))
+
+        with self.assertRaises(ValueError):
+            application.has_changed('student')
+
+    def test_refresh_resnapshots_and_missing_snapshot_is_unchanged(self):
+        application = InternshipApplication.objects.get()
+        InternshipApplication.objects.update(status='Offered')
+        application.refresh_from_db()
+        self.assertEqual(application.previous('status'), 'Offered')
+        self.assertFalse(application.has_changed('status'))
+
+        # Loading a deferred field keeps pending edits to the others
+        application = InternshipApplication.objects.only('pk', 'status').get()
+        application.status = 'Rejected'
+        application.handled_by_id
+        self.assertTrue(application.has_changed('status'))
+        self.assertFalse(application.has_changed('handled_by'))
+
+        self.assertFalse(InternshipApplication(pk=application.pk, status='Accepted').has_changed('status'))
+
+    def test_logbook_save_does_not_refetch_original(self):
+        logbook = Logbook.objects.select_related('student__user').get()
+        logbook.status = 'Approved'
+
+        with CaptureQueriesContext(connection) as ctx:
+            logbook.save()
+
+        logbook_selects = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "placement_logbook"' in q['sql']
+        ]
+        self.assertEqual(logbook_selects, [])
+        self.assertTrue(NotificationReceipt.objects.filter(message__body__startswith='Logbook approved').exists())
+
+    def test_application_status_change_notifies_admins(self):
+        application = InternshipApplication.objects.get()
+        application.status = 'Rejected'
+        application.save()
+        self.assertTrue(NotificationReceipt.objects.filter(message__body__startswith='Application rejected').exists())
+
+        # Saving again without a change does not notify twice
+        application.save()
+        self.assertEqual(NotificationReceipt.objects.filter(message__body__startswith='Application rejected').count(), 1)
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('acd', 'academic')
+
+    def unread(self):
+        return User.objects.get(pk=self.user.pk).unread_notifications
+
+    def test_counter_follows_delivery_and_reads(self):
+        notify(self.user, 'One')
+        notify(self.user, 'Two')
+        self.assertEqual(self.unread(), 2)
+
+        self.client.force_login(self.user)
+        receipt = NotificationReceipt.objects.filter(user=self.user).first()
+        self.client.get(reverse('mark_notification_read', args=[receipt.pk]))
+        self.assertEqual(self.unread(), 1)
+
+        # Marking the same receipt again does not decrement twice
+        self.client.get(reverse('mark_notification_read', args=[receipt.pk]))
+        self.assertEqual(self.unread(), 1)
+
+        # Viewing the inbox marks the rest as read
+        self.client.get(reverse('notifications'))
+        self.assertEqual(self.unread(), 0)
+
+    def test_context_processor_does_not_count(self):
+        notify(self.user, 'One')
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('academic_dashboard'))
+
+        counts = [q['sql'] for q in ctx.captured_queries if 'placement_notificationreceipt' in q['sql']]
+        self.assertEqual(counts, [])
+
+    def test_reconcile_repairs_drift(self):
+        notify(self.user, 'One')
+        User.objects.filter(pk=self.user.pk).update(unread_notifications=7)
+        other = make_user('std1', 'student')
+        User.objects.filter(pk=other.pk).update(unread_notifications=3)
+
+        out = StringIO()
+        call_command('reconcile_unread_counts', stdout=out)
+
+        self.assertIn('2 user(s)', out.getvalue())
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(User.objects.get(pk=other.pk).unread_notifications, 0)
+
+
+class ContextProcessorTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        company = Company.objects.create(company_name='Unassigned Company', address='-')
+        self.supervisor = make_user('cmp', 'company')
+        student = make_user('std', 'student').student
+        InternshipPlacement.objects.create(
+            internship=make_internship(company),
+            student=student,
+            company_supervisor=self.supervisor.companysupervisor,
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 3, 1),
+            status='Active'
+        )
+        self.student = student.user
+
+    def context_for(self, user):
+        request = self.factory.get('/')
+        request.user = User.objects.get(pk=user.pk)
+        request.profile = load_profile(request.user)
+        context = {}
+        for processor in (company_interns, company_notifications):
+            context.update(processor(request))
+        return context
+
+    def test_processors_do_not_query_until_read(self):
+        request = self.factory.get('/')
+        request.user = self.supervisor
+        request.profile = SimpleLazyObject(lambda: load_profile(request.user))
+        with self.assertNumQueries(0):
+            company_interns(request)
+            company_notifications(request)
+
+    def test_non_company_users_never_query(self):
+        context = self.context_for(self.student)
+        with self.assertNumQueries(0):
+            self.assertEqual(list(context['interns']), [])
+            self.assertEqual(context['unread_count'], 0)
+
+    def test_company_interns_memoized_per_request(self):
+        context = self.context_for(self.supervisor)
+        with self.assertNumQueries(1):
+            self.assertEqual([s.user.username for s in context['interns']], ['std'])
+            self.assertEqual(len(context['interns']), 1)
+
+    def test_student_page_skips_company_lookup(self):
+        self.client.force_login(self.student)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('student_dashboard'))
+
+        lookups = [q['sql'] for q in ctx.captured_queries if 'placement_companysupervisor' in q['sql']]
+        self.assertEqual(lookups, [])
+
+
+class RoleProfileMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(company_name='Unassigned Company', address='-')
+
+    def test_profile_loaded_with_relations_in_one_query(self):
+        academic = make_user('acd', 'academic').academicsupervisor
+        student = make_user('std', 'student').student
+        student.academic_supervisor = academic
+        student.save()
+        user = User.objects.get(pk=student.user_id)
+
+        with self.assertNumQueries(1):
+            profile = load_profile(user)
+            self.assertEqual(profile.academic_supervisor.user.username, 'acd')
+            self.assertIs(profile.user, user)
+            self.assertIs(user.student, profile)
+
+        supervisor = User.objects.get(username=make_user('cmp', 'company').username)
+        with self.assertNumQueries(1):
+            self.assertEqual(load_profile(supervisor).company.company_name, 'Unassigned Company')
+
+    def test_no_profile_for_admins(self):
+        admin = make_user('adm', 'admin')
+        with self.assertNumQueries(0):
+            self.assertIsNone(load_profile(admin))
+
+    def test_company_dashboard_loads_profile_once(self):
+        self.client.force_login(make_user('cmp', 'company'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('company_dashboard'))
+
+        self.assertEqual(response.status_code, 200)
+        # The dashboard figures are one more query anchored on the supervisor row
+        lookups = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('SELECT') and 'FROM "placement_companysupervisor"' in q['sql']
+                   and 'COUNT(' not in q['sql']]
+        self.assertEqual(len(lookups), 1)
+
+
+class InboxPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('acd', 'academic')
+        for i in range(25):
+            notify(self.user, f'Message {i}')
+        self.client.force_login(self.user)
+
+    def test_feed_walks_every_page_once(self):
+        seen = []
+        cursor = ''
+        while True:
+            data = self.client.get(reverse('notifications_feed'), {'cursor': cursor, 'limit': 10}).json()
+            seen.extend(item['message'] for item in data['results'])
+            cursor = data['next']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [f'Message {i}' for i in reversed(range(25))])
+
+    def count_inbox_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('notifications'), {'limit': 10})
+        return len(ctx.captured_queries)
+
+    def test_page_query_count_is_constant(self):
+        small_inbox = self.count_inbox_queries()
+
+        for i in range(200):
+            notify(self.user, f'Old {i}')
+        NotificationReceipt.objects.update(is_read=False)
+
+        self.assertEqual(self.count_inbox_queries(), small_inbox)
+
+    def test_inbox_marks_only_the_viewed_page(self):
+        response = self.client.get(reverse('notifications'), {'limit': 10})
+
+        self.assertContains(response, 'Older notifications')
+        self.assertEqual(NotificationReceipt.objects.filter(user=self.user, is_read=True).count(), 10)
+        self.assertEqual(User.objects.get(pk=self.user.pk).unread_notifications, 15)
+
+    def test_mark_explicit_batch(self):
+        ids = list(NotificationReceipt.objects.filter(user=self.user).values_list('pk', flat=True)[:3])
+        other = make_user('std1', 'student')
+        notify(other, 'Not yours')
+        ids.append(NotificationReceipt.objects.get(user=other).pk)
+
+        data = self.client.post(reverse('mark_notifications_read'), {'ids': ids}).json()
+
+        self.assertEqual(data['marked'], 3)
+        self.assertEqual(data['unread_count'], 22)
+        self.assertFalse(NotificationReceipt.objects.get(user=other).is_read)
+
+
+@override_settings(NOTIFICATION_STREAM=True)
+class NotificationStreamTests(TestCase):
+
+    async def test_stream_pushes_new_notifications(self):
+        user = await sync_to_async(make_user)('acd', 'academic')
+        await self.async_client.aforce_login(user)
+        broadcaster = NotificationBroadcaster(poll_interval=3600)
+
+        with mock.patch('placement.streams.broadcaster', broadcaster):
+            response = await self.async_client.get(reverse('notification_stream'))
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+            stream = response.streaming_content
+            self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+            self.assertIn(b'"unread_count": 0', await anext(stream))
+
+            # Nothing new: a poll sends nothing
+            await broadcaster.poll()
+            self.assertTrue(all(queue.empty() for queue in broadcaster.subscribers[user.pk]))
+
+            await sync_to_async(notify)(user, 'Week 3 approved')
+            await broadcaster.poll()
+
+            event = await anext(stream)
+            self.assertIn(b'event: notification', event)
+            self.assertIn(b'Week 3 approved', event)
+            self.assertIn(b'"unread_count": 1', event)
+
+            await stream.aclose()
+            broadcaster.task.cancel()
+
+    async def test_each_connection_is_sent_what_follows_its_last_id(self):
+        user = await sync_to_async(make_user)('acd', 'academic')
+        await sync_to_async(notify)(user, 'Week 2 approved')
+        seen = await sync_to_async(latest_receipt_id)(user)
+        broadcaster = NotificationBroadcaster(poll_interval=3600)
+        current = broadcaster.subscribe(user.pk, 1, seen)
+        behind = broadcaster.subscribe(user.pk, 1, 0)
+
+        await broadcaster.poll()
+        self.assertIn('Week 2 approved', behind.get_nowait())
+        self.assertTrue(current.empty())
+
+        await sync_to_async(notify)(user, 'Week 3 approved')
+        await broadcaster.poll()
+        for queue in (current, behind):
+            self.assertIn('Week 3 approved', queue.get_nowait())
+
+        # Sent once
+        await broadcaster.poll()
+        self.assertTrue(current.empty() and behind.empty())
+
+        for queue in (current, behind):
+            broadcaster.unsubscribe(user.pk, queue)
+        broadcaster.task.cancel()
+
+    def test_stream_is_not_served_under_wsgi_or_when_disabled(self):
+        self.client.force_login(make_user('std1', 'student'))
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+        self.assertContains(self.client.get(reverse('student_dashboard')), 'notifications.js')
+
+        with override_settings(NOTIFICATION_STREAM=False):
+            self.assertNotContains(self.client.get(reverse('student_dashboard')), 'notifications.js')
+
+    async def test_stream_requires_login(self):
+        response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 302)
+
+
+class CompactNotificationsTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('acd', 'academic')
+
+    def test_compaction_archives_coalesces_and_reports(self):
+        old = timezone.now() - timedelta(days=120)
+        notify(self.user, 'Old and read')
+        notify(self.user, 'Old but unread')
+        NotificationReceipt.objects.filter(message__body__startswith='Old').update(created_at=old)
+        NotificationReceipt.objects.filter(message__body='Old and read').update(is_read=True)
+        notify(self.user, 'Recent and read')
+        NotificationReceipt.objects.filter(message__body='Recent and read').update(is_read=True)
+        # Delivered further apart than the coalescing window: grouped by kind and subject, not text
+        with self.settings(NOTIFICATION_COALESCE_WINDOW=0):
+            for day in (5, 6, 7):
+                notify(self.user, f'You updated attendance for {day} Jan', kind='attendance_updated',
+                       subject='placement:1')
+        # Without a kind, only identical text is a repeat
+        notify(self.user, 'Unrelated, no kind')
+        notify(self.user, 'Unrelated, no kind')
+        notify(self.user, 'Something else, no kind')
+        User.objects.filter(pk=self.user.pk).update(unread_notifications=7)
+        # Written a moment ago, its receipts may still be on the way
+        NotificationMessage.objects.create(body='Being delivered')
+
+        archive_dir = self.enterContext(TemporaryDirectory())
+        out = StringIO()
+        call_command('compact_notifications', '--days', '90', '--chunk-size', '1',
+                     '--archive-dir', archive_dir, '--orphan-grace', '60', stdout=out)
+
+        remaining = set(NotificationReceipt.objects.values_list('message__body', flat=True))
+        self.assertEqual(remaining, {
+            'Old but unread', 'Recent and read', 'You updated attendance for 7 Jan', 'Unrelated, no kind',
+            'Something else, no kind',
+        })
+        self.assertEqual(
+            NotificationReceipt.objects.get(message__body='You updated attendance for 7 Jan').repeat_count, 3
+        )
+        self.assertEqual(NotificationReceipt.objects.get(message__body='Unrelated, no kind').repeat_count, 2)
+        self.assertEqual(User.objects.get(pk=self.user.pk).unread_notifications, 4)
+        report = out.getvalue()
+        self.assertIn('Removed 1 read notification(s)', report)
+        self.assertIn('Coalesced 3 duplicate', report)
+        # The orphans are too new to be dropped yet
+        self.assertEqual(NotificationMessage.objects.count(), 10)
+        self.assertIn('Removed 0 unused message(s)', report)
+
+        NotificationMessage.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        out = StringIO()
+        call_command('compact_notifications', '--days', '90', '--orphan-grace', '60', stdout=out)
+        self.assertEqual(NotificationMessage.objects.count(), 5)
+
+        self.assertIn('Removed 5 unused message(s)', out.getvalue())
+
+        [archive_name] = os.listdir(archive_dir)
+        with gzip.open(os.path.join(archive_dir, archive_name), 'rt') as archive:
+            rows = [json.loads(line) for line in archive]
+        self.assertEqual([row['message'] for row in rows], ['Old and read'])
+
+
+@override_settings(NOTIFICATION_COALESCE_WINDOW=600)
+class NotificationCoalescingTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('sup', 'academic')
+
+    def test_repeats_within_window_share_one_row(self):
+        for week in range(1, 4):
+            notify(self.user, f'Logbook Week {week} updated.', kind='logbook_updated', subject='logbook:1')
+
+        receipt = NotificationReceipt.objects.get(user=self.user)
+        self.assertEqual(receipt.repeat_count, 3)
+        self.assertEqual(receipt.display_message, 'Logbook Week 3 updated. (x3)')
+        self.assertEqual(User.objects.get(pk=self.user.pk).unread_notifications, 1)
+
+    def test_merged_receipt_moves_to_the_latest_delivery(self):
+        notify(self.user, 'Edited', kind='logbook_updated', subject='logbook:1')
+        NotificationReceipt.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        notify(self.user, 'Edited again', kind='logbook_updated', subject='logbook:1')
+
+        receipt = NotificationReceipt.objects.select_related('message').get(user=self.user)
+        self.assertEqual(receipt.created_at, receipt.message.created_at)
+
+    def test_new_row_outside_window_after_read_or_for_other_subject(self):
+        notify(self.user, 'Edited', kind='logbook_updated', subject='logbook:1')
+        NotificationReceipt.objects.update(created_at=timezone.now() - timedelta(minutes=30))
+        notify(self.user, 'Edited', kind='logbook_updated', subject='logbook:1')
+        notify(self.user, 'Edited', kind='logbook_updated', subject='logbook:2')
+        NotificationReceipt.objects.filter(message__subject='logbook:2').update(is_read=True)
+        notify(self.user, 'Edited', kind='logbook_updated', subject='logbook:2')
+        notify(self.user, 'Edited')
+        notify(self.user, 'Edited')
+
+        self.assertEqual(NotificationReceipt.objects.filter(user=self.user).count(), 6)
+        self.assertFalse(NotificationReceipt.objects.filter(repeat_count__gt=1).exists())
+
+    def test_outbox_keeps_coalescing_keys(self):
+        with override_settings(NOTIFICATION_OUTBOX=True), self.captureOnCommitCallbacks(execute=True):
+            notify(self.user, 'Edited', kind='logbook_updated', subject='logbook:1')
+            notify(self.user, 'Edited again', kind='logbook_updated', subject='logbook:1')
+        drain_outbox()
+
+        receipt = NotificationReceipt.objects.get(user=self.user)
+        self.assertEqual(receipt.display_message, 'Edited again (x2)')
+
+
+class ImportTimeTests(TestCase):
+
+    def test_importing_urlconf_runs_no_sql(self):
+        # Re-import the URLconf and views from scratch, restoring the originals afterwards
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.dict(sys.modules))
+            for name in [settings.ROOT_URLCONF, 'placement.urls', 'placement.views']:
+                package, _, attr = name.rpartition('.')
+                stack.enter_context(mock.patch.dict(sys.modules[package].__dict__))
+                sys.modules[package].__dict__.pop(attr, None)
+                sys.modules.pop(name, None)
+
+            with self.assertNumQueries(0):
+                importlib.import_module(settings.ROOT_URLCONF)
+            self.assertIsNot(sys.modules['placement.views'], views)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SeedDemoTests(TestCase):
+
+    def test_seed_creates_demo_data_in_few_queries(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('seed_demo', '--students', '5', stdout=out)
+
+        # About 15 to write the data, the rest to count SystemStats
+        self.assertLessEqual(len(ctx.captured_queries), 26)
+        self.assertIn('Created 8 users', out.getvalue())
+        self.assertTrue(User.objects.get(username='std1').check_password('1234'))
+
+        student = Student.objects.select_related('academic_supervisor__user').get(user__username='std1')
+        self.assertEqual(student.academic_supervisor.user.username, 'acd')
+        self.assertTrue(InternshipPlacement.objects.filter(
+            student=student, company_supervisor__user__username='cpy1', status='Active'
+        ).exists())
+        self.assertEqual(Student.objects.count(), 5)
+
+    def test_seed_refuses_to_run_twice(self):
+        call_command('seed_demo', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('seed_demo', stdout=StringIO())
+
+
+class GenerateCohortTests(TestCase):
+
+    def fingerprint(self, prefix):
+        return {
+            'statuses': list(
+                InternshipApplication.objects.filter(student__user__username__startswith=prefix)
+                .order_by('id').values_list('status', flat=True)
+            ),
+            'attendance': Attendance.objects.filter(
+                placement__student__user__username__startswith=prefix
+            ).count(),
+        }
+
+    def test_generates_consistent_graph_without_signals(self):
+        admin = make_user('adm', 'admin')
+        # Drop the admin's own "registered" notice
+        NotificationReceipt.objects.all().delete()
+        User.objects.update(unread_notifications=0)
+        out = StringIO()
+        call_command('generate_cohort', '--students', '30', '--companies', '3', '--weeks', '2',
+                     '--batch-size', '7', '--start', '2026-01-05', stdout=out)
+
+        self.assertEqual(Student.objects.count(), 30)
+        self.assertEqual(User.objects.filter(role='company').count(),
+                         CompanySupervisor.objects.count())
+        placements = InternshipPlacement.objects.count()
+        self.assertGreater(placements, 0)
+        self.assertEqual(Logbook.objects.count(), placements * 2)
+        self.assertEqual(PerformanceEvaluation.objects.count(), placements)
+        self.assertFalse(Attendance.objects.exclude(date__range=(date(2026, 1, 5), date(2026, 1, 16))).exists())
+        self.assertTrue(AttendanceMonthly.objects.exists())
+        self.assertEqual(attendance_monthly_drift(), [])
+
+        # Counters were written alongside the receipts and nobody else was notified
+        self.assertEqual(reconcile_unread_counts(), 0)
+        self.assertFalse(NotificationReceipt.objects.filter(user=admin).exists())
+        self.assertIn('rows/s', out.getvalue())
+
+    def test_same_seed_same_cohort(self):
+        for prefix in ('one', 'two'):
+            CohortGenerator(students=20, companies=2, weeks=1, seed=5, batch_size=6, prefix=prefix).generate()
+        self.assertEqual(self.fingerprint('one-'), self.fingerprint('two-'))
+
+    def test_refuses_existing_prefix(self):
+        make_user('gen-s1', 'academic')
+        with self.assertRaises(CommandError):
+            call_command('generate_cohort', '--students', '1', '--companies', '1', stdout=StringIO())
+
+
+class BenchmarkTests(TransactionTestCase):
+    # Autocommit, like manage.py benchmark_views, so on_commit work is counted the same way
+
+    def test_every_named_route_is_benchmarked_or_skipped(self):
+        from . import urls
+        names = {pattern.name for pattern in urls.urlpatterns if pattern.name}
+        self.assertEqual(names, set(benchmarks.ROUTES) | set(benchmarks.SKIPPED))
+
+    def test_views_stay_within_budget(self):
+        budgets = benchmarks.load_budgets()
+        fixtures = benchmarks.BenchmarkFixtures(**budgets['dataset'])
+        results = benchmarks.run_benchmarks(fixtures)
+
+        # Wall time depends on the machine and on what else the suite is doing; benchmark_views checks it
+        for budget in budgets['routes'].values():
+            budget.pop('max_ms', None)
+        self.assertEqual(benchmarks.check_budgets(results, budgets), [])
+
+    def test_recorded_budgets_include_latency(self):
+        results = {'login': {'status': 200, 'queries': 0, 'ms': 10.0, 'bytes': 10}}
+        budget = benchmarks.budgets_from(results, {})['routes']['login']
+
+        self.assertEqual(budget['max_queries'], 0)
+        self.assertGreater(budget['max_ms'], 10.0)
+        self.assertEqual(benchmarks.check_budgets(results, {'routes': {'login': budget}}), [])
+
+    def test_regressions_are_reported(self):
+        budgets = {'routes': {'evaluation_list': {'max_queries': 5, 'max_ms': 100}}}
+        results = {
+            'evaluation_list': {'status': 200, 'queries': 40, 'ms': 250.0, 'bytes': 10},
+            'notifications': {'status': 500, 'queries': 1, 'ms': 1.0, 'bytes': 10},
+        }
+
+        self.assertEqual(benchmarks.check_budgets(results, budgets), [
+            'evaluation_list: 40 queries (budget 5)',
+            'evaluation_list: 250.0 ms (budget 100 ms)',
+            'notifications: server error 500',
+            'notifications: no budget recorded',
+        ])
+
+
+@override_settings(SQL_INSTRUMENTATION=True, SQL_SLOW_REQUEST_MS=10_000)
+class QueryInstrumentationTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('adm', 'admin')
+        self.client.force_login(self.admin)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('admin_company_list'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+    def test_repeated_queries_are_logged_as_n_plus_one(self):
+        def view(request):
+            for user in User.objects.all():
+                Student.objects.filter(user=user).first()
+            return HttpResponse()
+
+        for i in range(5):
+            make_user(f'std{i}', 'student')
+        request = RequestFactory().get('/manager/users/')
+        with self.assertLogs('placement.sql', 'WARNING') as logs:
+            QueryInstrumentationMiddleware(view)(request)
+
+        [record] = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        self.assertEqual(record['event'], 'n_plus_one')
+        self.assertEqual(record['path'], '/manager/users/')
+        self.assertTrue(any('FROM "placement_student"' in q['sql'] and q['count'] >= 5
+                            for q in record['repeated_queries']))
+
+    @override_settings(SQL_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('placement.sql', 'WARNING') as logs:
+            self.client.get(reverse('admin_company_list'))
+
+        record = json.loads(logs.output[0].split(':', 2)[2])
+        self.assertEqual(record['event'], 'slow_request')
+        self.assertGreater(record['queries'], 0)
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_off_by_default(self):
+        response = self.client.get(reverse('admin_company_list'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class ProfilerTests(TestCase):
+
+    def setUp(self):
+        self.profile_dir = self.enterContext(TemporaryDirectory())
+        self.enterContext(override_settings(PROFILE_DIR=self.profile_dir))
+        self.admin = make_user('adm', 'admin')
+
+    def test_admin_can_profile_a_page(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_company_list'), {'profile': '1'})
+        name = response['X-Profile-Id']
+
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), [f'{name}.json', f'{name}.prof'])
+        with open(os.path.join(self.profile_dir, f'{name}.json')) as f:
+            summary = json.load(f)
+        self.assertEqual(summary['path'], '/manager/companies/?profile=1')
+        self.assertGreater(summary['sql_queries'], 0)
+        self.assertGreater(summary['template_ms'], 0)
+        self.assertAlmostEqual(
+            summary['sql_ms'] + summary['template_ms'] + summary['python_ms'], summary['total_ms'], delta=0.5
+        )
+
+        listing = self.client.get(reverse('admin_profiles'))
+        self.assertContains(listing, '/manager/companies/?profile=1')
+        detail = self.client.get(reverse('admin_profile_detail', args=[name]))
+        self.assertContains(detail, 'cumulative')
+        download = self.client.get(reverse('admin_profile_detail', args=[name]), {'download': '1'})
+        self.assertEqual(download['Content-Disposition'], f'attachment; filename="{name}.prof"')
+
+    def test_switch_is_ignored_for_other_users_and_when_absent(self):
+        self.client.force_login(make_user('acd', 'academic'))
+        response = self.client.get(reverse('academic_dashboard'), {'profile': '1'}, HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_company_list'))
+        self.assertNotIn('X-Profile-Id', response)
+        for off in ['0', 'false', '']:
+            response = self.client.get(reverse('admin_company_list'), {'profile': off})
+            self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_unknown_or_unsafe_names_are_404(self):
+        self.client.force_login(self.admin)
+        for name in ['missing', '..']:
+            response = self.client.get(reverse('admin_profile_detail', args=[name]))
+            self.assertEqual(response.status_code, 404)
+
+    def test_download_of_a_pruned_profile_is_404(self):
+        self.client.force_login(self.admin)
+        name = self.client.get(reverse('admin_company_list'), {'profile': '1'})['X-Profile-Id']
+        os.remove(os.path.join(self.profile_dir, f'{name}.prof'))
+
+        response = self.client.get(reverse('admin_profile_detail', args=[name]), {'download': '1'})
+        self.assertEqual(response.status_code, 404)
+
+
+class AdminDashboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('adm', 'admin')
+        make_user('std1', 'student')
+        make_user('std2', 'student')
+        self.client.force_login(self.admin)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin'))
+        return response, [q['sql'] for q in ctx.captured_queries if 'COUNT(' in q['sql']]
+
+    def test_one_aggregate_per_table_then_cached(self):
+        response, counts = self.count_queries()
+        # Users, internships, companies, departments, attendance; the rest is read from SystemStats
+        self.assertEqual(len(counts), 5)
+        self.assertEqual(response.context['total_users'], 3)
+        self.assertEqual(response.context['students_count'], 2)
+        self.assertEqual(response.context['admins_count'], 1)
+
+        response, counts = self.count_queries()
+        self.assertEqual(counts, [])
+        self.assertEqual(response.context['students_count'], 2)
+
+    def test_saves_and_deletes_refresh_the_snapshot(self):
+        self.count_queries()
+
+        student = make_user('std3', 'student')
+        response, counts = self.count_queries()
+        self.assertTrue(counts)
+        self.assertEqual(response.context['students_count'], 3)
+
+        student.delete()
+        response, _ = self.count_queries()
+        self.assertEqual(response.context['students_count'], 2)
+
+    def test_logging_in_keeps_the_snapshot(self):
+        self.count_queries()
+        self.client.logout()
+        # Saves last_login only
+        self.client.force_login(self.admin)
+
+        _, counts = self.count_queries()
+        self.assertEqual(counts, [])
+
+
+class StatsTests(TestCase):
+
+    def setUp(self):
+        Company.objects.create(company_name='Unassigned Company', address='-')
+        self.company = Company.objects.create(company_name='Acme', address='KL')
+        self.other = Company.objects.create(company_name='Globex', address='PJ')
+        self.student = make_user('std1', 'student').student
+        self.internship = make_internship(self.company)
+        make_internship(self.other)
+
+    def test_counters_follow_saves_and_deletes(self):
+        application = InternshipApplication.objects.create(student=self.student, internship=self.internship)
+        application.status = 'Accepted'
+        application.save()
+        supervisor = make_user('cpy1', 'company').companysupervisor
+        placement = InternshipPlacement.objects.create(
+            internship=self.internship, student=self.student, company_supervisor=supervisor,
+            start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), status='Active',
+        )
+        Attendance.objects.create(placement=placement, date=date(2026, 1, 5), check_in='09:00')
+        evaluation = PerformanceEvaluation.objects.create(
+            student=self.student, company_supervisor=supervisor,
+            academic_supervisor=make_user('acd', 'academic').academicsupervisor,
+            application=application, company_supervisor_submitted_at=timezone.now(),
+        )
+
+        stats = SystemStats.objects.get()
+        self.assertEqual(stats.applications_total, 1)
+        self.assertEqual(stats.applications_pending, 0)
+        self.assertEqual(stats.applications_accepted, 1)
+        self.assertEqual(stats.placements_active, 1)
+        self.assertEqual(stats.attendance_total, 1)
+        self.assertEqual(stats.evaluations_pending, 1)
+
+        evaluation.academic_supervisor_submitted_at = timezone.now()
+        evaluation.save()
+        placement.delete()
+
+        stats = SystemStats.objects.get()
+        self.assertEqual(stats.evaluations_total, 1)
+        self.assertEqual(stats.evaluations_pending, 0)
+        self.assertEqual(stats.placements_total, 0)
+        self.assertEqual(stats.attendance_total, 0)
+        self.assertEqual(stats_drift(), [])
+
+    def test_saves_update_counters_in_place(self):
+        application = InternshipApplication.objects.create(student=self.student, internship=self.internship)
+        application.status = 'Rejected'
+
+        with CaptureQueriesContext(connection) as ctx:
+            application.save()
+
+        updates = [q['sql'] for q in ctx.captured_queries if 'stats" SET' in q['sql']]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"applications_rejected" = ("placement_systemstats"."applications_rejected" + 1)', updates[0])
+
+    def test_bulk_status_change(self):
+        supervisor = make_user('cpy1', 'company').companysupervisor
+        for username in ['std2', 'std3']:
+            InternshipPlacement.objects.create(
+                internship=self.internship, student=make_user(username, 'student').student,
+                company_supervisor=supervisor, start_date=date(2026, 1, 1), end_date=date(2026, 3, 31),
+                status='Active',
+            )
+
+        placements = InternshipPlacement.objects.filter(internship=self.internship)
+        record_bulk_status_change(placements, 'Completed')
+        placements.update(status='Completed')
+
+        stats = SystemStats.objects.get()
+        self.assertEqual((stats.placements_active, stats.placements_completed), (0, 2))
+        self.assertEqual(stats_drift(), [])
+
+    def test_rebuild_stats_command(self):
+        InternshipApplication.objects.create(student=self.student, internship=self.internship)
+        SystemStats.objects.update(applications_pending=7, applications_total=0)
+
+        with self.assertRaisesMessage(CommandError, '2 counter(s) out of date'):
+            call_command('rebuild_stats', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_stats', stdout=out)
+        self.assertIn('site applications_pending: stored 7, counted 1', out.getvalue())
+        self.assertIn('site applications_total: stored 0, counted 1', out.getvalue())
+        self.assertEqual(stats_drift(), [])
+        self.assertEqual(SystemStats.objects.get().applications_pending, 1)
+
+
+class CompanyDashboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Company.objects.create(company_name='Unassigned Company', address='-')
+        company = Company.objects.create(company_name='Acme', address='KL')
+        department = Department.objects.create(company=company, name='IT')
+        self.user = make_user('cpy1', 'company')
+        self.supervisor = self.user.companysupervisor
+        self.supervisor.company = company
+        self.supervisor.department = department
+        self.supervisor.save()
+        internship = make_internship(company, department=department)
+
+        self.placements = []
+        for username in ['std1', 'std2', 'std3']:
+            student = make_user(username, 'student').student
+            application = InternshipApplication.objects.create(student=student, internship=internship)
+            self.placements.append(InternshipPlacement.objects.create(
+                internship=internship, student=student, company_supervisor=self.supervisor,
+                start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), status='Active',
+            ))
+        self.logbook = Logbook.objects.create(
+            student=student, application=application, week_no=1, content='Week one', submitted_date=date(2026, 1, 7)
+        )
+        Attendance.objects.create(placement=self.placements[0], date=timezone.localdate(), check_in='09:00')
+        self.client.force_login(self.user)
+
+    def figures(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('company_dashboard'))
+        counted = [q for q in ctx.captured_queries if 'COUNT(' in q['sql']]
+        return response.context, len(counted)
+
+    def test_figures_in_one_query_then_cached(self):
+        context, queries = self.figures()
+        self.assertEqual(queries, 1)
+        self.assertEqual(context['total_interns'], 3)
+        self.assertEqual(context['pending_applications'], 3)
+        self.assertEqual(context['pending_logbooks'], 1)
+        self.assertEqual(context['attendance_not_marked'], 2)
+        self.assertEqual(context['pending_evaluation'], 0)
+
+        context, queries = self.figures()
+        self.assertEqual(queries, 0)
+        self.assertEqual(context['attendance_not_marked'], 2)
+
+    def test_attendance_and_logbook_writes_refresh_the_figures(self):
+        self.figures()
+
+        Attendance.objects.create(placement=self.placements[1], date=timezone.localdate(), check_in='09:00')
+        context, queries = self.figures()
+        self.assertEqual(queries, 1)
+        self.assertEqual(context['attendance_not_marked'], 1)
+
+        self.logbook.company_approval = True
+        self.logbook.save()
+        context, _ = self.figures()
+        self.assertEqual(context['pending_logbooks'], 0)
+
+
+class StudentDashboardTests(TestCase):
+
+    def setUp(self):
+        company = Company.objects.create(company_name='Unassigned Company', address='-')
+        self.user = make_user('std1', 'student')
+        student = self.user.student
+        internship = make_internship(company)
+        application = InternshipApplication.objects.create(student=student, internship=internship)
+        InternshipApplication.objects.create(student=student, internship=make_internship(company))
+        InternshipPlacement.objects.create(
+            internship=internship, student=student, company_supervisor=make_user('cpy1', 'company').companysupervisor,
+            start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), status='Active',
+        )
+        for week, status in [(1, 'Approved'), (2, 'Rejected')]:
+            Logbook.objects.create(
+                student=student, application=application, week_no=week, status=status,
+                content=f'Week {week}', submitted_date=date(2026, 1, 7 * week),
+            )
+        self.client.force_login(self.user)
+
+    def test_dashboard_in_two_queries(self):
+        # Besides the session: the logged-in user, then the profile with every figure
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_dashboard'))
+
+        app_queries = [q['sql'] for q in ctx.captured_queries if 'django_session' not in q['sql']]
+        self.assertEqual(len(app_queries), 2)
+        self.assertEqual(response.context['placement_status'], 'Assigned')
+        self.assertEqual(response.context['application_count'], 2)
+        self.assertEqual(response.context['logbook_status'], 'Rejected')
+
+    def test_new_student(self):
+        self.client.force_login(make_user('std2', 'student'))
+        response = self.client.get(reverse('student_dashboard'))
+
+        self.assertEqual(response.context['placement_status'], 'Not Assigned')
+        self.assertEqual(response.context['application_count'], 0)
+        self.assertEqual(response.context['logbook_status'], 'Not Submitted')
+
+
+class AcademicDashboardTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(company_name='Unassigned Company', address='-')
+        self.internship = make_internship(self.company)
+        self.supervisor_user = make_user('acd', 'academic')
+        self.company_supervisor = make_user('cpy1', 'company').companysupervisor
+        self.students = 0
+        self.client.force_login(self.supervisor_user)
+
+    def add_students(self, count):
+        for _ in range(count):
+            self.students += 1
+            student = make_user(f'std{self.students}', 'student').student
+            student.academic_supervisor = self.supervisor_user.academicsupervisor
+            student.save()
+            application = InternshipApplication.objects.create(student=student, internship=self.internship)
+            Logbook.objects.create(
+                student=student, application=application, week_no=1, content='Week one',
+                submitted_date=date(2026, 1, 7),
+            )
+            PerformanceEvaluation.objects.create(
+                student=student, application=application, company_supervisor=self.company_supervisor,
+                academic_supervisor=self.supervisor_user.academicsupervisor,
+            )
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('academic_dashboard'), params)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_students(self):
+        self.add_students(2)
+        _, few = self.get()
+
+        self.add_students(ACADEMIC_QUEUE_PAGE_SIZE + 3)
+        response, many = self.get()
+
+        self.assertEqual(few, many)
+        self.assertEqual(response.context['pending_logbooks'].paginator.count, ACADEMIC_QUEUE_PAGE_SIZE + 5)
+        self.assertEqual(len(response.context['pending_logbooks']), ACADEMIC_QUEUE_PAGE_SIZE)
+        self.assertEqual(len(response.context['pending_evals']), ACADEMIC_QUEUE_PAGE_SIZE)
+        self.assertContains(response, 'evals_page=2')
+
+    def test_later_pages(self):
+        self.add_students(ACADEMIC_QUEUE_PAGE_SIZE + 1)
+        response, _ = self.get(logbooks_page=2)
+
+        self.assertEqual(len(response.context['pending_logbooks']), 1)
+        self.assertEqual(response.context['pending_evals'].number, 1)
+
+
+class BulkAttendanceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(company_name='Unassigned Company', address='-')
+        internship = make_internship(company)
+        self.user = make_user('cpy1', 'company')
+        other = make_user('cpy2', 'company').companysupervisor
+
+        def place(username, supervisor, status='Active'):
+            return InternshipPlacement.objects.create(
+                internship=internship, student=make_user(username, 'student').student, company_supervisor=supervisor,
+                start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), status=status,
+            ).pk
+
+        self.mine = [place(f'std{n}', self.user.companysupervisor) for n in range(4)]
+        self.completed = place('old', self.user.companysupervisor, status='Completed')
+        self.foreign = place('other', other)
+        self.client.force_login(self.user)
+
+    def bulk(self, action, ids):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('interns_attendance_bulk'), {'action': action, 'placement_id': ids})
+        writes = [q['sql'] for q in ctx.captured_queries
+                  if q['sql'].startswith(('INSERT', 'UPDATE')) and '"placement_attendance"' in q['sql'].split('SET')[0]]
+        return response.json(), writes
+
+    def test_check_in_then_out_in_one_statement_each(self):
+        result, writes = self.bulk('checkin', self.mine[:3] + [self.foreign, self.completed, 'x'])
+        self.assertEqual(result['checked_in'], self.mine[:3])
+        self.assertEqual(result['invalid'], [self.foreign, self.completed])
+        self.assertEqual(len(writes), 1)
+
+        result, writes = self.bulk('checkout', self.mine)
+        # The fourth intern had not checked in: in and out at once, like the per-row button
+        self.assertEqual(result['checked_in'], self.mine[3:])
+        self.assertEqual(sorted(result['checked_out']), self.mine)
+        self.assertEqual(len(writes), 2)
+        self.assertFalse(Attendance.objects.filter(check_out__isnull=True).exists())
+        self.assertEqual(Attendance.objects.count(), 4)
+
+        closed_at = list(Attendance.objects.order_by('pk').values_list('check_out', 'updated_at'))
+        result, writes = self.bulk('checkout', self.mine)
+        self.assertEqual(result['unchanged'], self.mine)
+        # The guarded UPDATE runs but finds nothing open
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(list(Attendance.objects.order_by('pk').values_list('check_out', 'updated_at')), closed_at)
+
+    def test_counters_and_dashboard_follow_bulk_writes(self):
+        self.assertEqual(self.client.get(reverse('company_dashboard')).context['attendance_not_marked'], 4)
+
+        self.bulk('checkin', self.mine[:2])
+
+        self.assertEqual(self.client.get(reverse('company_dashboard')).context['attendance_not_marked'], 2)
+        self.assertEqual(SystemStats.objects.get().attendance_total, 2)
+        self.assertEqual(stats_drift(), [])
+
+    def test_page_buttons(self):
+        url = reverse('interns_attendance')
+        self.assertRedirects(self.client.post(url, {'placement_id': self.mine[0], 'action': 'checkin'}), url)
+        self.client.post(url, {'placement_id': self.mine[1:3], 'action': 'checkout'})
+
+        self.assertEqual(Attendance.objects.filter(check_out__isnull=True).count(), 1)
+        self.assertEqual(Attendance.objects.count(), 3)
+        response = self.client.post(url, {'placement_id': self.foreign, 'action': 'checkin'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_row_button_accepts_any_of_the_supervisors_placements(self):
+        url = reverse('interns_attendance')
+        self.assertRedirects(self.client.post(url, {'placement_id': self.completed, 'action': 'checkin'}), url)
+        self.assertTrue(Attendance.objects.filter(placement=self.completed).exists())
+
+        # The bulk buttons still only take active interns
+        self.client.post(url, {'placement_id': [self.completed, self.mine[0]], 'action': 'checkout'})
+        self.assertIsNone(Attendance.objects.get(placement=self.completed).check_out)
+
+
+class AttendanceUpsertTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(company_name='Unassigned Company', address='-')
+        self.internship = make_internship(company)
+        self.supervisor = make_user('cpy1', 'company').companysupervisor
+        self.placement = InternshipPlacement.objects.create(
+            internship=self.internship, student=make_user('std1', 'student').student,
+            company_supervisor=self.supervisor, start_date=date(2026, 1, 1), end_date=date(2026, 3, 31),
+            status='Active',
+        )
+
+    def test_one_record_per_placement_and_day(self):
+        Attendance.objects.create(placement=self.placement, date=date(2026, 1, 5), check_in='09:00')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Attendance.objects.create(placement=self.placement, date=date(2026, 1, 5), check_in='10:00')
+
+    def test_check_in_is_a_single_upsert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = mark_attendance(self.supervisor, [self.placement.pk], 'checkin')
+
+        attendance_sql = [q['sql'] for q in ctx.captured_queries if '"placement_attendance"' in q['sql']]
+        self.assertEqual(len(attendance_sql), 1)
+        self.assertIn('ON CONFLICT', attendance_sql[0])
+        self.assertEqual(result['checked_in'], [self.placement.pk])
+
+        # A second click (or a concurrent one) finds the record already there
+        result = mark_attendance(self.supervisor, [self.placement.pk], 'checkin')
+        self.assertEqual(result['unchanged'], [self.placement.pk])
+        self.assertEqual(Attendance.objects.count(), 1)
+        self.assertEqual(SystemStats.objects.get().attendance_total, 1)
+
+    def test_early_morning_check_in_is_recorded_under_the_local_date(self):
+        # 07:30 on 6 January in Kuala Lumpur is still 5 January in UTC
+        moment = datetime(2026, 1, 5, 23, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=moment), \
+                mock.patch('placement.attendance.now', return_value=moment):
+            mark_attendance(self.supervisor, [self.placement.pk], 'checkin')
+
+        record = Attendance.objects.get()
+        self.assertEqual((record.date, record.check_in), (date(2026, 1, 6), time(7, 30)))
+
+    def test_admin_cannot_add_a_second_record_for_a_day(self):
+        Attendance.objects.create(placement=self.placement, date=date(2026, 1, 5), check_in='09:00')
+        self.client.force_login(make_user('adm', 'admin'))
+        url = reverse('admin_attendance_manage', args=[self.internship.pk]) + f'?placement={self.placement.pk}'
+
+        response = self.client.post(url, {
+            'add_attendance': '1', 'date': '2026-01-05', 'check_in': '10:00', 'check_out': '17:00',
+        }, follow=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('already an attendance record', str(list(response.context['messages'])[0]))
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_admin_add_only_reports_duplicates_as_duplicates(self):
+        self.client.force_login(make_user('adm', 'admin'))
+        url = reverse('admin_attendance_manage', args=[self.internship.pk]) + f'?placement={self.placement.pk}'
+
+        # A missing check-in violates NOT NULL, not the one-record-per-day constraint
+        with self.assertRaises(IntegrityError):
+            self.client.post(url, {'add_attendance': '1', 'date': '2026-01-05', 'check_out': '17:00'})
+        self.assertFalse(Attendance.objects.exists())
+
+    @override_settings(NOTIFICATION_COALESCE_WINDOW=600)
+    def test_admin_edits_on_different_days_are_notified_separately(self):
+        for day in (5, 6):
+            Attendance.objects.create(placement=self.placement, date=date(2026, 1, day), check_in='09:00')
+        admin = make_user('adm', 'admin')
+        self.client.force_login(admin)
+        url = reverse('admin_attendance_manage', args=[self.internship.pk]) + f'?placement={self.placement.pk}'
+
+        for attendance in Attendance.objects.order_by('date'):
+            for check_out in ('17:00', '18:00'):
+                self.client.post(url, {
+                    'edit_attendance': '1', 'attendance_id': attendance.pk,
+                    'check_in': '09:00', 'check_out': check_out,
+                })
+
+        receipts = NotificationReceipt.objects.filter(
+            user=admin, message__kind='attendance_updated'
+        ).order_by('message__subject')
+        self.assertEqual(
+            [(receipt.message.subject, receipt.repeat_count) for receipt in receipts],
+            [(f'placement:{self.placement.pk}:2026-01-05', 2), (f'placement:{self.placement.pk}:2026-01-06', 2)]
+        )
+
+
+class CountingMigrationTests(TransactionTestCase):
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('placement', target)])
+        return executor.loader.project_state([('placement', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_counters_duplicates_and_rollups(self):
+        apps = self.migrate('0011_notification_coalescing')
+        Company = apps.get_model('placement', 'Company')
+        User = apps.get_model('placement', 'User')
+        Student = apps.get_model('placement', 'Student')
+        CompanySupervisor = apps.get_model('placement', 'CompanySupervisor')
+        Internship = apps.get_model('placement', 'Internship')
+        Placement = apps.get_model('placement', 'InternshipPlacement')
+        Attendance = apps.get_model('placement', 'Attendance')
+
+        company = Company.objects.create(company_name='Acme', address='KL')
+        internship = Internship.objects.create(
+            company=company, title='Intern', description='-', location='KL', start_date=date(2026, 1, 1),
+            end_date=date(2026, 3, 31), total_slots=1, status='Open',
+        )
+        placement = Placement.objects.create(
+            internship=internship,
+            student=Student.objects.create(user=User.objects.create(username='std1', role='student')),
+            company_supervisor=CompanySupervisor.objects.create(
+                user=User.objects.create(username='cpy1', role='company'), company=company
+            ),
+            start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), status='Active',
+        )
+        day = date(2026, 1, 5)
+        first = Attendance.objects.create(placement=placement, date=day, check_in='09:00')
+        Attendance.objects.create(placement=placement, date=day, check_in='08:30', check_out='17:00')
+        Attendance.objects.create(placement=placement, date=date(2026, 1, 6), check_in='09:00')
+
+        # 0012 counts what is there
+        apps = self.migrate('0012_stats')
+        stats = apps.get_model('placement', 'CompanyStats').objects.get(company=company.pk)
+        self.assertEqual((stats.placements_active, stats.attendance_total), (1, 3))
+        self.assertEqual(apps.get_model('placement', 'SystemStats').objects.get().attendance_total, 3)
+
+        # 0013 merges the duplicate and takes it off the counters
+        apps = self.migrate('0013_attendance_placement_date')
+        Attendance = apps.get_model('placement', 'Attendance')
+        self.assertEqual(Attendance.objects.count(), 2)
+        merged = Attendance.objects.get(date=day)
+        self.assertEqual(merged.pk, first.pk)
+        self.assertEqual((str(merged.check_in), str(merged.check_out)), ('08:30:00', '17:00:00'))
+        self.assertEqual(apps.get_model('placement', 'SystemStats').objects.get().attendance_total, 2)
+        self.assertEqual(
+            apps.get_model('placement', 'CompanyStats').objects.get(company=company.pk).attendance_total, 2
+        )
+
+        # 0014 fills the rollup; both agree with what the current code counts
+        self.migrate('0014_attendance_monthly')
+        self.assertEqual(AttendanceMonthly.objects.get(placement=placement.pk).present_days, 2)
+        self.assertEqual(stats_drift(), [])
+        self.assertEqual(attendance_monthly_drift(), [])
+
+
+@override_settings(ATTENDANCE_LATE_AFTER='09:00')
+class AttendanceSummaryTests(TestCase):
+
+    def setUp(self):
+        company = Company.objects.create(company_name='Unassigned Company', address='-')
+        self.student = make_user('std1', 'student').student
+        self.placement = InternshipPlacement.objects.create(
+            internship=make_internship(company), student=self.student,
+            company_supervisor=make_user('cpy1', 'company').companysupervisor,
+            start_date=date(2025, 1, 1), end_date=date(2025, 3, 31), status='Active',
+        )
+        # Week of Monday 6 January 2025
+        for day, check_in, check_out in [
+            (6, '09:00', '17:00'),
+            (7, '09:30', '17:00'),   # late
+            (8, '08:55', None),      # never checked out
+            (11, '10:00', '12:00'),  # Saturday
+        ]:
+            Attendance.objects.create(placement=self.placement, date=date(2025, 1, day),
+                                      check_in=check_in, check_out=check_out)
+
+    def summary(self, start=date(2025, 1, 6), end=date(2025, 1, 12)):
+        return summarize_attendance(InternshipPlacement.objects.all(), start, end)[self.placement.pk]
+
+    def test_working_days(self):
+        self.assertEqual(working_days(date(2025, 1, 1), date(2025, 1, 31)), 23)
+        self.assertEqual(working_days(date(2025, 1, 11), date(2025, 1, 12)), 0)
+        self.assertEqual(working_days(date(2025, 1, 12), date(2025, 1, 11)), 0)
+
+    def test_summary(self):
+        self.assertEqual(self.summary(), {
+            'working_days': 5, 'present_days': 4, 'absent_days': 2, 'late_days': 2,
+            'total_minutes': 480 + 450 + 120, 'total_hours': 17.5,
+        })
+
+    @override_settings(ATTENDANCE_HOLIDAYS=[date(2025, 1, 9)])
+    def test_holidays_are_not_absences(self):
+        summary = self.summary()
+        self.assertEqual((summary['working_days'], summary['absent_days']), (4, 1))
+
+    def test_range_is_clipped_to_the_placement(self):
+        self.placement.start_date = date(2025, 1, 8)
+        self.placement.save()
+
+        summary = self.summary()
+        self.assertEqual((summary['working_days'], summary['present_days'], summary['absent_days']), (3, 2, 2))
+
+    def test_one_query_for_many_placements(self):
+        with self.assertNumQueries(1):
+            summaries = summarize_attendance(InternshipPlacement.objects.all())
+        total = combine_summaries(summaries.values())
+        self.assertEqual(total['present_days'], 4)
+        self.assertEqual(total['working_days'], working_days(date(2025, 1, 1), date(2025, 3, 31)))
+
+    def test_student_page(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('student_attendance_summary'), {'month': 1, 'year': 2025})
+
+        self.assertEqual(response.context['total_days_present'], 4)
+        self.assertEqual(response.context['total_days_absent'], 23 - 3)
+        self.assertContains(response, 'Late Arrivals: 2')
+
+
+@override_settings(ATTENDANCE_LATE_AFTER='09:00')
+class AttendanceMonthlyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(company_name='Unassigned Company', address='-')
+        self.internship = make_internship(company)
+        self.supervisor = make_user('cpy1', 'company').companysupervisor
+        self.placement = InternshipPlacement.objects.create(
+            internship=self.internship, student=make_user('std1', 'student').student,
+            company_supervisor=self.supervisor, start_date=date(2025, 1, 1), end_date=date(2025, 3, 31),
+            status='Active',
+        )
+
+    def month(self, year=2025, month=1):
+        return AttendanceMonthly.objects.values(
+            'present_days', 'present_working_days', 'late_days', 'total_minutes'
+        ).get(placement=self.placement, year=year, month=month)
+
+    def test_kept_current_on_create_edit_and_delete(self):
+        monday = Attendance.objects.create(placement=self.placement, date=date(2025, 1, 6), check_in='09:00')
+        Attendance.objects.create(placement=self.placement, date=date(2025, 1, 11), check_in='09:30',
+                                  check_out='11:00')
+        self.assertEqual(self.month(), {
+            'present_days': 2, 'present_working_days': 1, 'late_days': 1, 'total_minutes': 90,
+        })
+
+        # As admin_manage_attendance edits it: submitted strings, only some fields saved
+        monday = Attendance.objects.get(pk=monday.pk)
+        monday.check_in, monday.check_out = '09:15', '17:00'
+        monday.save(update_fields=['check_in', 'check_out', 'updated_at'])
+        self.assertEqual(self.month(), {
+            'present_days': 2, 'present_working_days': 1, 'late_days': 2, 'total_minutes': 90 + 465,
+        })
+
+        monday.delete()
+        self.assertEqual(self.month(), {
+            'present_days': 1, 'present_working_days': 0, 'late_days': 1, 'total_minutes': 90,
+        })
+        self.assertEqual(attendance_monthly_drift(), [])
+
+    def test_records_outside_the_placement_are_not_counted(self):
+        Attendance.objects.create(placement=self.placement, date=date(2025, 4, 1), check_in='09:00')
+        self.assertFalse(AttendanceMonthly.objects.exists())
+
+        self.placement.end_date = date(2025, 4, 30)
+        self.placement.save()
+        self.assertEqual(self.month(month=4)['present_days'], 1)
+        self.assertEqual(attendance_monthly_drift(), [])
+
+    def test_admin_placement_edit_recounts_and_clears_dashboards(self):
+        Attendance.objects.create(placement=self.placement, date=date(2025, 1, 6), check_in='09:00')
+        company_dashboard_snapshot(self.supervisor)
+        new_supervisor = make_user('cpy2', 'company').companysupervisor
+        self.client.force_login(make_user('adm', 'admin'))
+
+        self.client.post(reverse('admin_manage_placement', args=[self.placement.pk]), {
+            'save_changes': '1', 'student': self.placement.student_id, 'internship': self.internship.pk,
+            'company_supervisor': new_supervisor.pk, 'start_date': '2025-02-01', 'end_date': '2025-03-31',
+            'status': 'Active',
+        })
+
+        self.assertEqual(InternshipPlacement.objects.get().start_date, date(2025, 2, 1))
+        self.assertFalse(AttendanceMonthly.objects.exists())
+        self.assertEqual(attendance_monthly_drift(), [])
+        with CaptureQueriesContext(connection) as ctx:
+            company_dashboard_snapshot(self.supervisor)
+        self.assertTrue(ctx.captured_queries)
+
+    def test_mark_attendance_updates_the_current_month(self):
+        today = timezone.localdate()
+        self.placement.start_date, self.placement.end_date = today, today + timedelta(days=30)
+        self.placement.save()
+
+        mark_attendance(self.supervisor, [self.placement.pk], 'checkin')
+        mark_attendance(self.supervisor, [self.placement.pk], 'checkout')
+
+        self.assertEqual(self.month(today.year, today.month)['present_days'], 1)
+        self.assertEqual(attendance_monthly_drift(), [])
+
+    def test_checkout_only_counts_records_it_closed(self):
+        today = timezone.localdate()
+        self.placement.start_date, self.placement.end_date = today, today + timedelta(days=30)
+        self.placement.save()
+        Attendance.objects.create(placement=self.placement, date=today, check_in='00:00')
+
+        first = mark_attendance(self.supervisor, [self.placement.pk], 'checkout')
+        minutes = self.month(today.year, today.month)['total_minutes']
+        # A second (or concurrent) checkout finds nothing open and changes nothing
+        second = mark_attendance(self.supervisor, [self.placement.pk], 'checkout')
+
+        self.assertEqual((first['checked_out'], second['checked_out']), ([self.placement.pk], []))
+        self.assertEqual(second['unchanged'], [self.placement.pk])
+        self.assertEqual(close_attendance([self.placement.pk], today, time(23, 0)), {})
+        self.assertEqual(self.month(today.year, today.month)['total_minutes'], minutes)
+        self.assertEqual(attendance_monthly_drift(), [])
+
+    def test_whole_months_are_read_from_the_rollup(self):
+        Attendance.objects.create(placement=self.placement, date=date(2025, 1, 6), check_in='09:00',
+                                  check_out='17:00')
+        Attendance.objects.create(placement=self.placement, date=date(2025, 2, 3), check_in='09:30')
+        placements = InternshipPlacement.objects.all()
+
+        with CaptureQueriesContext(connection) as ctx:
+            rollup = summarize_attendance(placements, date(2025, 1, 1), date(2025, 2, 28))
+        self.assertNotIn('"placement_attendance"', ctx.captured_queries[0]['sql'])
+
+        # The same figures as counting the records (a range that doesn't start on the 1st)
+        self.assertEqual(rollup, summarize_attendance(placements, date(2024, 12, 31), date(2025, 2, 28)))
+        self.assertEqual(rollup[self.placement.pk]['present_days'], 2)
+        self.assertEqual(rollup[self.placement.pk]['total_minutes'], 480)
+
+    def test_rebuild_command(self):
+        Attendance.objects.create(placement=self.placement, date=date(2025, 1, 6), check_in='09:00')
+        AttendanceMonthly.objects.update(present_days=5)
+
+        with self.assertRaisesMessage(CommandError, '1 monthly figure(s) out of date'):
+            call_command('rebuild_attendance_monthly', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_attendance_monthly', stdout=out)
+        self.assertIn(f'placement {self.placement.pk} 2025-01 present_days: stored 5, counted 1', out.getvalue())
+        self.assertEqual(attendance_monthly_drift(), [])
@@ -24,6 +24,9 @@ urlpatterns = [
     path('dashboard/', views.dashboard_redirect, name='dashboard'),  # redirect based on role
     path('notifications/', views.notifications, name='notifications'),
     path('notifications/read/<int:pk>/', views.mark_notification_read, name='mark_notification_read'),
+    path('notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
+    path('notifications/feed/', views.notifications_feed, name='notifications_feed'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
 
     path('student/dashboard/', views.student_dashboard, name='student_dashboard'),
     path('student/profile/', views.student_profile, name='student_profile'),
@@ -44,6 +47,7 @@ urlpatterns = [
     path('company/', views.company_dashboard, name='company_dashboard'),
     path('student/profile/<int:student_id>/', views.student_profile, name='company_student_profile'),
     path('company/attendance/', views.interns_attendance, name='interns_attendance'),
+    path('company/attendance/bulk/', views.interns_attendance_bulk, name='interns_attendance_bulk'),
     path('company/attendance_summary/', views.attendance_summary, name='attendance_summary'),
     path('company/evaluation/', views.intern_evaluation_list, name='evaluation_list'),
     path('company/evaluation_form/<int:placement_id>', views.evaluate_intern, name='interns_evaluation'),
@@ -84,6 +88,8 @@ urlpatterns = [
     path('manager/logbooks/', views.admin_logbooks_list, name='admin_logbooks_list'),
     path('manager/logbooks/manage/', views.admin_logbooks_manage, name='admin_logbooks_manage'),
     path('manager/evaluations/manage/', views.admin_evaluations_manage, name='admin_evaluations_manage'),
+    path('manager/profiles/', views.admin_profiles, name='admin_profiles'),
+    path('manager/profiles/<str:name>/', views.admin_profile_detail, name='admin_profile_detail'),
 
 
 
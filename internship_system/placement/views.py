@@ -1,17 +1,31 @@
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db import transaction, models
+from django.db import IntegrityError, transaction, models
 from django.views.decorators.http import require_POST
-from django.db.models import Q, Prefetch, Exists, OuterRef, Count
+from django.db.models import Q, Prefetch, Exists, OuterRef, Count, Subquery
 from django.utils import timezone
+from .attendance import (
+    ACTIONS as ATTENDANCE_ACTIONS, combine_summaries, mark_attendance, rebuild_attendance_monthly, summarize_attendance
+)
+from .dashboard import (
+    admin_dashboard_snapshot, company_dashboard_snapshot, invalidate_admin_dashboard, invalidate_company_dashboards
+)
 from .decorators import role_required
+from .middleware import load_profile
+from .notifications import notify, mark_read, inbox_page, INBOX_PAGE_SIZE, INBOX_MAX_PAGE_SIZE
+from .profiling import list_profiles, read_profile, profile_path
+from .stats import record_bulk_status_change
+from .streams import notification_events
 from .forms import AdminUserForm, StudentForm, AcademicSupervisorForm, CompanySupervisorForm, StudentProfileForm, DocumentUploadForm, InternshipApplicationForm, InternshipForm, InternshipPlacementForm
 from django.utils.timezone import now, localtime
 from datetime import timedelta, date, datetime
-from django.http import JsonResponse, HttpResponseForbidden
+from django.core.paginator import Paginator
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, HttpResponseForbidden, StreamingHttpResponse
 from .models import (
     User,
     Student, 
@@ -27,14 +41,24 @@ from .models import (
     InternshipApplication,
     InternshipPlacement,
     Department,
-    Notification
+    NotificationReceipt
 )
 
+# Rows per page of the academic dashboard's pending logbook / evaluation queues
+ACADEMIC_QUEUE_PAGE_SIZE = 10
+
 def departments_by_company(request, company_id):
     """Return JSON list of departments for a given company."""
     departments = Department.objects.filter(company_id=company_id).values('id', 'name')
     return JsonResponse(list(departments), safe=False)
 
+def profile_or_404(request, model):
+    """The logged-in user's role profile, loaded once per request by RoleProfileMiddleware."""
+    profile = request.profile
+    if not isinstance(profile, model):
+        raise Http404(f"No {model._meta.verbose_name} profile for this user.")
+    return profile
+
 def application_has_placement(application):
     return InternshipPlacement.objects.filter(
         student=application.student,
@@ -78,36 +102,29 @@ def dashboard_redirect(request):
 @login_required
 @role_required(allowed_roles=['student'])
 def student_dashboard(request):
-    student = request.user.student
+    # The profile and all dashboard figures in one query; later readers of
+    # request.profile (context processors, templates) reuse it
+    student = load_profile(
+        request.user,
+        has_active_placement=Exists(InternshipPlacement.objects.filter(student=OuterRef('pk'), status='Active')),
+        application_count=Count('internshipapplication'),
+        latest_logbook_status=Subquery(
+            Logbook.objects.filter(student=OuterRef('pk')).order_by('-submitted_date').values('status')[:1]
+        ),
+    )
+    request.profile = student
 
     # Placement status
-    placement = InternshipPlacement.objects.filter(
-        student=student,
-        status='Active'
-    ).first()
-
-    placement_status = 'Assigned' if placement else 'Not Assigned'
+    placement_status = 'Assigned' if student and student.has_active_placement else 'Not Assigned'
 
     # Total internship applications
-    application_count = InternshipApplication.objects.filter(
-        student=student
-    ).count()
+    application_count = student.application_count if student else 0
 
     # Logbook status (latest submission)
-    latest_logbook = Logbook.objects.filter(
-        student=student
-    ).order_by('-submitted_date').first()
-
-    if latest_logbook:
-        logbook_status = latest_logbook.status
-    else:
-        logbook_status = 'Not Submitted'
+    logbook_status = (student and student.latest_logbook_status) or 'Not Submitted'
 
     # Unread notifications
-    notification_count = Notification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).count()
+    notification_count = request.user.unread_notifications
 
     context = {
         'placement_status': placement_status,
@@ -121,12 +138,9 @@ def student_dashboard(request):
 @login_required
 @role_required(allowed_roles=['company'])
 def company_dashboard(request):
-    try:
-        #Logged-in company supervisor
-        company_supervisor = CompanySupervisor.objects.get(user=request.user)
-        company = company_supervisor.company
-        profile_missing = False
-    except CompanySupervisor.DoesNotExist:
+    #Logged-in company supervisor
+    company_supervisor = request.profile
+    if not company_supervisor:
         return render(
             request,
             'company/dashboard.html',
@@ -141,62 +155,19 @@ def company_dashboard(request):
             }
         )
 
-    #1. Total active interns
-    total_interns = InternshipPlacement.objects.filter(
-        company_supervisor = company_supervisor,
-        status = 'Active'
-    ).count()
-
-    #2. Pending internship applications
-    pending_applications = InternshipApplication.objects.filter(
-        #internship__company = company,
-        internship__department=company_supervisor.department,
-        status = 'Pending'
-    ).count()
-
-    #3. Pending logbooks
-    pending_logbooks = Logbook.objects.filter(
-        application__internship__company = company,
-        company_approval__isnull =  True
-    ).count()
-
-    #4. Attendance that has not marked yet
-    today = now().date()
-
-    attendance_not_marked = InternshipPlacement.objects.filter(
-        company_supervisor = company_supervisor,
-        status = 'Active'
-    ).exclude(
-        attendance__date = today
-    ).count()
+    # One query for all five figures, cached briefly (see placement.dashboard)
+    context = dict(company_dashboard_snapshot(company_supervisor))
+    context['profile_missing'] = False
 
-    #5. Pending evaluation
-    pending_evaluation = PerformanceEvaluation.objects.filter(
-        company_supervisor = request.user.companysupervisor,
-        company_supervisor_submitted_at__isnull = True
-    ).count()
-
-    return render(
-        request,
-        'company/dashboard.html',
-        {
-            'total_interns': total_interns,
-            'pending_applications': pending_applications,
-            'pending_logbooks': pending_logbooks,
-            'attendance_not_marked': attendance_not_marked,
-            'pending_evaluation': pending_evaluation,
-            'profile_missing': False,
-        }
-    )
+    return render(request, 'company/dashboard.html', context)
 
 @login_required
 @role_required(allowed_roles=['company'])
 def interns_attendance(request):
-    today = now().date()
+    today = timezone.localdate()
 
-    try:
-        company_supervisor = CompanySupervisor.objects.get(user=request.user)
-    except CompanySupervisor.DoesNotExist:
+    company_supervisor = request.profile
+    if not company_supervisor:
         return render(request, 'company/attendance.html', {
             'profile_missing': True,
             'placements': [],
@@ -219,24 +190,15 @@ def interns_attendance(request):
     )
 
     if request.method == 'POST':
-        placement_id = request.POST.get('placement_id')
-        action = request.POST.get('action')
+        # One row from its own button, or every ticked row from the bulk buttons.
+        # A single row may be any of the supervisor's placements, as it always could.
+        placement_ids = request.POST.getlist('placement_id')
+        single = len(placement_ids) == 1
+        action = 'checkout' if request.POST.get('action') == 'checkout' else 'checkin'
+        result = mark_attendance(company_supervisor, placement_ids, action, active_only=not single)
 
-        placement = get_object_or_404(
-            InternshipPlacement,
-            id=placement_id,
-            company_supervisor = company_supervisor
-        )
-
-        attendance, created = Attendance.objects.get_or_create(
-            placement = placement,
-            date = today,
-            defaults={'check_in': localtime(now()).time()}
-        )
-
-        if action == 'checkout' and attendance.check_out is None:
-            attendance.check_out = localtime(now()).time()
-            attendance.save()
+        if result['invalid'] and single:
+            raise Http404("No such placement")
 
         return redirect('interns_attendance')
 
@@ -248,14 +210,25 @@ def interns_attendance(request):
 
     return render(request, 'company/attendance.html', context)
 
+@login_required
+@role_required(allowed_roles=['company'])
+@require_POST
+def interns_attendance_bulk(request):
+    """Check any selection of active interns in or out; ``placement_id`` may repeat."""
+    company_supervisor = request.profile
+    action = request.POST.get('action')
+    if not company_supervisor or action not in ATTENDANCE_ACTIONS:
+        return JsonResponse({'error': "Unknown action or missing supervisor profile"}, status=400)
+
+    return JsonResponse(mark_attendance(company_supervisor, request.POST.getlist('placement_id'), action))
+
 @login_required
 @role_required(allowed_roles=['company'])
 def attendance_summary(request):
-    date = request.GET.get('date', now().date())
+    date = request.GET.get('date', timezone.localdate())
 
-    try:
-        company_supervisor = CompanySupervisor.objects.get(user=request.user)
-    except CompanySupervisor.DoesNotExist:
+    company_supervisor = request.profile
+    if not company_supervisor:
         return render(request, 'company/attendance_summary.html', {
             'profile_missing': True,
             'placements': [],
@@ -284,9 +257,8 @@ def attendance_summary(request):
 @login_required
 @role_required(allowed_roles=['company'])
 def intern_evaluation_list(request):
-    try:
-        company = CompanySupervisor.objects.get(user=request.user)
-    except CompanySupervisor.DoesNotExist:
+    company = request.profile
+    if not company:
         return render(request, 'company/evaluation.html', {
             'placements': [],
             'profile_missing': True
@@ -294,16 +266,16 @@ def intern_evaluation_list(request):
 
     placements = InternshipPlacement.objects.filter(
         company_supervisor = company
-    ).select_related('student')
-
-    today = timezone.now().date()
-    for placement in placements:
-        placement.is_evaluated = PerformanceEvaluation.objects.filter(
-            application__student = placement.student,
-            company_supervisor = company,
+    ).select_related('student__user').annotate(
+        is_evaluated=Exists(PerformanceEvaluation.objects.filter(
+            application__student=OuterRef('student'),
+            company_supervisor=company,
             company_supervisor_submitted_at__isnull=False
-        ).exists()
+        ))
+    )
 
+    today = timezone.localdate()
+    for placement in placements:
         # Allow evaluation if active and within 1 week of end date
         days_left = (placement.end_date - today).days
         placement.can_evaluate = placement.status == 'Active' and days_left <= 7
@@ -354,9 +326,9 @@ def evaluate_intern(request, placement_id):
 
         # Notify academic supervisor if exists
         if evaluation.academic_supervisor:
-            Notification.objects.create(
-                user=evaluation.academic_supervisor.user,
-                message=f"Company Supervisor has submitted evaluation form for {evaluation.student.user.username}."
+            notify(
+                evaluation.academic_supervisor.user,
+                f"Company Supervisor has submitted evaluation form for {evaluation.student.user.username}."
             )
 
         return redirect('evaluation_list')
@@ -368,19 +340,27 @@ def evaluate_intern(request, placement_id):
 @login_required
 @role_required(allowed_roles=['academic'])
 def academic_dashboard(request):
-    supervisor = request.user.academicsupervisor
-
-    students = Student.objects.filter(academic_supervisor=supervisor)
-
-    pending_logbooks = Logbook.objects.filter(
-        student__in=students,
-        academic_supervisor_notes__isnull=True
-    )
-
-    pending_evals = PerformanceEvaluation.objects.filter(
-        academic_supervisor=supervisor,
-        academic_supervisor_submitted_at__isnull=True
-    )
+    supervisor = request.profile
+
+    students = Student.objects.filter(academic_supervisor=supervisor).select_related('user')
+
+    # Work queues: a total plus one page of rows each, so the query count
+    # does not grow with the number of students
+    pending_logbooks = Paginator(
+        Logbook.objects.filter(
+            student__academic_supervisor=supervisor,
+            academic_supervisor_notes__isnull=True
+        ).select_related('student__user').order_by('submitted_date', 'pk'),
+        ACADEMIC_QUEUE_PAGE_SIZE
+    ).get_page(request.GET.get('logbooks_page'))
+
+    pending_evals = Paginator(
+        PerformanceEvaluation.objects.filter(
+            academic_supervisor=supervisor,
+            academic_supervisor_submitted_at__isnull=True
+        ).select_related('student__user').order_by('pk'),
+        ACADEMIC_QUEUE_PAGE_SIZE
+    ).get_page(request.GET.get('evals_page'))
 
     context = {
         'students': students,
@@ -393,7 +373,7 @@ def academic_dashboard(request):
 
 
 def academic_student_detail(request, student_id):
-    supervisor = request.user.academicsupervisor
+    supervisor = request.profile
     student = get_object_or_404(Student, id=student_id, academic_supervisor=supervisor)
 
     # Logbooks
@@ -417,7 +397,7 @@ def academic_student_detail(request, student_id):
 
 def submit_academic_evaluation(request, student_id):
     student = get_object_or_404(Student, id=student_id)
-    academic_supervisor = request.user.academicsupervisor
+    academic_supervisor = request.profile
 
     # Create a new evaluation or get existing one for this student and supervisor
     evaluation, created = PerformanceEvaluation.objects.get_or_create(
@@ -472,18 +452,21 @@ def academic_student_attendance(request, student_id):
         placement__student=student
     ).order_by('-date')
 
+    # Totals across all of the student's placements
+    summary = combine_summaries(
+        summarize_attendance(InternshipPlacement.objects.filter(student=student)).values()
+    )
+
     return render(request, 'academic/academic_student_attendance.html', {
         'student': student,
         'attendance_records': attendance_records,
+        'summary': summary,
     })
 
 @login_required
 def academic_records(request, student_id):
     student = get_object_or_404(Student, id=student_id)
-    academic_supervisor = get_object_or_404(
-        AcademicSupervisor,
-        user=request.user
-    )
+    academic_supervisor = profile_or_404(request, AcademicSupervisor)
 
     records = AcademicRecord.objects.filter(student=student).order_by('-created_at')
 
@@ -506,79 +489,18 @@ def academic_records(request, student_id):
 @login_required
 @role_required(allowed_roles=['admin'])
 def admin(request):
-    # Summary metrics
-    total_users = User.objects.count()
-    students_count = User.objects.filter(role='student').count()
-    companies_count = User.objects.filter(role='company').count()
-    academics_count = User.objects.filter(role='academic').count()
-    admins_count = User.objects.filter(role='admin').count()
-    
-    total_internships = Internship.objects.count()
-    open_internships = Internship.objects.filter(status='Open').count()
-    closed_internships = Internship.objects.filter(status='Closed').count()
-    
-    total_applications = InternshipApplication.objects.count()
-    pending_applications = InternshipApplication.objects.filter(status='Pending').count()
-    accepted_applications = InternshipApplication.objects.filter(status='Accepted').count()
-    rejected_applications = InternshipApplication.objects.filter(status='Rejected').count()
-    offered_applications = InternshipApplication.objects.filter(status='Offered').count()
-    
-    active_placements = InternshipPlacement.objects.filter(status='Active').count()
-    completed_placements = InternshipPlacement.objects.filter(status='Completed').count()
-    
-    total_logbooks = Logbook.objects.count()
-    pending_logbooks = Logbook.objects.filter(status='Pending').count()
-    approved_logbooks = Logbook.objects.filter(status='Approved').count()
-    rejected_logbooks = Logbook.objects.filter(status='Rejected').count()
-    
-    total_companies = Company.objects.count()
-    total_departments = Department.objects.count()
-    
-    total_attendance = Attendance.objects.count()
-    today_attendance = Attendance.objects.filter(date=timezone.now().date()).count()
-    
-    pending_evaluations = PerformanceEvaluation.objects.filter(
-        Q(company_supervisor_submitted_at__isnull=True) | Q(academic_supervisor_submitted_at__isnull=True)
-    ).count()
-    
+    # Summary metrics (cached; see placement.dashboard)
+    context = dict(admin_dashboard_snapshot())
+
     # Recent notifications for admin
-    recent_notifications = Notification.objects.filter(
+    recent_notifications = NotificationReceipt.objects.filter(
         user=request.user
-    ).order_by('-created_at')[:10]  # Last 10 notifications
+    ).select_related('message').order_by('-created_at')[:10]  # Last 10 notifications
     
-    unread_notifications_count = Notification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).count()
+    unread_notifications_count = request.user.unread_notifications
     
-    context = {
-        'total_users': total_users,
-        'students_count': students_count,
-        'companies_count': companies_count,
-        'academics_count': academics_count,
-        'admins_count': admins_count,
-        'total_internships': total_internships,
-        'open_internships': open_internships,
-        'closed_internships': closed_internships,
-        'total_applications': total_applications,
-        'pending_applications': pending_applications,
-        'accepted_applications': accepted_applications,
-        'rejected_applications': rejected_applications,
-        'offered_applications': offered_applications,
-        'active_placements': active_placements,
-        'completed_placements': completed_placements,
-        'total_logbooks': total_logbooks,
-        'pending_logbooks': pending_logbooks,
-        'approved_logbooks': approved_logbooks,
-        'rejected_logbooks': rejected_logbooks,
-        'total_companies': total_companies,
-        'total_departments': total_departments,
-        'total_attendance': total_attendance,
-        'today_attendance': today_attendance,
-        'pending_evaluations': pending_evaluations,
-        'recent_notifications': recent_notifications,
-        'unread_notifications_count': unread_notifications_count,
-    }
+    context['recent_notifications'] = recent_notifications
+    context['unread_notifications_count'] = unread_notifications_count
     return render(request, 'admin/admin.html', context)
 
 @login_required
@@ -665,9 +587,9 @@ def admin_add_user(request, user_id=None):
 
                 # Notify admin
                 action = "added" if not user_id else "updated"
-                Notification.objects.create(
-                    user=request.user,
-                    message=f"You {action} user {user.username} ({user.email})."
+                notify(
+                    request.user,
+                    f"You {action} user {user.username} ({user.email})."
                 )
 
                 return redirect('admin_user_list')
@@ -693,9 +615,9 @@ def admin_user_delete(request, user_id):
         return redirect('admin_user_list')
 
     # Notify admin
-    Notification.objects.create(
-        user=request.user,
-        message=f"You deleted user {user.username} ({user.email})."
+    notify(
+        request.user,
+        f"You deleted user {user.username} ({user.email})."
     )
 
     user.delete()
@@ -707,7 +629,7 @@ def admin_user_list(request):
     role_filter = request.GET.get('role', 'all')
 
     if role_filter == 'student':
-        students = User.objects.filter(role='student').select_related('student')
+        students = User.objects.filter(role='student').select_related('student__academic_supervisor__user')
         academics = User.objects.none()
         companies = User.objects.none()
         admins = User.objects.none()
@@ -719,7 +641,7 @@ def admin_user_list(request):
     elif role_filter == 'company':
         students = User.objects.none()
         academics = User.objects.none()
-        companies = User.objects.filter(role='company').select_related('companysupervisor')
+        companies = User.objects.filter(role='company').select_related('companysupervisor__company', 'companysupervisor__department')
         admins = User.objects.none()
     elif role_filter == 'admin':
         students = User.objects.none()
@@ -727,9 +649,9 @@ def admin_user_list(request):
         companies = User.objects.none()
         admins = User.objects.filter(role='admin')
     else:
-        students = User.objects.filter(role='student').select_related('student')
+        students = User.objects.filter(role='student').select_related('student__academic_supervisor__user')
         academics = User.objects.filter(role='academic').select_related('academicsupervisor')
-        companies = User.objects.filter(role='company').select_related('companysupervisor')
+        companies = User.objects.filter(role='company').select_related('companysupervisor__company', 'companysupervisor__department')
         admins = User.objects.filter(role='admin')
 
     return render(request, 'admin/admin_user_list.html', {
@@ -744,7 +666,7 @@ def admin_user_list(request):
 @role_required(allowed_roles=['admin'])
 def admin_company_list(request):
     search = request.GET.get('search', '')
-    companies = Company.objects.all()
+    companies = Company.objects.prefetch_related('departments')
     if search:
         companies = companies.filter(company_name__icontains=search)
     return render(request, 'admin/admin_company_list.html', {
@@ -766,9 +688,9 @@ def admin_add_company(request):
                 address=address
             )
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You added company {company.company_name}."
+            notify(
+                request.user,
+                f"You added company {company.company_name}."
             )
             return redirect('admin_company_list')
 
@@ -786,9 +708,9 @@ def admin_edit_company(request, company_id):
         company.save()
 
         # Notify admin
-        Notification.objects.create(
-            user=request.user,
-            message=f"You updated company {company.company_name}."
+        notify(
+            request.user,
+            f"You updated company {company.company_name}."
         )
 
         # 2️⃣ Update existing departments
@@ -831,9 +753,9 @@ def admin_delete_company(request, company_id):
     company = get_object_or_404(Company, id=company_id)
 
     # Notify admin
-    Notification.objects.create(
-        user=request.user,
-        message=f"You deleted company {company.company_name}."
+    notify(
+        request.user,
+        f"You deleted company {company.company_name}."
     )
 
     company.delete()
@@ -846,7 +768,7 @@ def admin_internships_list(request):
     company_id = request.GET.get('company')
     internships = (
         Internship.objects
-        .select_related('company')
+        .select_related('company', 'department')
         .order_by('company__company_name', 'title')
     )
     if company_id:
@@ -948,9 +870,9 @@ def admin_delete_application(request, application_id):
         return redirect('admin_application_detail', application_id=application.id)
 
     # Notify admin
-    Notification.objects.create(
-        user=request.user,
-        message=f"You deleted application from {application.student.user.username} for {application.internship.title} at {application.internship.company.company_name}."
+    notify(
+        request.user,
+        f"You deleted application from {application.student.user.username} for {application.internship.title} at {application.internship.company.company_name}."
     )
 
     application.delete()
@@ -989,9 +911,9 @@ def admin_replace_supervisor(request, application_id):
         )
 
         # Notify admin
-        Notification.objects.create(
-            user=request.user,
-            message=f"You changed company supervisor to {supervisor.user.username} for internship {internship.title} at {internship.company.company_name}."
+        notify(
+            request.user,
+            f"You changed company supervisor to {supervisor.user.username} for internship {internship.title} at {internship.company.company_name}."
         )
 
         messages.success(
@@ -1068,9 +990,9 @@ def admin_manage_placement(request, placement_id):
 
         if "delete_placement" in request.POST:
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You deleted placement for {placement.student.user.username} at {placement.internship.company.company_name}."
+            notify(
+                request.user,
+                f"You deleted placement for {placement.student.user.username} at {placement.internship.company.company_name}."
             )
             placement.delete()
             messages.success(request, "Placement deleted.")
@@ -1082,9 +1004,9 @@ def admin_manage_placement(request, placement_id):
                 InternshipPlacement, id=remove_id
             )
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You removed {placement_to_remove.student.user.username} from placement at {placement_to_remove.internship.company.company_name}."
+            notify(
+                request.user,
+                f"You removed {placement_to_remove.student.user.username} from placement at {placement_to_remove.internship.company.company_name}."
             )
             placement_to_remove.delete()
             messages.success(request, "Student removed from placement.")
@@ -1096,20 +1018,34 @@ def admin_manage_placement(request, placement_id):
             if form.is_valid():
                 cleaned = form.cleaned_data
 
-                InternshipPlacement.objects.filter(
-                    internship=placement.internship
-                ).update(
-                    company_supervisor=cleaned['company_supervisor'],
-                    start_date=cleaned['start_date'],
-                    end_date=cleaned['end_date'],
-                    status=cleaned['status'],
-                    updated_at=timezone.now()
-                )
+                placements = InternshipPlacement.objects.filter(internship=placement.internship)
+                with transaction.atomic():
+                    # update() skips post_save, so do the receivers' work here
+                    record_bulk_status_change(placements, cleaned['status'])
+                    before = list(placements.values_list('pk', 'company_supervisor', 'start_date', 'end_date'))
+                    placements.update(
+                        company_supervisor=cleaned['company_supervisor'],
+                        start_date=cleaned['start_date'],
+                        end_date=cleaned['end_date'],
+                        status=cleaned['status'],
+                        updated_at=timezone.now()
+                    )
+                    redated = [
+                        pk for pk, _, start_date, end_date in before
+                        if (start_date, end_date) != (cleaned['start_date'], cleaned['end_date'])
+                    ]
+                    if redated:
+                        rebuild_attendance_monthly(placements=redated)
+                    invalidate_company_dashboards(
+                        {supervisor for _, supervisor, _, _ in before}
+                        | {getattr(cleaned['company_supervisor'], 'pk', None)}
+                    )
+                    invalidate_admin_dashboard()
 
                 # Notify admin
-                Notification.objects.create(
-                    user=request.user,
-                    message=f"You updated placements for internship {placement.internship.title} at {placement.internship.company.company_name}."
+                notify(
+                    request.user,
+                    f"You updated placements for internship {placement.internship.title} at {placement.internship.company.company_name}."
                 )
 
                 messages.success(
@@ -1142,6 +1078,8 @@ def admin_attendance_list(request):
         .select_related(
             'internship__company',
             'internship__department',
+            'student__user',
+            'company_supervisor__user',
         )
         .order_by('internship__company__company_name')
     )
@@ -1149,6 +1087,12 @@ def admin_attendance_list(request):
     if company_id:
         placements = placements.filter(internship__company_id=company_id)
 
+    # Present / absent days for every listed placement, in one grouped query
+    summaries = summarize_attendance(placements)
+    placements = list(placements)
+    for placement in placements:
+        placement.attendance_summary = summaries.get(placement.pk)
+
     companies = Company.objects.all().order_by('company_name')
 
     return render(
@@ -1182,6 +1126,7 @@ def admin_manage_attendance(request, internship_id):
 
     selected_placement = None
     attendance_records = []
+    attendance_summary = None
 
     placement_id = request.GET.get('placement')
 
@@ -1195,6 +1140,9 @@ def admin_manage_attendance(request, internship_id):
         attendance_records = Attendance.objects.filter(
             placement=selected_placement
         ).order_by('-date')
+        attendance_summary = summarize_attendance(
+            InternshipPlacement.objects.filter(pk=selected_placement.pk)
+        )[selected_placement.pk]
 
     # 🔒 Lock if placement completed
     is_locked = selected_placement and selected_placement.status == 'Completed'
@@ -1210,9 +1158,11 @@ def admin_manage_attendance(request, internship_id):
                 placement=selected_placement
             )
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You deleted attendance record for {selected_placement.student.user.username} on {attendance.date}."
+            notify(
+                request.user,
+                f"You deleted attendance record for {selected_placement.student.user.username} on {attendance.date}.",
+                kind='attendance_deleted',
+                subject=f"placement:{selected_placement.pk}:{attendance.date}"
             )
             attendance.delete()
             messages.success(request, "Attendance record deleted.")
@@ -1234,9 +1184,11 @@ def admin_manage_attendance(request, internship_id):
             attendance.save(update_fields=['check_in', 'check_out', 'updated_at'])
 
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You updated attendance for {selected_placement.student.user.username} on {attendance.date}."
+            notify(
+                request.user,
+                f"You updated attendance for {selected_placement.student.user.username} on {attendance.date}.",
+                kind='attendance_updated',
+                subject=f"placement:{selected_placement.pk}:{attendance.date}"
             )
 
             messages.success(request, "Attendance updated.")
@@ -1246,16 +1198,32 @@ def admin_manage_attendance(request, internship_id):
 
         # ➕ ADD attendance (optional)
         if 'add_attendance' in request.POST and not is_locked:
-            attendance = Attendance.objects.create(
+            duplicate = Attendance.objects.filter(
                 placement=selected_placement,
-                date=request.POST.get('date'),
-                check_in=request.POST.get('check_in'),
-                check_out=request.POST.get('check_out')
+                date=request.POST.get('date')
             )
+            try:
+                with transaction.atomic():
+                    attendance = Attendance.objects.create(
+                        placement=selected_placement,
+                        date=request.POST.get('date'),
+                        check_in=request.POST.get('check_in'),
+                        check_out=request.POST.get('check_out')
+                    )
+            except IntegrityError:
+                # Only a clash on (placement, date) is the admin's to fix; anything else is a real error
+                if not duplicate.exists():
+                    raise
+                messages.error(request, "There is already an attendance record for that day; edit it instead.")
+                return redirect(
+                    f"{request.path}?placement={selected_placement.id}"
+                )
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You added attendance record for {selected_placement.student.user.username} on {attendance.date}."
+            notify(
+                request.user,
+                f"You added attendance record for {selected_placement.student.user.username} on {attendance.date}.",
+                kind='attendance_added',
+                subject=f"placement:{selected_placement.pk}:{attendance.date}"
             )
             messages.success(request, "Attendance added.")
             return redirect(
@@ -1270,6 +1238,7 @@ def admin_manage_attendance(request, internship_id):
             'placements': placements,
             'selected_placement': selected_placement,
             'attendance_records': attendance_records,
+            'attendance_summary': attendance_summary,
             'is_locked': is_locked,
         }
     )
@@ -1364,17 +1333,17 @@ def admin_logbooks_manage(request):
             logbook.status = request.POST.get('status')
             logbook.save()
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You updated logbook status for {logbook.application.student.user.username} week {logbook.week_no} from {old_status} to {logbook.status}."
+            notify(
+                request.user,
+                f"You updated logbook status for {logbook.application.student.user.username} week {logbook.week_no} from {old_status} to {logbook.status}."
             )
 
         elif 'delete_logbook' in request.POST:
             logbook = Logbook.objects.get(id=logbook_id)
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You deleted logbook for {logbook.application.student.user.username} week {logbook.week_no}."
+            notify(
+                request.user,
+                f"You deleted logbook for {logbook.application.student.user.username} week {logbook.week_no}."
             )
             logbook.delete()
 
@@ -1457,18 +1426,14 @@ def admin_evaluations_manage(request):
         if 'delete_evaluation' in request.POST:
             evaluation = PerformanceEvaluation.objects.get(id=eval_id)
             # Notify supervisors before deleting
-            Notification.objects.create(
-                user=evaluation.company_supervisor.user,
-                message=f"The evaluation for {evaluation.student.user.username} has been deleted by admin."
-            )
-            Notification.objects.create(
-                user=evaluation.academic_supervisor.user,
-                message=f"The evaluation for {evaluation.student.user.username} has been deleted by admin."
+            notify(
+                [evaluation.company_supervisor.user_id, evaluation.academic_supervisor.user_id],
+                f"The evaluation for {evaluation.student.user.username} has been deleted by admin."
             )
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You deleted the evaluation for {evaluation.student.user.username}."
+            notify(
+                request.user,
+                f"You deleted the evaluation for {evaluation.student.user.username}."
             )
             evaluation.delete()
 
@@ -1483,15 +1448,15 @@ def admin_evaluations_manage(request):
             evaluation.save()
 
             # Notify company supervisor
-            Notification.objects.create(
-                user=evaluation.company_supervisor.user,
-                message=f"Your evaluation for {evaluation.student.user.username} has been reset by admin. Please submit your evaluation again."
+            notify(
+                evaluation.company_supervisor.user,
+                f"Your evaluation for {evaluation.student.user.username} has been reset by admin. Please submit your evaluation again."
             )
 
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You reset the company evaluation for {evaluation.student.user.username}."
+            notify(
+                request.user,
+                f"You reset the company evaluation for {evaluation.student.user.username}."
             )
 
         return redirect(f"{request.path}?company={company_id or ''}&internship={internship_id or ''}&student={student_id}")
@@ -1515,9 +1480,9 @@ def admin_add_internship(request):
         if form.is_valid():
             internship = form.save()
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You added internship {internship.title} at {internship.company.company_name}."
+            notify(
+                request.user,
+                f"You added internship {internship.title} at {internship.company.company_name}."
             )
             return redirect('admin_internships_list')
     else:
@@ -1540,9 +1505,9 @@ def admin_edit_internship(request, internship_id):
         if form.is_valid():
             internship = form.save()
             # Notify admin
-            Notification.objects.create(
-                user=request.user,
-                message=f"You updated internship {internship.title} at {internship.company.company_name}."
+            notify(
+                request.user,
+                f"You updated internship {internship.title} at {internship.company.company_name}."
             )
             return redirect('admin_internships_list')
     else:
@@ -1560,15 +1525,42 @@ def admin_edit_internship(request, internship_id):
 def admin_delete_internship(request, internship_id):
     internship = get_object_or_404(Internship, id=internship_id)
     # Notify admin
-    Notification.objects.create(
-        user=request.user,
-        message=f"You deleted internship {internship.title} at {internship.company.company_name}."
+    notify(
+        request.user,
+        f"You deleted internship {internship.title} at {internship.company.company_name}."
     )
     internship.delete()
     messages.success(request, f'Internship "{internship.title}" has been deleted.')
     return redirect('admin_internships_list')
 
 
+@login_required
+@role_required(allowed_roles=['admin'])
+def admin_profiles(request):
+    return render(request, 'admin/admin_profiles.html', {
+        'profiles': list_profiles(),
+    })
+
+
+@login_required
+@role_required(allowed_roles=['admin'])
+def admin_profile_detail(request, name):
+    summary = read_profile(name)
+    if summary is None:
+        raise Http404("No such profile.")
+
+    if 'download' in request.GET:
+        try:
+            prof = open(profile_path(name), 'rb')
+        except FileNotFoundError:
+            raise Http404("The profile data has been removed.")
+        return FileResponse(prof, as_attachment=True, filename=f"{name}.prof")
+
+    return render(request, 'admin/admin_profile_detail.html', {
+        'profile': summary,
+    })
+
+
 #student manage profile and upload docs
 @login_required
 @role_required(allowed_roles=['student', 'company'])
@@ -1579,7 +1571,7 @@ def student_profile(request, student_id=None):
         if request.user.role != 'company':
             return HttpResponseForbidden("Access denied.")
         
-        company_supervisor = request.user.companysupervisor
+        company_supervisor = request.profile
         student = get_object_or_404(
             Student,
             id=student_id,
@@ -1592,9 +1584,8 @@ def student_profile(request, student_id=None):
         # Student viewing their own profile
         if request.user.role != 'student':
             return redirect('dashboard') 
-        try:
-            student = Student.objects.get(user=request.user)
-        except Student.DoesNotExist:
+        student = request.profile
+        if not student:
             return render(request, 'student/profile.html', {
                 'error': 'Your student profile has not been created yet. Please contact the administrator.',
                 'is_owner': True
@@ -1636,7 +1627,7 @@ def update_email(request):
 @login_required
 @role_required(allowed_roles=['student'])
 def upload_document(request):
-    student = Student.objects.get(user=request.user)
+    student = profile_or_404(request, Student)
 
     if request.method == 'POST':
         form = DocumentUploadForm(request.POST, request.FILES)
@@ -1653,7 +1644,7 @@ def upload_document(request):
     })
 
 def edit_document(request, doc_id):
-    doc = get_object_or_404(Document, id=doc_id, student=request.user.student)
+    doc = get_object_or_404(Document, id=doc_id, student=request.profile)
     if request.method == 'POST':
         form = DocumentUploadForm(request.POST, request.FILES, instance=doc)
         if form.is_valid():
@@ -1665,7 +1656,7 @@ def edit_document(request, doc_id):
     return render(request, 'student/edit_document.html', {'form': form, 'doc': doc})
 
 def delete_document(request, doc_id):
-    doc = get_object_or_404(Document, id=doc_id, student=request.user.student)
+    doc = get_object_or_404(Document, id=doc_id, student=request.profile)
     if request.method == 'POST':
         doc.delete()
         messages.success(request, 'Document deleted successfully.')
@@ -1676,9 +1667,9 @@ def delete_document(request, doc_id):
 @login_required
 @role_required(['student'])
 def internship_list(request):
-    student = request.user.student
+    student = request.profile
 
-    internships = Internship.objects.filter(status='Open')
+    internships = Internship.objects.filter(status='Open').select_related('company')
 
     # Search
     query = request.GET.get('q')
@@ -1723,7 +1714,7 @@ def internship_list(request):
 @role_required(['student'])
 def apply_internship(request, id):
     internship = get_object_or_404(Internship, id=id)
-    student = Student.objects.get(user=request.user)
+    student = profile_or_404(request, Student)
 
     #Block if student already placed
     if InternshipPlacement.objects.filter(student=student,status='Active').exists():
@@ -1753,16 +1744,15 @@ def apply_internship(request, id):
             document.doc_type = 'Resume'
             document.save()
 
-            company_supervisor = CompanySupervisor.objects.filter(
-                company = internship.company,
-                department=internship.department
+            company_supervisors = User.objects.filter(
+                companysupervisor__company=internship.company,
+                companysupervisor__department=internship.department
             )
 
-            for supervisor in company_supervisor:
-                Notification.objects.create(
-                    user=supervisor.user,
-                    message=f"New application from {student.user.username}"
-                )
+            notify(
+                company_supervisors,
+                f"New application from {student.user.username}"
+            )
 
             return render(request, 'student/internship_apply.html', {
                 'success': 'Application submitted successfully!'
@@ -1781,7 +1771,7 @@ def apply_internship(request, id):
 @login_required
 @role_required(['company'])
 def handle_application(request, app_id, action):
-    company_supervisor = CompanySupervisor.objects.get(user=request.user)
+    company_supervisor = profile_or_404(request, CompanySupervisor)
     application = get_object_or_404(InternshipApplication, id=app_id)
 
     # Already handled
@@ -1807,7 +1797,7 @@ def handle_application(request, app_id, action):
 @login_required
 @role_required(['company'])
 def supervisor_applications(request):
-    company_supervisor = request.user.companysupervisor
+    company_supervisor = request.profile
 
     # Apply the 3-month limit 
     show_all_app = request.GET.get('filter') == 'all'
@@ -1838,7 +1828,7 @@ def supervisor_applications(request):
 
 @login_required
 def supervisor_decide(request, application_id):
-    current_supervisor = request.user.companysupervisor
+    current_supervisor = request.profile
     application = InternshipApplication.objects.get(id=application_id)
 
     with transaction.atomic():
@@ -1864,21 +1854,20 @@ def supervisor_decide(request, application_id):
             application.save()
 
         #Notify Student
-        Notification.objects.create(
-            user=application.student.user, 
-            message=message
+        notify(
+            application.student.user,
+            message
         )
 
         #Notify OTHER supervisors in the department
-        other_supervisors = CompanySupervisor.objects.filter(
-            department=current_supervisor.department
-        ).exclude(id=current_supervisor.id)
-
-        for supervisor in other_supervisors:
-            Notification.objects.create(
-                user=supervisor.user,
-                message=f"Supervisor {request.user.username} has handled the application from {application.student.user.username}."
-            )
+        other_supervisors = User.objects.filter(
+            companysupervisor__department=current_supervisor.department
+        ).exclude(companysupervisor=current_supervisor)
+
+        notify(
+            other_supervisors,
+            f"Supervisor {request.user.username} has handled the application from {application.student.user.username}."
+        )
 
         return redirect('supervisor_applications')
     
@@ -1886,7 +1875,7 @@ def supervisor_decide(request, application_id):
 
 @login_required
 def student_offers(request):
-    student = request.user.student
+    student = request.profile
 
     applications = InternshipApplication.objects.filter(
         student=student
@@ -1900,7 +1889,7 @@ def student_offers(request):
 def accept_offer(request, pk):
     application = get_object_or_404(InternshipApplication, pk=pk)
 
-    if application.student != request.user.student:
+    if application.student != request.profile:
         return redirect('student_offers')
 
     # Accept
@@ -1919,23 +1908,23 @@ def accept_offer(request, pk):
     )
 
     # Notify student about company supervisor assignment
-    Notification.objects.create(
-        user=application.student.user,
-        message=f"You have been assigned to {application.handled_by.user.username} from {application.internship.company.company_name}."
+    notify(
+        application.student.user,
+        f"You have been assigned to {application.handled_by.user.username} from {application.internship.company.company_name}."
     )
 
     # Notify company supervisor
-    Notification.objects.create(
-        user=application.handled_by.user,
-        message=f"Student {application.student} has accepted your internship offer."
+    notify(
+        application.handled_by.user,
+        f"Student {application.student} has accepted your internship offer."
     )
 
     # Notify academic supervisor if exists
     if application.student.academic_supervisor:
-        Notification.objects.create(
-            user=application.student.academic_supervisor.user,
-            message=f"{application.student.user.username} has accepted an internship "
-                    f"at {application.internship.company.company_name}."
+        notify(
+            application.student.academic_supervisor.user,
+            f"{application.student.user.username} has accepted an internship "
+            f"at {application.internship.company.company_name}."
         )
 
     return redirect('student_offers')
@@ -1944,7 +1933,7 @@ def accept_offer(request, pk):
 def reject_offer(request, pk):
     application = get_object_or_404(InternshipApplication, pk=pk)
 
-    if application.student != request.user.student:
+    if application.student != request.profile:
         return redirect('student_offers')
 
     application.student_decision = 'Rejected'
@@ -1952,42 +1941,25 @@ def reject_offer(request, pk):
     application.save()
 
     # Notify supervisor
-    Notification.objects.create(
-        user=application.handled_by.user,
-        message=f"{application.student.user.username} has rejected your internship offer."
+    notify(
+        application.handled_by.user,
+        f"{application.student.user.username} has rejected your internship offer."
     )
 
     # Notify academic supervisor if exists
     if application.student.academic_supervisor:
-        Notification.objects.create(
-            user=application.student.academic_supervisor.user,
-            message=f"{application.student.user.username} has rejected an internship offer."
+        notify(
+            application.student.academic_supervisor.user,
+            f"{application.student.user.username} has rejected an internship offer."
         )
 
     return redirect('student_offers')
 
-@login_required
-def notifications(request):
-    notes = Notification.objects.filter(user=request.user).order_by('-created_at')
-    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-
-    return render(request, 'notifications/list.html', {
-        'notifications': notes,
-        'unread_count': unread_count
-    })
-
-@login_required
-def mark_notification_read(request, pk):
-    note = get_object_or_404(Notification, pk=pk, user=request.user)
-    note.is_read = True
-    note.save()
-    return redirect('notifications')
-
 #Weekly Logbook
 @login_required
 @role_required(['student'])
 def logbook_list(request):
-    student = get_object_or_404(Student, user=request.user)
+    student = profile_or_404(request, Student)
 
     placement = InternshipPlacement.objects.filter(
         student=student,
@@ -2023,7 +1995,7 @@ def logbook_list(request):
 @login_required
 @role_required(['student'])
 def submit_logbook(request, week_no):
-    student = get_object_or_404(Student, user=request.user)
+    student = profile_or_404(request, Student)
 
     placement = InternshipPlacement.objects.filter(
         student=student,
@@ -2048,7 +2020,7 @@ def submit_logbook(request, week_no):
     start_date = placement.start_date
     deadline = start_date + timedelta(days=week_no * 7)
 
-    if date.today() > deadline:
+    if timezone.localdate() > deadline:
         return render(request, 'student/submit_logbook.html', {
             'error': 'Submission deadline has passed.',
             'week_no': week_no
@@ -2065,21 +2037,21 @@ def submit_logbook(request, week_no):
             application=application,
             week_no=week_no,
             content=request.POST.get('content'),
-            submitted_date=date.today(),
+            submitted_date=timezone.localdate(),
             status='Pending'
         )
 
         # Notify Supervisors
         if placement.company_supervisor:
-            Notification.objects.create(
-                user=placement.company_supervisor.user,
-                message=f"{student.user.username} submitted logbook for Week {week_no}."
+            notify(
+                placement.company_supervisor.user,
+                f"{student.user.username} submitted logbook for Week {week_no}."
             )
 
         if student.academic_supervisor:
-            Notification.objects.create(
-                user=student.academic_supervisor.user,
-                message=f"{student.user.username} submitted logbook for Week {week_no}."
+            notify(
+                student.academic_supervisor.user,
+                f"{student.user.username} submitted logbook for Week {week_no}."
             )
 
         messages.success(request, "Logbook submitted successfully.")
@@ -2093,7 +2065,7 @@ def submit_logbook(request, week_no):
 @login_required
 @role_required(['student'])
 def edit_logbook(request, id):
-    student = get_object_or_404(Student, user=request.user)
+    student = profile_or_404(request, Student)
     logbook = get_object_or_404(Logbook, id=id, student=student)
     placement = InternshipPlacement.objects.filter(student=student, status='Active').first()
 
@@ -2104,20 +2076,22 @@ def edit_logbook(request, id):
 
     if request.method == 'POST':
         logbook.content = request.POST.get('content')
-        logbook.updated_at = date.today()
+        logbook.updated_at = timezone.localdate()
         logbook.save()
 
+        # Notify supervisors; repeated edits are merged into one notification
+        supervisors = []
         if placement and placement.company_supervisor:
-            Notification.objects.create(
-                user=placement.company_supervisor.user,
-                message=f"{student.user.username} updated logbook for Week {logbook.week_no}."
-            )
-
+            supervisors.append(placement.company_supervisor.user_id)
         if student.academic_supervisor:
-            Notification.objects.create(
-                user=student.academic_supervisor.user,
-                message=f"{student.user.username} updated logbook for Week {logbook.week_no}."
-            )
+            supervisors.append(student.academic_supervisor.user_id)
+
+        notify(
+            supervisors,
+            f"{student.user.username} updated logbook for Week {logbook.week_no}.",
+            kind='logbook_updated',
+            subject=f"logbook:{logbook.pk}"
+        )
 
         messages.success(request, "Logbook updated.")
         return redirect('logbook_list')
@@ -2130,7 +2104,7 @@ def edit_logbook(request, id):
 @login_required
 @role_required(['company'])
 def company_logbook_review(request):
-    supervisor = get_object_or_404(CompanySupervisor, user=request.user)
+    supervisor = profile_or_404(request, CompanySupervisor)
     show_all_log = request.GET.get('filter') == 'all'
 
     placements = InternshipPlacement.objects.filter(
@@ -2139,8 +2113,8 @@ def company_logbook_review(request):
     )
 
     logbooks = Logbook.objects.filter(
-        application__internship__in=[p.internship for p in placements]
-    )
+        application__internship__in=placements.values('internship')
+    ).select_related('student__user')
 
     if not show_all_log:
         three_months_ago = timezone.now() - timedelta(days=90)
@@ -2166,32 +2140,32 @@ def review_logbook(request, logbook_id):
         if action == 'approve':
             logbook.company_approval = True
             logbook.status = 'Approved'
-            logbook.approved_at = date.today()
+            logbook.approved_at = timezone.localdate()
 
-            Notification.objects.create(
-                user=logbook.student.user,
-                message=f"Your logbook for Week {logbook.week_no} has been approved by {request.user.username}."
+            notify(
+                logbook.student.user,
+                f"Your logbook for Week {logbook.week_no} has been approved by {request.user.username}."
             )
 
             if logbook.student.academic_supervisor:
-                Notification.objects.create(
-                    user=logbook.student.academic_supervisor.user,
-                    message=f"{logbook.student.user.username}'s logbook for Week {logbook.week_no} was approved by the Company Supervisor."
+                notify(
+                    logbook.student.academic_supervisor.user,
+                    f"{logbook.student.user.username}'s logbook for Week {logbook.week_no} was approved by the Company Supervisor."
                 )
 
         elif action == 'reject':
             logbook.company_approval = False
             logbook.status = 'Rejected'
 
-            Notification.objects.create(
-                user=logbook.student.user,
-                message=f"Your logbook for Week {logbook.week_no} was rejected. Please review and resubmit."
+            notify(
+                logbook.student.user,
+                f"Your logbook for Week {logbook.week_no} was rejected. Please review and resubmit."
             )
 
             if logbook.student.academic_supervisor:
-                Notification.objects.create(
-                    user=logbook.student.academic_supervisor.user,
-                    message=f"{logbook.student.user.username}'s logbook for Week {logbook.week_no} was rejected by the Company Supervisor."
+                notify(
+                    logbook.student.academic_supervisor.user,
+                    f"{logbook.student.user.username}'s logbook for Week {logbook.week_no} was rejected by the Company Supervisor."
                 )
 
         logbook.save()
@@ -2203,9 +2177,14 @@ def review_logbook(request, logbook_id):
 @login_required
 @role_required(['academic'])
 def academic_logbook_review(request):
-    supervisor = get_object_or_404(AcademicSupervisor, user=request.user)
+    supervisor = profile_or_404(request, AcademicSupervisor)
 
-    logbooks = Logbook.objects.filter(student__academic_supervisor=supervisor).order_by('student__user__username', 'week_no')
+    logbooks = (
+        Logbook.objects
+        .filter(student__academic_supervisor=supervisor)
+        .select_related('student__user')
+        .order_by('student__user__username', 'week_no')
+    )
 
     return render(request, 'academic/logbook_review.html', {
         'logbooks': logbooks
@@ -2214,13 +2193,13 @@ def academic_logbook_review(request):
 @login_required
 @role_required(['academic'])
 def academic_student_list(request):
-    supervisor = request.user.academicsupervisor
+    supervisor = request.profile
     students = Student.objects.filter(academic_supervisor=supervisor)
     return render(request, 'academic/academic_student_list.html', {'students': students})
 
 @login_required
 def academic_student_list(request):
-    supervisor = request.user.academicsupervisor
+    supervisor = request.profile
 
     students = Student.objects.filter(
         academic_supervisor=supervisor
@@ -2235,7 +2214,7 @@ def academic_student_list(request):
 @login_required
 def academic_performance_evaluation(request, student_id):
     student = get_object_or_404(Student, id=student_id)
-    academic_supervisor = request.user.academicsupervisor
+    academic_supervisor = request.profile
 
     # Get ACTIVE placement
     placement = InternshipPlacement.objects.filter(
@@ -2317,7 +2296,7 @@ def academic_performance_evaluation(request, student_id):
 @login_required
 @role_required(['student'])
 def student_attendance_summary(request):
-    student = get_object_or_404(Student, user=request.user)
+    student = profile_or_404(request, Student)
 
     placement = InternshipPlacement.objects.filter(
         student=student,
@@ -2330,8 +2309,8 @@ def student_attendance_summary(request):
             'attendances': [],
         })
 
-    month = int(request.GET.get('month', datetime.today().month))
-    year = int(request.GET.get('year', datetime.today().year))
+    month = int(request.GET.get('month', timezone.localdate().month))
+    year = int(request.GET.get('year', timezone.localdate().year))
 
     start_date = datetime(year, month, 1).date()
     # Calculate last day of month
@@ -2340,24 +2319,17 @@ def student_attendance_summary(request):
     else:
         end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
     
-    today = date.today()
-    last_day_to_check = min(end_date, today)
+    today = timezone.localdate()
 
-    # Fetch attendance in the month
     attendances = Attendance.objects.filter(
         placement=placement,
-        date__range=[start_date, last_day_to_check]
+        date__range=[start_date, end_date]
     ).order_by('date')
 
-    attended_dates = set(att.date for att in attendances if att.check_in)
-
-    # Generate all dates up to today in the month
-    all_dates_up_to_today = [start_date + timedelta(days=i) 
-                             for i in range((last_day_to_check - start_date).days + 1)]
-
-    # Count absent days
-    total_days_present = len(attended_dates)
-    total_days_absent = len([d for d in all_dates_up_to_today if d not in attended_dates])
+    # Absences are working days without a record, counted in SQL (see placement.attendance)
+    summary = summarize_attendance(
+        InternshipPlacement.objects.filter(pk=placement.pk), start_date, end_date
+    )[placement.pk]
 
     context = {
         'placement': placement,
@@ -2366,8 +2338,9 @@ def student_attendance_summary(request):
         "months": range(1, 13),
         'month': month,
         'year': year,
-        'total_days_present': total_days_present,
-        'total_days_absent': total_days_absent,
+        'total_days_present': summary['present_days'],
+        'total_days_absent': summary['absent_days'],
+        'summary': summary,
         'start_date': start_date,
         'end_date': end_date,
         'today': today,
@@ -2376,32 +2349,96 @@ def student_attendance_summary(request):
     return render(request, 'student/attendance.html', context)
 
 
+def _page_size(request):
+    try:
+        return int(request.GET.get('limit', INBOX_PAGE_SIZE))
+    except ValueError:
+        return INBOX_PAGE_SIZE
+
+
 @login_required
 def notifications(request):
-    user_notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    
-    # Mark all as read when viewing
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
-    
+    user_notifications, next_cursor = inbox_page(
+        request.user,
+        cursor=request.GET.get('cursor'),
+        limit=_page_size(request),
+        status=request.GET.get('status')
+    )
+
+    # Mark only the page being viewed as read; the template still shows
+    # which of them were unread when the page was loaded
+    mark_read(
+        request.user,
+        NotificationReceipt.objects.filter(pk__in=[n.pk for n in user_notifications])
+    )
+
     context = {
         'notifications': user_notifications,
+        'next_cursor': next_cursor,
+        'status': request.GET.get('status', ''),
     }
     return render(request, 'notifications/list.html', context)
 
 
 @login_required
-def mark_notification_read(request, pk):
-    notification = get_object_or_404(Notification, pk=pk, user=request.user)
-    notification.is_read = True
-    notification.save()
-    return redirect('notifications')
+def notifications_feed(request):
+    """JSON variant of the inbox; pass ``next`` back as ``cursor`` for the next page."""
+    receipts, next_cursor = inbox_page(
+        request.user,
+        cursor=request.GET.get('cursor'),
+        limit=_page_size(request),
+        status=request.GET.get('status')
+    )
 
+    return JsonResponse({
+        'results': [
+            {
+                'id': receipt.pk,
+                'message': receipt.display_message,
+                'count': receipt.repeat_count,
+                'is_read': receipt.is_read,
+                'created_at': receipt.created_at.isoformat(),
+            }
+            for receipt in receipts
+        ],
+        'next': next_cursor,
+        'unread_count': request.user.unread_notifications,
+    })
 
-# Dummy student
-supervisor = AcademicSupervisor.objects.first()
-student_dummy = Student.objects.first()
-student_dummy.academic_supervisor = supervisor
-student_dummy.save()
 
+@login_required
+async def notification_stream(request):
+    """Server-sent events with new notifications and unread-count changes (ASGI only)."""
+    if not settings.NOTIFICATION_STREAM or not isinstance(request, ASGIRequest):
+        # Under WSGI the never-ending body would be buffered whole and pin a worker thread;
+        # 204 tells EventSource to stop reconnecting
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    response = StreamingHttpResponse(
+        notification_events(user, request.headers.get('Last-Event-ID')),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """Mark an explicit batch of notifications (``ids``) as read."""
+    ids = [pk for pk in request.POST.getlist('ids') if pk.isdigit()][:INBOX_MAX_PAGE_SIZE]
+    marked = mark_read(request.user, NotificationReceipt.objects.filter(pk__in=ids))
+
+    return JsonResponse({
+        'marked': marked,
+        'unread_count': request.user.unread_notifications,
+    })
+
+
+@login_required
+def mark_notification_read(request, pk):
+    notification = get_object_or_404(NotificationReceipt, pk=pk, user=request.user)
+    mark_read(request.user, NotificationReceipt.objects.filter(pk=notification.pk))
+    return redirect('notifications')